@@ -35,9 +35,6 @@ def main():
     # Create necessary directories
     setup_directories()
     
-    # Set random seed for reproducibility
-    np.random.seed(DEFAULT_CONFIG['random_seed'])
-    
     # Run the dashboard
     run_dashboard()
 
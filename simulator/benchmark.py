@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the simulator hot paths.
+
+Times each stage over sweeps of member count, grantee count and duration,
+records peak memory, and writes machine-readable JSON with a fitted
+scaling exponent per stage so regressions can be tracked between versions.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.council import Council
+from utils.context import SimulationContext
+from utils.helpers import generate_members, generate_grantees
+from utils.metrics import distribution_metrics
+from config import DATA_PATHS
+
+# Sweeps over each dimension; the other dimensions stay at BASELINE
+SWEEPS = {
+    'num_members': [100, 1000, 10000, 60000],
+    'num_grantees': [1, 10, 100],
+    'duration_months': [1, 12, 36]
+}
+
+QUICK_SWEEPS = {
+    'num_members': [100, 1000, 5000],
+    'num_grantees': [1, 10, 50],
+    'duration_months': [1, 6, 12]
+}
+
+BASELINE = {
+    'num_members': 1000,
+    'num_grantees': 10,
+    'duration_months': 12
+}
+
+# Dimensions each stage's cost depends on
+STAGE_DIMENSIONS = {
+    'generate_members': ['num_members'],
+    'member_allocate': ['num_members', 'num_grantees'],
+    'current_allocations': ['num_members', 'num_grantees'],
+    'distribute_funds': ['num_members', 'num_grantees', 'duration_months'],
+    'get_history_dataframe': ['num_grantees', 'duration_months'],
+    'calculate_gini': ['num_grantees', 'duration_months'],
+    'distribution_metrics': ['num_grantees', 'duration_months'],
+    'create_network_plot': ['num_members', 'num_grantees']
+}
+
+def build_council(params: Dict[str, int], seed: int, months: int = 0) -> Council:
+    """Build a council whose members have all allocated, run for `months` months."""
+    rng = SimulationContext(seed).rng
+    members = generate_members(params['num_members'], 'pareto', rng=rng)
+    grantees = generate_grantees(params['num_grantees'], rng=rng)
+    council = Council(100000, 0.05, members, grantees, duration_months=max(months, 1), rng=rng)
+    council.allocate_batch(np.arange(len(members)))
+    for month in range(months):
+        council.distribute_funds(month)
+    return council
+
+def make_stage(stage: str, params: Dict[str, int], seed: int) -> Optional[Callable[[], Any]]:
+    """
+    Prepare the inputs for one stage and return a zero-argument callable
+    that runs only the timed work (or None if the stage is unavailable).
+    """
+    months = params['duration_months']
+
+    if stage == 'generate_members':
+        rng = SimulationContext(seed).rng
+        return lambda: generate_members(params['num_members'], 'pareto', rng=rng)
+
+    if stage == 'member_allocate':
+        council = build_council(params, seed)
+        rng = council.rng
+        return lambda: [m.allocate(council.grantees, rng=rng) for m in council.members]
+
+    if stage == 'current_allocations':
+        council = build_council(params, seed)
+        return council.current_allocations
+
+    if stage == 'distribute_funds':
+        council = build_council(params, seed)
+        return lambda: [council.distribute_funds(month) for month in range(months)]
+
+    if stage == 'get_history_dataframe':
+        council = build_council(params, seed, months)
+        return council.get_history_dataframe
+
+    if stage == 'calculate_gini':
+        try:
+            from visualization.plots import calculate_gini
+        except ImportError:
+            return None
+        df = build_council(params, seed, months).get_history_dataframe()
+        dist_cols = [col for col in df.columns if col.startswith('dist_to_')]
+        rows = df[dist_cols].values.tolist()
+        return lambda: [calculate_gini(row) for row in rows]
+
+    if stage == 'distribution_metrics':
+        council = build_council(params, seed, months)
+        quality = np.array([g.quality for g in council.grantees])
+        matrix = council.history.distribution[:len(council.history)]
+        return lambda: distribution_metrics(matrix, quality)
+
+    if stage == 'create_network_plot':
+        try:
+            from visualization.plots import create_network_plot
+        except ImportError:
+            return None
+        council = build_council(params, seed)
+        return lambda: create_network_plot(council)
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+def measure(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """Time `fn` over several repeats, then capture its peak traced memory once."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'best_seconds': min(timings),
+        'mean_seconds': float(np.mean(timings)),
+        'peak_memory_bytes': int(peak)
+    }
+
+def scaling_exponent(sizes: List[float], seconds: List[float]) -> Optional[float]:
+    """Fit time ~ size^k on a log-log scale and return k."""
+    points = [(s, t) for s, t in zip(sizes, seconds) if s > 0 and t > 0]
+    if len(set(s for s, _ in points)) < 2:
+        return None
+    x, y = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+    return float(np.polyfit(x, y, 1)[0])
+
+def code_version() -> str:
+    """Return the current git commit, or 'unknown' outside a checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmarks(
+    stages: List[str],
+    sweeps: Dict[str, List[int]],
+    repeats: int = 3,
+    seed: int = 42,
+    max_network_members: int = 10000
+) -> Dict[str, Any]:
+    """
+    Run every stage over each relevant sweep dimension.
+
+    Parameters:
+    -----------
+    stages : list
+        Names of the stages to benchmark (keys of STAGE_DIMENSIONS)
+    sweeps : dict
+        Values to sweep for each dimension
+    repeats : int
+        Number of timed repeats per measurement
+    seed : int
+        Random seed for generated inputs
+    max_network_members : int
+        Largest member count to render with create_network_plot
+
+    Returns:
+    --------
+    dict
+        Benchmark report with per-measurement results and scaling exponents
+    """
+    results = []
+    scaling = {}
+
+    for stage in stages:
+        for dimension in STAGE_DIMENSIONS[stage]:
+            sizes, seconds = [], []
+            for value in sweeps[dimension]:
+                params = dict(BASELINE, **{dimension: value})
+                if stage == 'create_network_plot' and params['num_members'] > max_network_members:
+                    continue
+
+                fn = make_stage(stage, params, seed)
+                if fn is None:
+                    break
+
+                measurement = measure(fn, repeats)
+                results.append(dict(stage=stage, dimension=dimension, **params, **measurement))
+                sizes.append(value)
+                seconds.append(measurement['best_seconds'])
+                print(f"{stage:<24} {dimension}={value:<7} {measurement['best_seconds']:.4f}s "
+                      f"peak {measurement['peak_memory_bytes'] / 1e6:.1f} MB")
+
+            scaling.setdefault(stage, {})[dimension] = scaling_exponent(sizes, seconds)
+
+    return {
+        'code_version': code_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'repeats': repeats,
+        'baseline': BASELINE,
+        'results': results,
+        'scaling_exponents': scaling
+    }
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Council Funding Simulator benchmarks')
+
+    parser.add_argument('--stages', nargs='+', default=list(STAGE_DIMENSIONS),
+                        choices=list(STAGE_DIMENSIONS),
+                        help='Stages to benchmark')
+
+    parser.add_argument('--quick', action='store_true',
+                        help='Use smaller sweeps for a fast smoke run')
+
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Timed repeats per measurement')
+
+    parser.add_argument('--random_seed', type=int, default=42,
+                        help='Random seed for generated inputs')
+
+    parser.add_argument('--max_network_members', type=int, default=10000,
+                        help='Largest member count rendered by create_network_plot')
+
+    parser.add_argument('--output', type=str, default=None,
+                        help='Output JSON file (defaults to results_dir/benchmark-<version>.json)')
+
+    return parser.parse_args()
+
+def main():
+    """Run the benchmark suite and write the JSON report."""
+    args = parse_args()
+
+    report = run_benchmarks(
+        args.stages,
+        QUICK_SWEEPS if args.quick else SWEEPS,
+        args.repeats,
+        args.random_seed,
+        args.max_network_members
+    )
+
+    output_path = Path(args.output or Path(DATA_PATHS['results_dir']) / f"benchmark-{report['code_version']}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2))
+
+    print("\nScaling exponents (time ~ size^k):")
+    for stage, exponents in report['scaling_exponents'].items():
+        formatted = ", ".join(f"{dim}: {k:.2f}" if k is not None else f"{dim}: n/a"
+                              for dim, k in exponents.items())
+        print(f"  {stage:<24} {formatted}")
+    print(f"Benchmark report saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
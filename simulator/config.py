@@ -11,6 +11,8 @@ DEFAULT_CONFIG = {
     'initial_pool': 100000,
     'distribution_rate': 0.05,
     'annual_funding_addition': 0,
+    'num_councils': 1,  # > 1 simulates a CouncilFactory network sharing members
+    'network_members': 0,  # network: size of the shared member population (0 = auto)
     
     # Grantee parameters
     'num_grantees': 10,
@@ -22,14 +24,32 @@ DEFAULT_CONFIG = {
     'allocation_strategy': 'random',
     'coalition_size': 0.3,
     'coalition_focus': 2,
+    'coalition_overlap': 0.0,  # fraction of coalition members also in a second coalition
+    'coalition_churn': 0.0,  # fraction of coalition memberships moving each month
     'participation_rate': 0.8,
+    'participation_model': 'uniform',  # 'uniform', 'propensity' or 'markov'
+    'participation_heterogeneity': 0.0,  # spread of per-member propensities (0 = identical)
+    'participation_persistence': 0.5,  # markov: correlation of activity in consecutive months
+    'learning_rate': 0.2,  # adaptive strategies: weight of each month's observation
+    'exploration_rate': 0.05,  # reinforcement and herding: share of voting power split equally
+    'rationality': 5.0,  # bounded_rational: logit sensitivity to learned attractions
+    'perception_noise': 0.1,  # bounded_rational: noise in perceived grantee viability
+    'max_allocations_per_member': 0,  # 0 = no limit, as in Council.sol
+    'allocation_storage': 'auto',  # 'dense', 'sparse' or 'auto' (sparse when capped)
     
     # Temporal parameters
     'duration_months': 12,
+    'time_model': 'monthly',  # 'monthly' steps or 'continuous' event-driven streaming
+    'vote_resolution_seconds': 86400,  # continuous model: granularity of vote times
+    
+    # On-chain arithmetic
+    'unit_arithmetic': 'float',  # 'float' or 'exact' integer pool units and flow rates, as on-chain
+    'token_decimals': 18,  # exact arithmetic: decimals of the distributed super token
     
     # Simulation parameters
     'random_seed': 42,
-    'num_simulations': 10
+    'num_simulations': 10,
+    'check_consistency': False
 }
 
 # Parameter ranges for UI controls
@@ -43,7 +63,15 @@ PARAMETER_RANGES = {
     'popularity_correlation': (-1.0, 1.0, 0.5),
     'coalition_size': (0.1, 1.0, 0.3),
     'coalition_focus': (1, 5, 2),
+    'coalition_overlap': (0.0, 1.0, 0.0),
+    'coalition_churn': (0.0, 0.5, 0.0),
     'participation_rate': (0.1, 1.0, 0.8),
+    'participation_heterogeneity': (0.0, 1.0, 0.0),
+    'participation_persistence': (0.0, 1.0, 0.5),
+    'learning_rate': (0.0, 1.0, 0.2),
+    'exploration_rate': (0.0, 1.0, 0.05),
+    'rationality': (0.0, 20.0, 5.0),
+    'perception_noise': (0.0, 1.0, 0.1),
     'duration_months': (1, 36, 12)
 }
 
@@ -51,7 +79,8 @@ PARAMETER_RANGES = {
 DROPDOWN_OPTIONS = {
     'voting_power_distribution': ['Equal', 'Normal', 'Pareto', 'Custom'],
     'quality_distribution': ['Uniform', 'Normal', 'Bimodal'],
-    'allocation_strategy': ['Random', 'Merit-based', 'Popularity-based', 'Coalition'],
+    'allocation_strategy': ['Random', 'Merit-based', 'Popularity-based', 'Coalition',
+                            'Reinforcement', 'Herding', 'Bounded Rational'],
     'parameter_to_vary': ['None', 'Number of Members', 'Distribution Rate', 'Participation Rate', 'Annual Funding Addition']
 }
 
@@ -62,6 +91,17 @@ DATA_PATHS = {
     'config_dir': 'data/configs'
 }
 
+# Size budgets for the simulation result cache
+CACHE_SETTINGS = {
+    'memory_bytes': 512 * 1024 ** 2,
+    'disk_bytes': 2 * 1024 ** 3
+}
+
+# Checkpoints of long runs, written under DATA_PATHS['results_dir']
+CHECKPOINT_SETTINGS = {
+    'every_months': 6
+}
+
 # Enable or disable features
 FEATURES = {
     'parallel_processing': True,
@@ -4,15 +4,27 @@ Main entry point for the Council funding simulation.
 """
 
 import os
+import json
 import argparse
+from contextlib import nullcontext
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from models.council import Council
+from models.allocation import STRATEGY_CODES
 from utils.helpers import generate_members, generate_grantees, setup_coalitions
-from utils.simulation_runner import run_simulation, run_batch_simulations
-from config import DEFAULT_CONFIG, DATA_PATHS
+from utils.simulation_runner import (
+    run_simulation, run_batch_simulations, create_batch_configs, iter_batch_simulations,
+    run_network_simulation
+)
+from utils.results_store import ResultStore
+from utils.replay import replay_simulation
+from utils.sweep import run_sweep
+from utils.context import SimulationContext
+from utils.checkpoint import Checkpointer, checkpoint_dir
+from utils.profiling import StageProfiler
+from config import DEFAULT_CONFIG, DATA_PATHS, PARAMETER_RANGES, CHECKPOINT_SETTINGS
 
 def parse_args():
     """Parse command line arguments."""
@@ -40,22 +52,93 @@ def parse_args():
                         default=DEFAULT_CONFIG['annual_funding_addition'],
                         help='Amount to add to the funding pool at the end of each year ($10,000-$1,000,000)')
     
+    parser.add_argument('--num_councils', type=int, default=DEFAULT_CONFIG['num_councils'],
+                        help='Number of councils; above 1 simulates a network of councils sharing members')
+    
+    parser.add_argument('--network_members', type=int, default=DEFAULT_CONFIG['network_members'],
+                        help='Size of the member population shared by a council network (0 = auto)')
+    
     parser.add_argument('--num_grantees', type=int, default=DEFAULT_CONFIG['num_grantees'],
                         help='Number of grantees')
     
     parser.add_argument('--allocation_strategy', type=str, 
                         default=DEFAULT_CONFIG['allocation_strategy'],
-                        choices=['random', 'merit', 'popularity', 'coalition'],
-                        help='Allocation strategy')
+                        choices=list(STRATEGY_CODES),
+                        help='Allocation strategy (reinforcement, herding and bounded_rational '
+                             'learn from month to month)')
+    
+    parser.add_argument('--learning_rate', type=float,
+                        default=DEFAULT_CONFIG['learning_rate'],
+                        help='Adaptive strategies: weight of each month\'s observation (0.0 to 1.0)')
+    
+    parser.add_argument('--exploration_rate', type=float,
+                        default=DEFAULT_CONFIG['exploration_rate'],
+                        help='Reinforcement and herding: share of voting power split equally (0.0 to 1.0)')
+    
+    parser.add_argument('--rationality', type=float,
+                        default=DEFAULT_CONFIG['rationality'],
+                        help='Bounded rational: logit sensitivity to learned attractions')
+    
+    parser.add_argument('--perception_noise', type=float,
+                        default=DEFAULT_CONFIG['perception_noise'],
+                        help='Bounded rational: standard deviation of noise in perceived viability')
+    
+    parser.add_argument('--coalition_overlap', type=float,
+                        default=DEFAULT_CONFIG['coalition_overlap'],
+                        help='Fraction of coalition members who also join a second coalition (0.0 to 1.0)')
+    
+    parser.add_argument('--coalition_churn', type=float,
+                        default=DEFAULT_CONFIG['coalition_churn'],
+                        help='Fraction of coalition memberships moving to another coalition each month')
     
     parser.add_argument('--participation_rate', type=float, 
                         default=DEFAULT_CONFIG['participation_rate'],
                         help='Member participation rate (0.0 to 1.0)')
     
+    parser.add_argument('--participation_model', type=str,
+                        default=DEFAULT_CONFIG['participation_model'],
+                        choices=['uniform', 'propensity', 'markov'],
+                        help='Fixed-size uniform sample, per-member propensities, or propensities with month-to-month persistence')
+    
+    parser.add_argument('--participation_heterogeneity', type=float,
+                        default=DEFAULT_CONFIG['participation_heterogeneity'],
+                        help='Spread of per-member participation propensities (0.0 to 1.0)')
+    
+    parser.add_argument('--participation_persistence', type=float,
+                        default=DEFAULT_CONFIG['participation_persistence'],
+                        help='Markov model: correlation of a member\'s activity between months (0.0 to 1.0)')
+    
+    parser.add_argument('--max_allocations_per_member', type=int,
+                        default=DEFAULT_CONFIG['max_allocations_per_member'],
+                        help='Maximum number of grantees each member votes for (0 = no limit)')
+    
+    parser.add_argument('--allocation_storage', type=str,
+                        default=DEFAULT_CONFIG['allocation_storage'],
+                        choices=['auto', 'dense', 'sparse'],
+                        help='Allocation storage (auto uses sparse when allocations are capped)')
+    
     parser.add_argument('--duration_months', type=int, 
                         default=DEFAULT_CONFIG['duration_months'],
                         help='Simulation duration in months')
     
+    parser.add_argument('--time_model', type=str,
+                        default=DEFAULT_CONFIG['time_model'],
+                        choices=['monthly', 'continuous'],
+                        help='Monthly distribution steps or event-driven continuous streaming')
+    
+    parser.add_argument('--vote_resolution_seconds', type=float,
+                        default=DEFAULT_CONFIG['vote_resolution_seconds'],
+                        help='Granularity of vote times in the continuous model (seconds)')
+    
+    parser.add_argument('--unit_arithmetic', type=str,
+                        default=DEFAULT_CONFIG['unit_arithmetic'],
+                        choices=['float', 'exact'],
+                        help='Split funds as floats, or in integer pool units and wei flow rates as on-chain')
+    
+    parser.add_argument('--token_decimals', type=int,
+                        default=DEFAULT_CONFIG['token_decimals'],
+                        help='Decimals of the distributed token with exact unit arithmetic')
+    
     parser.add_argument('--batch', action='store_true',
                         help='Run batch simulations')
     
@@ -67,11 +150,58 @@ def parse_args():
                         default=DEFAULT_CONFIG['num_simulations'],
                         help='Number of simulations to run in batch mode')
     
+    parser.add_argument('--sweep', type=str, nargs='+', default=None,
+                        choices=sorted(PARAMETER_RANGES),
+                        help='Sweep these parameters over their ranges instead of running one simulation')
+    
+    parser.add_argument('--sweep_method', type=str, default='grid',
+                        choices=['grid', 'latin_hypercube', 'sobol'],
+                        help='Sweep design (sobol requires scipy)')
+    
+    parser.add_argument('--sweep_points', type=int, default=64,
+                        help='Number of points for latin_hypercube and sobol sweeps')
+    
+    parser.add_argument('--sweep_levels', type=int, default=5,
+                        help='Values per parameter for grid sweeps')
+    
+    parser.add_argument('--replicates', type=int, default=10,
+                        help='Monte Carlo replicates per sweep point')
+    
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for batch simulations (0 = one per CPU)')
+    
     parser.add_argument('--random_seed', type=int, default=DEFAULT_CONFIG['random_seed'],
                         help='Random seed for reproducibility')
     
+    parser.add_argument('--check_consistency', action='store_true',
+                        help='Verify running allocation totals against a full recompute every month')
+    
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Replay a council event log (.jsonl, .json subgraph export or .parquet)')
+    
+    parser.add_argument('--replay_chunk_size', type=int, default=10000,
+                        help='Number of events read at a time when replaying')
+    
+    parser.add_argument('--onchain_balances', type=str, default=None,
+                        help='JSON file mapping grantee address to wei received from the pool; '
+                             'with exact unit arithmetic, simulated payouts are checked against it')
+    
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each stage of a single run and write a JSON report to the results directory')
+    
+    parser.add_argument('--profile_cprofile', action='store_true',
+                        help='With --profile, also capture the run with cProfile')
+    
+    parser.add_argument('--checkpoint_every', type=int, default=CHECKPOINT_SETTINGS['every_months'],
+                        help='Checkpoint single runs every N months and batches after every run, '
+                             'to the results directory (0 disables checkpoints)')
+    
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, batch or sweep with the same settings from its checkpoint')
+    
     parser.add_argument('--output', type=str, default=None,
-                        help='Output file for simulation results (CSV)')
+                        help='Output file for simulation results (CSV); batch runs written to a path '
+                             'without .csv go to a Parquet result store directory')
     
     return parser.parse_args()
 
@@ -80,14 +210,27 @@ def setup_directories():
     for path in DATA_PATHS.values():
         Path(path).mkdir(parents=True, exist_ok=True)
 
+def create_checkpointer(args, config, **extra):
+    """Checkpointer for a run with these settings, or None when checkpoints are disabled."""
+    if args.checkpoint_every <= 0:
+        if args.resume:
+            print("Checkpoints are disabled (--checkpoint_every 0); starting from the beginning")
+        return None
+    checkpointer = Checkpointer(checkpoint_dir(config, **extra), args.checkpoint_every, resume=args.resume)
+    if args.resume:
+        completed = len(checkpointer.completed_runs())
+        if checkpointer.has_state() or completed:
+            print(f"Resuming from checkpoint {checkpointer.directory}" +
+                  (f" ({completed} runs already complete)" if completed else ""))
+        else:
+            print("No checkpoint found for these settings; starting from the beginning")
+    return checkpointer
+
 def main():
     """Main function to run the simulation."""
     args = parse_args()
     setup_directories()
     
-    # Set random seed for reproducibility
-    np.random.seed(args.random_seed)
-    
     # Create config from arguments
     config = {
         'num_members': args.num_members,
@@ -96,26 +239,97 @@ def main():
         'initial_pool': args.initial_pool,
         'distribution_rate': args.distribution_rate,
         'annual_funding_addition': args.annual_funding_addition,
+        'num_councils': args.num_councils,
+        'network_members': args.network_members,
         'num_grantees': args.num_grantees,
         'allocation_strategy': args.allocation_strategy,
+        'coalition_overlap': args.coalition_overlap,
+        'coalition_churn': args.coalition_churn,
+        'learning_rate': args.learning_rate,
+        'exploration_rate': args.exploration_rate,
+        'rationality': args.rationality,
+        'perception_noise': args.perception_noise,
         'participation_rate': args.participation_rate,
-        'duration_months': args.duration_months
+        'participation_model': args.participation_model,
+        'participation_heterogeneity': args.participation_heterogeneity,
+        'participation_persistence': args.participation_persistence,
+        'max_allocations_per_member': args.max_allocations_per_member,
+        'allocation_storage': args.allocation_storage,
+        'duration_months': args.duration_months,
+        'time_model': args.time_model,
+        'vote_resolution_seconds': args.vote_resolution_seconds,
+        'unit_arithmetic': args.unit_arithmetic,
+        'token_decimals': args.token_decimals,
+        'check_consistency': args.check_consistency,
+        'random_seed': args.random_seed
     }
     
-    if args.batch:
+    if args.sweep:
+        # Sweep parameters, aggregating replicates per point
+        print(f"Sweeping {', '.join(args.sweep)} ({args.sweep_method}, {args.replicates} replicates per point)...")
+        checkpointer = create_checkpointer(
+            args, config, mode='sweep', parameters=args.sweep, method=args.sweep_method,
+            points=args.sweep_points, levels=args.sweep_levels, replicates=args.replicates
+        )
+        results = run_sweep(config, args.sweep, args.sweep_method, args.sweep_points,
+                            args.sweep_levels, args.replicates, args.workers, checkpointer=checkpointer)
+        if checkpointer is not None:
+            checkpointer.clear()
+        print(f"{len(results)} points")
+        print(results[args.sweep + ['final_pool_mean', 'gini_mean', 'gini_ci_low', 'gini_ci_high']].to_string(index=False))
+        
+        if args.output:
+            output_path = args.output
+            if not output_path.endswith('.csv'):
+                output_path += '.csv'
+            results.to_csv(output_path, index=False)
+            print(f"Sweep results saved to {output_path}")
+    elif args.batch and args.output and not args.output.endswith('.csv'):
+        # Write each run to the result store as soon as it finishes
+        print(f"Running {args.num_simulations} simulations varying {args.parameter_to_vary}...")
+        store = ResultStore(args.output)
+        checkpointer = create_checkpointer(
+            args, config, mode='store', output=os.path.abspath(args.output),
+            parameter_to_vary=args.parameter_to_vary, num_simulations=args.num_simulations
+        )
+        state = checkpointer.load_state() if checkpointer is not None else None
+        completed = checkpointer.completed_runs() if checkpointer is not None else {}
+        if state is not None:
+            first_run_id = state['first_run_id']
+        else:
+            first_run_id = store.next_run_id()
+            if checkpointer is not None:
+                checkpointer.save_state({'first_run_id': first_run_id})
+        configs = create_batch_configs(config, args.parameter_to_vary, args.num_simulations)
+        remaining = [i for i in range(len(configs)) if i not in completed]
+        for i, summary in iter_batch_simulations(configs, config['random_seed'], args.workers, run_ids=remaining):
+            store.write_run(first_run_id + i, configs[i], summary, args.parameter_to_vary)
+            if checkpointer is not None:
+                checkpointer.record_run(i)
+        if checkpointer is not None:
+            checkpointer.clear()
+        print(f"Batch simulation results saved to result store {args.output}")
+    elif args.batch:
         # Run batch simulations
         print(f"Running {args.num_simulations} simulations varying {args.parameter_to_vary}...")
-        results = run_batch_simulations(config, args.parameter_to_vary, args.num_simulations)
+        checkpointer = create_checkpointer(
+            args, config, mode='batch', parameter_to_vary=args.parameter_to_vary,
+            num_simulations=args.num_simulations
+        )
+        results = run_batch_simulations(config, args.parameter_to_vary, args.num_simulations, args.workers,
+                                        checkpointer)
+        if checkpointer is not None:
+            checkpointer.clear()
         
         # Save results if output specified
         if args.output:
             output_path = args.output
-            if not output_path.endswith('.csv'):
-                output_path += '.csv'
                 
             # Extract and save data from each simulation
             all_data = []
-            for i, (sim_config, (council, df)) in enumerate(zip(results['configs'], results['results'])):
+            for i, (sim_config, summary) in enumerate(zip(results['configs'], results['summaries'])):
+                df = summary['history']
+                
                 # Add simulation index and parameter value
                 if args.parameter_to_vary == "Number of Members":
                     param_value = sim_config['num_members']
@@ -135,10 +349,61 @@ def main():
             combined_df = pd.concat(all_data, ignore_index=True)
             combined_df.to_csv(output_path, index=False)
             print(f"Batch simulation results saved to {output_path}")
+    elif args.num_councils > 1:
+        # Simulate a network of councils sharing members
+        print(f"Running {args.num_councils} councils sharing members...")
+        network, df = run_network_simulation(config)
+        summary = network.summary()
+        
+        print("\nNetwork Summary:")
+        print(f"Councils: {summary['councils']}")
+        print(f"Members: {summary['members']} ({summary['seats']} seats)")
+        print(f"Members on several councils: {summary['multi_council_members']:.1%}, "
+              f"steering {summary['multi_council_funding_share']:.1%} of funding")
+        print(f"Mean members shared per pair of councils: {summary['mean_overlap']:.2f}")
+        print(f"Mean Gini: {summary['mean_gini']:.3f}")
+        print(f"Viable grantees: {summary['viable_grantees']} of {int(df['grantees'].sum())}")
+        for token, distributed in summary['total_distributed'].items():
+            print(f"{token}: {distributed:,.2f} distributed, {summary['final_pool'][token]:,.2f} left in pools")
+        
+        if args.output:
+            output_path = args.output
+            if not output_path.endswith('.csv'):
+                output_path += '.csv'
+            df.to_csv(output_path, index=False)
+            print(f"Council results saved to {output_path}")
     else:
-        # Run single simulation
-        print("Running single simulation...")
-        council, df = run_simulation(config)
+        if args.replay:
+            # Replay a recorded event log
+            print(f"Replaying {args.replay}...")
+            council, df = replay_simulation(args.replay, config, args.replay_chunk_size)
+            for kind, count in df.attrs['skipped_events'].items():
+                print(f"Skipped {count} {kind} events referencing unknown members or grantees")
+        elif args.profile:
+            # Run single simulation with per-stage timing
+            print("Running single simulation (profiled)...")
+            profiler = StageProfiler()
+            capture = profiler.capture() if args.profile_cprofile else nullcontext()
+            with capture:
+                council, df = run_simulation(config, SimulationContext(config['random_seed'], profiler))
+            
+            print("\nStage Profile:")
+            print(profiler.format_report())
+            report_path = os.path.join(DATA_PATHS['results_dir'], 'profile.json')
+            profiler.to_json(report_path)
+            print(f"Profile report saved to {report_path}")
+            if profiler.profile is not None:
+                stats_path = os.path.join(DATA_PATHS['results_dir'], 'profile.prof')
+                profiler.profile.dump_stats(stats_path)
+                print(f"\ncProfile (saved to {stats_path}):")
+                print(profiler.profile_stats)
+        else:
+            # Run single simulation, checkpointing every few months
+            print("Running single simulation...")
+            checkpointer = create_checkpointer(args, config, mode='single')
+            council, df = run_simulation(config, checkpointer=checkpointer)
+            if checkpointer is not None:
+                checkpointer.clear()
         
         # Print summary
         print("\nSimulation Summary:")
@@ -147,6 +412,18 @@ def main():
         print(f"Total Distributed: ${df['pool_balance'].iloc[0] - df['pool_balance'].iloc[-1]:,.2f}")
         print(f"Number of Members: {len(council.members)}")
         print(f"Number of Grantees: {len(council.grantees)}")
+        if council.ledger is not None:
+            dust = council.ledger.month_frame()['dust_wei'].sum()
+            print(f"Rounding Dust: {dust:,} wei ({council.ledger.tokens(dust):,.6f} tokens kept in the pool)")
+            
+            if args.onchain_balances:
+                # Check payouts against balances read on-chain
+                with open(args.onchain_balances) as f:
+                    onchain = json.load(f)
+                check = council.ledger.compare_balances(council.history.grantee_ids, onchain)
+                print(f"On-chain Balances: {int(check['matches'].sum())} of {len(check)} grantees match to the wei")
+                for row in check[~check['matches']].itertuples():
+                    print(f"  {row.grantee_id}: simulated {row.simulated_wei} wei, on-chain {row.onchain_wei} wei")
         
         # Save results if output specified
         if args.output:
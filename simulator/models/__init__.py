@@ -1,4 +1,9 @@
 # Models package initialization
 from .council import Council
 from .member import Member
-from .grantee import Grantee 
\ No newline at end of file
+from .grantee import Grantee
+from .allocation_matrix import AllocationMatrix
+from .population import MemberTable, GranteeTable
+from .coalitions import CoalitionIndex
+from .council_network import CouncilNetwork
+from .allocation import AllocationStrategy, StrategyBatch, register_strategy, get_strategy
\ No newline at end of file
@@ -0,0 +1,200 @@
+import numpy as np
+from typing import Dict, Any, Optional
+
+from .allocation import STRATEGY_CODES
+
+# Strategies whose allocation weights are learned from month to month
+ADAPTIVE_STRATEGIES = ('reinforcement', 'herding', 'bounded_rational')
+
+class AdaptiveBehavior:
+    """
+    Learned allocation weights of adaptive members.
+
+    Every member has a row of a (members x grantees) float weight matrix,
+    and each month all adaptive rows are updated at once from what the
+    council observed:
+
+    - reinforcement: Roth-Erev learning. Weights decay by the learning
+      rate, and each member's share of voting power on a viable grantee
+      is added back, so members pile onto grantees that reached their
+      funding threshold. Members allocate in proportion to their weights,
+      mixed with an equal split by the exploration rate.
+    - herding: weights move towards the council's total allocation shares
+      of the month, so members follow the crowd.
+    - bounded_rational: weights are attractions moving towards a noisy
+      perception of viability, and members allocate by a logit (quantal
+      response) choice over them, rationality setting how sharply they
+      prefer the most attractive grantees.
+
+    Like participation models, the behavior is told about membership and
+    grantee changes, keeping the matrix aligned with the allocation store.
+    """
+
+    def __init__(self, num_members: int, num_grantees: int, learning_rate: float = 0.2,
+                 exploration: float = 0.05, rationality: float = 5.0, noise: float = 0.1):
+        """
+        Initialize an AdaptiveBehavior instance.
+
+        Parameters:
+        -----------
+        num_members : int
+            Number of members
+        num_grantees : int
+            Number of grantees
+        learning_rate : float
+            Weight given to each month's observation (0.0 to 1.0)
+        exploration : float
+            Share of voting power reinforcement and herding members split
+            equally (0.0 to 1.0)
+        rationality : float
+            Logit sensitivity of bounded_rational members (0 splits equally)
+        noise : float
+            Standard deviation of bounded_rational members' perception noise
+        """
+        self.learning_rate = float(np.clip(learning_rate, 0.0, 1.0))
+        self.exploration = float(np.clip(exploration, 0.0, 1.0))
+        self.rationality = rationality
+        self.noise = noise
+        self.weights = np.full((num_members, num_grantees), 1.0 / max(num_grantees, 1))
+
+    def shares(self, rows: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Allocation shares of adaptive members.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows
+        codes : numpy.ndarray
+            Strategy code of each member in rows
+
+        Returns:
+        --------
+        numpy.ndarray
+            Float (len(rows) x grantees) matrix whose rows sum to 1
+        """
+        weights = self.weights[rows]
+        num_grantees = weights.shape[1]
+        shares = np.empty_like(weights)
+
+        logit = codes == STRATEGY_CODES['bounded_rational']
+        if logit.any():
+            scores = self.rationality * weights[logit]
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            shares[logit] = scores / scores.sum(axis=1, keepdims=True)
+
+        proportional = ~logit
+        if proportional.any():
+            weights = weights[proportional]
+            total = weights.sum(axis=1, keepdims=True)
+            normalized = np.divide(weights, total, out=np.full_like(weights, 1.0 / num_grantees), where=total > 0)
+            shares[proportional] = (1.0 - self.exploration) * normalized + self.exploration / num_grantees
+        return shares
+
+    def observe(self, allocations: Any, viable: np.ndarray, rng: np.random.Generator):
+        """
+        Update the weights of every adaptive member from a month's outcome.
+
+        Parameters:
+        -----------
+        allocations : AllocationMatrix
+            Allocation store holding the members' current votes
+        viable : numpy.ndarray
+            Boolean vector, True for grantees that reached their funding
+            threshold
+        rng : numpy.random.Generator
+            Random number generator for perception noise
+        """
+        codes = allocations.strategy_codes
+        rate = self.learning_rate
+        viable = np.asarray(viable, dtype=float)
+
+        reinforcing = codes == STRATEGY_CODES['reinforcement']
+        if reinforcing.any():
+            self.weights[reinforcing] *= 1.0 - rate
+            rows, cols, amounts = allocations.nonzero_entries()
+            rewarded = reinforcing[rows] & (viable[cols] > 0)
+            rows, cols, amounts = rows[rewarded], cols[rewarded], amounts[rewarded]
+            # Votes hold one entry per (member, grantee), so the update needs no accumulation
+            self.weights[rows, cols] += rate * amounts / np.maximum(allocations.voting_power[rows], 1)
+
+        herding = codes == STRATEGY_CODES['herding']
+        totals = allocations.totals()
+        if herding.any() and totals.sum() > 0:
+            self.weights[herding] = (1.0 - rate) * self.weights[herding] + rate * (totals / totals.sum())
+
+        bounded = codes == STRATEGY_CODES['bounded_rational']
+        if bounded.any():
+            perceived = np.broadcast_to(viable, (int(bounded.sum()), len(viable)))
+            if self.noise > 0:
+                perceived = perceived + self.noise * rng.standard_normal(perceived.shape)
+            self.weights[bounded] = (1.0 - rate) * self.weights[bounded] + rate * perceived
+
+    def add_members(self, count: int):
+        """
+        Give members appended to the council equal weights.
+
+        Parameters:
+        -----------
+        count : int
+            Number of new members
+        """
+        num_grantees = self.weights.shape[1]
+        self.weights = np.vstack([self.weights, np.full((count, num_grantees), 1.0 / max(num_grantees, 1))])
+
+    def remove_members(self, rows: np.ndarray):
+        """
+        Drop the weights of removed members.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the removed members
+        """
+        self.weights = np.delete(self.weights, rows, axis=0)
+
+    def add_grantee(self):
+        """Add a weight column for a new grantee, starting at each member's mean weight."""
+        column = self.weights.mean(axis=1, keepdims=True) if self.weights.shape[1] else np.ones((len(self.weights), 1))
+        self.weights = np.hstack([self.weights, column])
+
+    def remove_grantee(self, column: int):
+        """
+        Drop a removed grantee's weight column.
+
+        Parameters:
+        -----------
+        column : int
+            Column of the grantee
+        """
+        self.weights = np.delete(self.weights, column, axis=1)
+
+def create_behavior(config: Dict[str, Any], num_members: int, num_grantees: int) -> Optional[AdaptiveBehavior]:
+    """
+    Build the adaptive behavior a configuration asks for.
+
+    Parameters:
+    -----------
+    config : dict
+        Simulation parameters; 'allocation_strategy', 'learning_rate',
+        'exploration_rate', 'rationality' and 'perception_noise' are used
+    num_members : int
+        Number of members
+    num_grantees : int
+        Number of grantees
+
+    Returns:
+    --------
+    AdaptiveBehavior or None
+        The behavior, or None when the strategy is not adaptive
+    """
+    if config.get('allocation_strategy', 'random') not in ADAPTIVE_STRATEGIES:
+        return None
+    return AdaptiveBehavior(
+        num_members,
+        num_grantees,
+        config.get('learning_rate', 0.2),
+        config.get('exploration_rate', 0.05),
+        config.get('rationality', 5.0),
+        config.get('perception_noise', 0.1)
+    )
@@ -1,143 +1,638 @@
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-def generate_random_allocation(member, grantees: List[Any]) -> Dict[str, int]:
+# Integer codes of the registered strategies, used to select rows in
+# batch; register_strategy gives new strategies the next code
+STRATEGY_CODES = {}
+
+# Unknown strategies fall back to an equal split
+EQUAL_STRATEGY_CODE = -1
+
+# Strategies whose allocation depends only on voting power and static
+# grantee attributes (coalition members also need coalition grantees)
+DETERMINISTIC_CODES = []
+
+# Strategy given the members their own strategy cannot allocate
+FALLBACK_STRATEGY = 'random'
+
+# Registered strategies by code, in the order they allocate
+_STRATEGIES = {}
+
+def strategy_code(strategy: str) -> int:
+    """Return the integer code for a strategy name."""
+    return STRATEGY_CODES.get(strategy, EQUAL_STRATEGY_CODE)
+
+def fix_rounding(votes: np.ndarray, voting_power: np.ndarray, allowed: Optional[np.ndarray] = None) -> np.ndarray:
     """
-    Generate a random allocation of voting power to grantees.
-    
+    Apply Member.allocate's rounding fix-up to a block of allocation rows in place.
+
+    Any excess over voting power is taken from the largest allocation and any
+    remainder is added to the smallest, considering only allowed grantees.
+
     Parameters:
     -----------
-    member : Member
-        The member making the allocation
-    grantees : list
-        List of Grantee objects
-        
+    votes : numpy.ndarray
+        Integer (members x grantees) matrix of truncated allocations
+    voting_power : numpy.ndarray
+        Voting power of each member
+    allowed : numpy.ndarray, optional
+        Boolean (members x grantees) matrix of grantees each row may adjust
+
     Returns:
     --------
-    dict
-        Dictionary mapping grantee_id to allocation amount
+    numpy.ndarray
+        The adjusted votes matrix
     """
-    if not grantees:
-        return {}
-        
-    # Generate random weights
-    weights = np.random.random(len(grantees))
-    weights = weights / weights.sum() * member.voting_power
-    
-    # Create allocation dictionary
-    allocations = {}
-    for i, grantee in enumerate(grantees):
-        allocations[grantee.id] = int(weights[i])
-    
-    # Adjust for rounding errors
-    total_allocated = sum(allocations.values())
-    if total_allocated != member.voting_power:
-        # Add or subtract the difference from the largest allocation
-        diff = member.voting_power - total_allocated
-        max_grantee = max(allocations, key=allocations.get)
-        allocations[max_grantee] += diff
-    
-    return allocations
+    if allowed is None:
+        allowed = np.ones(votes.shape, dtype=bool)
 
-def generate_merit_based_allocation(member, grantees: List[Any]) -> Dict[str, int]:
+    # Ensure we don't allocate more than voting power due to rounding
+    excess = votes.sum(axis=1) - voting_power
+    rows = np.flatnonzero(excess > 0)
+    if len(rows):
+        masked = np.where(allowed[rows], votes[rows], np.iinfo(np.int64).min)
+        votes[rows, masked.argmax(axis=1)] -= excess[rows]
+
+    # Ensure we allocate all voting power
+    remaining = voting_power - votes.sum(axis=1)
+    rows = np.flatnonzero(remaining > 0)
+    if len(rows):
+        masked = np.where(allowed[rows], votes[rows], np.iinfo(np.int64).max)
+        votes[rows, masked.argmin(axis=1)] += remaining[rows]
+
+    return votes
+
+def top_k_mask(weights: np.ndarray, k: int) -> np.ndarray:
     """
-    Generate an allocation based on grantee quality.
-    
+    Mark the k largest weights in each row (ties go to the lower index).
+
     Parameters:
     -----------
-    member : Member
-        The member making the allocation
-    grantees : list
-        List of Grantee objects
-        
+    weights : numpy.ndarray
+        Float (rows x grantees) matrix of weights
+    k : int
+        Number of grantees to keep per row (0 keeps all)
+
     Returns:
     --------
-    dict
-        Dictionary mapping grantee_id to allocation amount
+    numpy.ndarray
+        Boolean (rows x grantees) mask of kept grantees
     """
-    if not grantees:
-        return {}
-        
-    # Calculate total quality
-    total_quality = sum(g.quality for g in grantees)
-    
-    # Create allocation dictionary
-    allocations = {}
-    if total_quality > 0:
-        for grantee in grantees:
-            allocations[grantee.id] = int((grantee.quality / total_quality) * member.voting_power)
-    else:
-        # Equal allocation if no quality information
-        equal_amount = member.voting_power // len(grantees)
-        for grantee in grantees:
-            allocations[grantee.id] = equal_amount
-    
-    # Adjust for rounding errors
-    total_allocated = sum(allocations.values())
-    if total_allocated != member.voting_power and allocations:
-        # Add or subtract the difference from the largest allocation
-        diff = member.voting_power - total_allocated
-        max_grantee = max(allocations, key=allocations.get)
-        allocations[max_grantee] += diff
-    
-    return allocations
+    if k <= 0 or k >= weights.shape[1]:
+        return np.ones(weights.shape, dtype=bool)
 
-def generate_popularity_based_allocation(member, grantees: List[Any]) -> Dict[str, int]:
+    # k-th largest weight per row via partial sort, then resolve ties by index
+    threshold = -np.partition(-weights, k - 1, axis=1)[:, k - 1:k]
+    above = weights > threshold
+    ties = weights == threshold
+    needed = k - above.sum(axis=1, keepdims=True)
+    return above | (ties & (np.cumsum(ties, axis=1) <= needed))
+
+def first_k_mask(mask: np.ndarray, k: int) -> np.ndarray:
     """
-    Generate an allocation based on grantee popularity.
-    
+    Keep only the first k True entries of each row of a boolean mask.
+
     Parameters:
     -----------
-    member : Member
-        The member making the allocation
-    grantees : list
-        List of Grantee objects
-        
+    mask : numpy.ndarray
+        Boolean (rows x grantees) mask
+    k : int
+        Number of entries to keep per row (0 keeps all)
+
     Returns:
     --------
-    dict
-        Dictionary mapping grantee_id to allocation amount
+    numpy.ndarray
+        Boolean (rows x grantees) mask
     """
-    if not grantees:
-        return {}
-        
-    # Calculate total popularity
-    total_popularity = sum(g.popularity for g in grantees)
-    
-    # Create allocation dictionary
-    allocations = {}
-    if total_popularity > 0:
-        for grantee in grantees:
-            allocations[grantee.id] = int((grantee.popularity / total_popularity) * member.voting_power)
-    else:
-        # Equal allocation if no popularity information
-        equal_amount = member.voting_power // len(grantees)
-        for grantee in grantees:
-            allocations[grantee.id] = equal_amount
-    
-    # Adjust for rounding errors
-    total_allocated = sum(allocations.values())
-    if total_allocated != member.voting_power and allocations:
-        # Add or subtract the difference from the largest allocation
-        diff = member.voting_power - total_allocated
-        max_grantee = max(allocations, key=allocations.get)
-        allocations[max_grantee] += diff
-    
-    return allocations
+    if k <= 0:
+        return mask
+    return mask & (np.cumsum(mask, axis=1) <= k)
 
-def generate_coalition_allocation(member, grantees: List[Any], coalition_grantees: List[str]) -> Dict[str, int]:
+def largest_remainder(shares: np.ndarray, voting_power: np.ndarray, allowed: np.ndarray,
+                      rng: np.random.Generator) -> np.ndarray:
     """
-    Generate an allocation based on coalition preferences.
-    
+    Round share rows to whole votes by the largest remainder method.
+
+    Votes are rounded down and the units left over go one each to the
+    grantees with the largest fractional parts. Equal fractions are ordered
+    at random, so an even split does not favour the first grantees, which
+    matters for strategies that learn from the totals.
+
+    Parameters:
+    -----------
+    shares : numpy.ndarray
+        Float (members x grantees) shares, each row summing to 1
+    voting_power : numpy.ndarray
+        Voting power of each member
+    allowed : numpy.ndarray
+        Boolean (members x grantees) mask of grantees that may get votes
+    rng : numpy.random.Generator
+        Random number generator for ordering equal fractions
+
+    Returns:
+    --------
+    numpy.ndarray
+        Integer (members x grantees) matrix of votes, each row summing to
+        the member's voting power
+    """
+    raw = shares * voting_power[:, None]
+    votes = np.floor(raw).astype(np.int64)
+    left_over = voting_power - votes.sum(axis=1)
+    fractions = np.round(raw - votes, 9) + rng.random(raw.shape) * 1e-10
+    order = np.argsort(np.where(allowed, -fractions, np.inf), axis=1)
+    bonus = np.arange(raw.shape[1])[None, :] < left_over[:, None]
+    np.put_along_axis(votes, order, np.take_along_axis(votes, order, axis=1) + bonus, axis=1)
+    return votes
+
+def proportional_allocation(voting_power: np.ndarray, shares: np.ndarray,
+                            allowed: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Allocate voting power proportionally to a fixed weight vector.
+
+    Rows depend only on voting power, so they are computed once per distinct
+    voting power and gathered, which keeps merit and popularity allocations
+    to a few array operations even for very large councils.
+
+    Parameters:
+    -----------
+    voting_power : numpy.ndarray
+        Voting power of each member
+    shares : numpy.ndarray
+        Normalized weight of each grantee
+    allowed : numpy.ndarray, optional
+        Boolean vector of grantees the rounding fix-up may adjust
+
+    Returns:
+    --------
+    numpy.ndarray
+        Integer (members x grantees) matrix of allocations
+    """
+    unique_power, inverse = np.unique(voting_power, return_inverse=True)
+    unique_votes = np.trunc(shares[None, :] * unique_power[:, None]).astype(np.int64)
+    if allowed is not None:
+        allowed = np.broadcast_to(allowed, unique_votes.shape)
+    fix_rounding(unique_votes, unique_power, allowed)
+    return unique_votes[inverse.ravel()]
+
+class StrategyBatch:
+    """
+    Members allocating together with one strategy, and what they see.
+
+    Arrays with one entry per member follow the order of rows. quality
+    and popularity are per-grantee vectors, or (members x grantees)
+    matrices when the members sit on different councils, in which case
+    valid marks each row's real grantee columns. Optional inputs are None
+    when the caller has none.
+    """
+
+    def __init__(self, rows: np.ndarray, voting_power: np.ndarray, rng: np.random.Generator,
+                 quality: np.ndarray, popularity: np.ndarray, valid: Optional[np.ndarray] = None,
+                 max_allocations: int = 0, coalition_mask: Optional[np.ndarray] = None,
+                 coalition_votes: Optional[np.ndarray] = None, adaptive_shares: Optional[np.ndarray] = None):
+        """
+        Initialize a StrategyBatch instance.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows (or seats) in the caller's store
+        voting_power : numpy.ndarray
+            Voting power of each member
+        rng : numpy.random.Generator
+            Random number generator
+        quality : numpy.ndarray
+            Grantee quality
+        popularity : numpy.ndarray
+            Grantee popularity
+        valid : numpy.ndarray, optional
+            Boolean (members x grantees) mask of each member's real grantees
+        max_allocations : int
+            Maximum number of grantees per member (0 for no limit)
+        coalition_mask : numpy.ndarray, optional
+            Boolean (members x grantees) coalition grantees of each member
+        coalition_votes : numpy.ndarray, optional
+            Coalition allocations from coalition_allocation
+        adaptive_shares : numpy.ndarray, optional
+            Float (members x grantees) learned shares of adaptive members
+        """
+        self.rows = rows
+        self.voting_power = voting_power
+        self.rng = rng
+        self.quality = quality
+        self.popularity = popularity
+        self.valid = valid
+        self.max_allocations = max_allocations
+        self.coalition_mask = coalition_mask
+        self.coalition_votes = coalition_votes
+        self.adaptive_shares = adaptive_shares
+
+    def __len__(self) -> int:
+        return len(self.voting_power)
+
+    @property
+    def num_grantees(self) -> int:
+        return np.shape(self.quality)[-1]
+
+    def allowed(self) -> np.ndarray:
+        """Boolean (members x grantees) mask of the grantees each member may vote for."""
+        if self.valid is not None:
+            return self.valid
+        return np.ones((len(self), self.num_grantees), dtype=bool)
+
+    def subset(self, selected: np.ndarray) -> 'StrategyBatch':
+        """
+        Batch of some of the members.
+
+        Parameters:
+        -----------
+        selected : numpy.ndarray
+            Positions (or a boolean mask) of the members to keep
+
+        Returns:
+        --------
+        StrategyBatch
+            The members' batch
+        """
+        def rows_of(values):
+            return None if values is None else values[selected]
+
+        def grantee_rows_of(values):
+            return values[selected] if np.ndim(values) == 2 else values
+
+        return StrategyBatch(
+            self.rows[selected], self.voting_power[selected], self.rng,
+            grantee_rows_of(self.quality), grantee_rows_of(self.popularity), rows_of(self.valid),
+            self.max_allocations, rows_of(self.coalition_mask), rows_of(self.coalition_votes),
+            rows_of(self.adaptive_shares)
+        )
+
+class AllocationStrategy:
+    """
+    Batched allocation strategy.
+
+    A strategy turns a whole batch of members into allocation rows in one
+    call: the engine (batch_allocate) groups the members of a batch by
+    strategy, so a strategy costs a few array operations per batch however
+    many members use it. Subclass it and register an instance with
+    register_strategy to make a new strategy available to councils,
+    council networks and Member.allocate.
+    """
+
+    # Whether rows depend only on voting power and grantee attributes that
+    # stay fixed during a run; allocation stores then skip members whose
+    # row is already up to date
+    deterministic = False
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        """
+        Allocate the voting power of a batch of members.
+
+        Parameters:
+        -----------
+        batch : StrategyBatch
+            The members and what they see
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer (members x grantees) matrix of allocations, each row
+            summing to the member's voting power (see fix_rounding)
+        """
+        raise NotImplementedError
+
+    def fallback(self, batch: StrategyBatch) -> Optional[np.ndarray]:
+        """
+        Members the strategy cannot allocate, who use FALLBACK_STRATEGY.
+
+        Parameters:
+        -----------
+        batch : StrategyBatch
+            The members and what they see
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Boolean mask over the batch, or None when every member can be
+            allocated
+        """
+        return None
+
+class RandomStrategy(AllocationStrategy):
+    """
+    Random weights per member, drawn in one bulk draw consumed in member
+    order. With max_allocations set, members keep their largest weights.
+    """
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        weights = batch.rng.random((len(batch), batch.num_grantees))
+        allowed = batch.allowed()
+        if batch.valid is not None:
+            weights = np.where(allowed, weights, 0.0)
+        if batch.max_allocations:
+            allowed = allowed & top_k_mask(weights, batch.max_allocations)
+            weights = np.where(allowed, weights, 0.0)
+        weights = weights / weights.sum(axis=1, keepdims=True) * batch.voting_power[:, None]
+        return fix_rounding(np.trunc(weights).astype(np.int64), batch.voting_power, allowed)
+
+class ProportionalStrategy(AllocationStrategy):
+    """
+    Voting power split in proportion to a grantee attribute (merit uses
+    quality, popularity popularity), or equally when every score is zero.
+    With max_allocations set, members keep the highest scoring grantees;
+    members on different councils are not capped.
+    """
+
+    deterministic = True
+
+    def __init__(self, attribute: str):
+        """
+        Initialize a ProportionalStrategy instance.
+
+        Parameters:
+        -----------
+        attribute : str
+            StrategyBatch attribute holding the scores ('quality' or
+            'popularity')
+        """
+        self.attribute = attribute
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        scores = np.asarray(getattr(batch, self.attribute), dtype=float)
+        voting_power = batch.voting_power
+        if scores.ndim == 2:
+            return self._allocate_councils(batch, scores)
+
+        keep = top_k_mask(scores[None, :], batch.max_allocations)[0]
+        total_score = sum(float(s) for s in scores[keep])
+        if total_score > 0:
+            shares = np.where(keep, scores, 0.0) / total_score
+            return proportional_allocation(voting_power, shares, keep)
+        keep = first_k_mask(np.ones((1, batch.num_grantees), dtype=bool), batch.max_allocations)[0]
+        votes = np.where(keep, (voting_power // keep.sum())[:, None], 0)
+        return fix_rounding(votes, voting_power, np.broadcast_to(keep, votes.shape))
+
+    @staticmethod
+    def _allocate_councils(batch: StrategyBatch, scores: np.ndarray) -> np.ndarray:
+        """Allocate members whose scores differ by council."""
+        voting_power = batch.voting_power
+        valid = batch.allowed()
+        scores = np.where(valid, scores, 0.0)
+        totals = scores.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(totals > 0, scores / totals, 0.0)
+        proportional = np.trunc(shares * voting_power[:, None]).astype(np.int64)
+        # Councils without scores split equally
+        equal = np.where(valid, (voting_power // valid.sum(axis=1))[:, None], 0)
+        return fix_rounding(np.where(totals > 0, proportional, equal), voting_power, valid)
+
+class CoalitionStrategy(AllocationStrategy):
+    """
+    Voting power split equally among the member's coalition grantees (the
+    first max_allocations of them when capped), or as precomputed by
+    coalition_allocation for members of several coalitions. Members
+    without coalition grantees fall back to random.
+    """
+
+    @staticmethod
+    def _mask(batch: StrategyBatch) -> np.ndarray:
+        if batch.coalition_votes is not None:
+            return batch.coalition_mask
+        return first_k_mask(batch.coalition_mask, batch.max_allocations)
+
+    def fallback(self, batch: StrategyBatch) -> Optional[np.ndarray]:
+        if batch.coalition_mask is None:
+            return np.ones(len(batch), dtype=bool)
+        return ~self._mask(batch).any(axis=1)
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        mask = self._mask(batch)
+        if batch.coalition_votes is not None:
+            votes = np.array(batch.coalition_votes, dtype=np.int64)
+        else:
+            votes = np.where(mask, (batch.voting_power // mask.sum(axis=1))[:, None], 0)
+        return fix_rounding(votes, batch.voting_power, mask)
+
+class AdaptiveStrategy(AllocationStrategy):
+    """
+    Voting power split by shares learned from month to month (see
+    models/adaptive.py), rounded by the largest remainder method; members
+    without learned shares split equally. With max_allocations set,
+    members keep their largest shares.
+    """
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        allowed = batch.allowed()
+        if batch.adaptive_shares is None:
+            shares = allowed / allowed.sum(axis=1, keepdims=True)
+        else:
+            shares = np.asarray(batch.adaptive_shares, dtype=float)
+        keep = allowed
+        if batch.max_allocations:
+            # Equal shares are kept at random rather than by grantee position
+            keep = allowed & top_k_mask(shares + batch.rng.random(shares.shape) * 1e-12, batch.max_allocations)
+            shares = np.where(keep, shares, 0.0)
+            shares = shares / shares.sum(axis=1, keepdims=True)
+        return largest_remainder(shares, batch.voting_power, keep, batch.rng)
+
+class EqualSplitStrategy(AllocationStrategy):
+    """Voting power split equally among all grantees (the first max_allocations when capped)."""
+
+    deterministic = True
+
+    def allocate(self, batch: StrategyBatch) -> np.ndarray:
+        keep = first_k_mask(batch.allowed(), batch.max_allocations)
+        votes = np.where(keep, (batch.voting_power // keep.sum(axis=1))[:, None], 0)
+        return fix_rounding(votes, batch.voting_power, keep)
+
+def register_strategy(name: str, strategy: AllocationStrategy, code: Optional[int] = None) -> int:
+    """
+    Make a strategy available by name.
+
+    Parameters:
+    -----------
+    name : str
+        Strategy name, as given to Member, MemberTable and
+        config['allocation_strategy']
+    strategy : AllocationStrategy
+        The strategy
+    code : int, optional
+        Integer code of the strategy (defaults to the next free code)
+
+    Returns:
+    --------
+    int
+        The strategy's code
+    """
+    if name in STRATEGY_CODES:
+        raise ValueError(f"Strategy already registered: {name}")
+    if not isinstance(strategy, AllocationStrategy):
+        raise TypeError(f"Strategy {name} must be an AllocationStrategy, got {type(strategy).__name__}")
+    if code is None:
+        code = max(_STRATEGIES, default=-1) + 1
+    elif code in _STRATEGIES:
+        raise ValueError(f"Strategy code {code} is already used")
+
+    STRATEGY_CODES[name] = code
+    _STRATEGIES[code] = strategy
+    if strategy.deterministic:
+        DETERMINISTIC_CODES.append(code)
+    return code
+
+def get_strategy(name: str) -> AllocationStrategy:
+    """
+    Look up a registered strategy.
+
+    Parameters:
+    -----------
+    name : str
+        Strategy name (unknown names give the equal split)
+
+    Returns:
+    --------
+    AllocationStrategy
+        The strategy
+    """
+    return _STRATEGIES[strategy_code(name)]
+
+# Built-in strategies; random allocates first, so its bulk draw comes
+# before any other strategy's
+register_strategy('random', RandomStrategy())
+register_strategy('merit', ProportionalStrategy('quality'))
+register_strategy('popularity', ProportionalStrategy('popularity'))
+register_strategy('coalition', CoalitionStrategy())
+register_strategy('reinforcement', AdaptiveStrategy())
+register_strategy('herding', AdaptiveStrategy())
+register_strategy('bounded_rational', AdaptiveStrategy())
+register_strategy('equal', EqualSplitStrategy(), EQUAL_STRATEGY_CODE)
+
+# Strategies allocating by weights learned from month to month (see
+# models/adaptive.py)
+ADAPTIVE_CODES = (
+    STRATEGY_CODES['reinforcement'],
+    STRATEGY_CODES['herding'],
+    STRATEGY_CODES['bounded_rational']
+)
+
+def batch_allocate(
+    voting_power: np.ndarray,
+    strategy_codes: np.ndarray,
+    quality: np.ndarray,
+    popularity: np.ndarray,
+    coalition_mask: Optional[np.ndarray] = None,
+    rng: Optional[np.random.Generator] = None,
+    max_allocations: int = 0,
+    coalition_votes: Optional[np.ndarray] = None,
+    adaptive_shares: Optional[np.ndarray] = None,
+    valid: Optional[np.ndarray] = None,
+    rows: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Allocate voting power for a batch of members in one vectorized pass.
+
+    Members are grouped by strategy and every registered strategy
+    allocates its group in one call, in registration order (random first,
+    so its bulk draw is consumed in member order). Members a strategy
+    cannot allocate (coalition members without coalition grantees) join
+    the random group first.
+
+    With max_allocations set, each member votes for at most that many
+    grantees, as Council.allocateBudget enforces with maxAllocationsPerMember:
+    random members keep their largest weights, merit and popularity members
+    the highest scoring grantees, coalition and equal-split members the
+    first grantees of their list, and adaptive members their largest
+    learned shares.
+
+    Parameters:
+    -----------
+    voting_power : numpy.ndarray
+        Voting power of each member in the batch
+    strategy_codes : numpy.ndarray
+        Strategy code of each member (see STRATEGY_CODES)
+    quality : numpy.ndarray
+        Quality of each grantee, or (members x grantees) quality of each
+        member's council's grantees
+    popularity : numpy.ndarray
+        Popularity of each grantee, laid out like quality
+    coalition_mask : numpy.ndarray, optional
+        Boolean (members x grantees) matrix of coalition grantees per member
+    rng : numpy.random.Generator, optional
+        Random number generator
+    max_allocations : int
+        Maximum number of grantees per member (0 for no limit)
+    coalition_votes : numpy.ndarray, optional
+        Coalition members' allocations from coalition_allocation, which
+        also gives coalition_mask; without them each member splits their
+        voting power equally over coalition_mask
+    adaptive_shares : numpy.ndarray, optional
+        Float (members x grantees) allocation shares of adaptive members
+        (see AdaptiveBehavior.shares); without them adaptive members start
+        from an equal split
+    valid : numpy.ndarray, optional
+        Boolean (members x grantees) mask of each member's real grantee
+        columns, when members of different councils share a padded batch
+    rows : numpy.ndarray, optional
+        Member rows in the caller's store, passed on to strategies
+        (defaults to positions in the batch)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Integer (members x grantees) matrix of allocations
+    """
+    rng = rng or np.random.default_rng()
+    voting_power = np.asarray(voting_power, dtype=np.int64)
+    codes = np.array(strategy_codes, dtype=np.int64)
+    num_members = len(voting_power)
+    num_grantees = np.shape(quality)[-1]
+
+    votes = np.zeros((num_members, num_grantees), dtype=np.int64)
+    if num_members == 0 or num_grantees == 0:
+        return votes
+
+    rows = np.arange(num_members) if rows is None else np.asarray(rows, dtype=np.int64)
+    batch = StrategyBatch(
+        rows, voting_power, rng, quality, popularity, valid, max_allocations,
+        coalition_mask, coalition_votes, adaptive_shares
+    )
+    codes[~np.isin(codes, list(_STRATEGIES))] = EQUAL_STRATEGY_CODE
+
+    # Members their strategy cannot allocate fall back to random
+    for code, strategy in _STRATEGIES.items():
+        selected = np.flatnonzero(codes == code)
+        if len(selected):
+            fallback = strategy.fallback(batch.subset(selected))
+            if fallback is not None:
+                codes[selected[fallback]] = STRATEGY_CODES[FALLBACK_STRATEGY]
+
+    for code, strategy in _STRATEGIES.items():
+        selected = np.flatnonzero(codes == code)
+        if len(selected):
+            votes[selected] = strategy.allocate(batch.subset(selected))
+    return votes
+
+def allocate_member(member: Any, grantees: List[Any], strategy: Optional[str] = None,
+                    rng: Optional[np.random.Generator] = None,
+                    coalition: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Allocate one member's voting power with a registered strategy.
+
+    Per-member adapter over batch_allocate for code working with Member
+    and Grantee objects; the allocation equals the member's row of a
+    batch.
+
     Parameters:
     -----------
     member : Member
         The member making the allocation
     grantees : list
         List of Grantee objects
-    coalition_grantees : list
-        List of grantee IDs in the coalition
-        
+    strategy : str, optional
+        Strategy name (defaults to the member's strategy)
+    rng : numpy.random.Generator, optional
+        Random number generator
+    coalition : list, optional
+        Coalition grantee ids (defaults to the member's coalition)
+
     Returns:
     --------
     dict
@@ -145,55 +640,55 @@ def generate_coalition_allocation(member, grantees: List[Any], coalition_grantee
     """
     if not grantees:
         return {}
-        
-    # Filter grantees in the coalition
-    coalition_grantees_objs = [g for g in grantees if g.id in coalition_grantees]
-    
-    # If no coalition grantees present, fall back to random allocation
-    if not coalition_grantees_objs:
-        return generate_random_allocation(member, grantees)
-    
-    # Create allocation dictionary
-    allocations = {}
-    equal_amount = member.voting_power // len(coalition_grantees_objs)
-    
-    for grantee in grantees:
-        if grantee.id in coalition_grantees:
-            allocations[grantee.id] = equal_amount
-        else:
-            allocations[grantee.id] = 0
-    
-    # Adjust for rounding errors
-    total_allocated = sum(allocations.values())
-    if total_allocated != member.voting_power and allocations:
-        # Add or subtract the difference from the first coalition grantee
-        diff = member.voting_power - total_allocated
-        for grantee_id in coalition_grantees:
-            if grantee_id in allocations:
-                allocations[grantee_id] += diff
-                break
-    
-    return allocations
+
+    coalition = coalition if coalition is not None else member.coalition
+    coalition_mask = None
+    if coalition:
+        coalition = set(coalition)
+        coalition_mask = np.array([[g.id in coalition for g in grantees]], dtype=bool)
+    votes = batch_allocate(
+        [member.voting_power],
+        [strategy_code(strategy or member.strategy)],
+        np.array([g.quality for g in grantees], dtype=float),
+        np.array([g.popularity for g in grantees], dtype=float),
+        coalition_mask,
+        rng
+    )
+    return dict(zip([g.id for g in grantees], votes[0].tolist()))
+
+def generate_random_allocation(member, grantees: List[Any], rng: Optional[np.random.Generator] = None) -> Dict[str, int]:
+    """Random allocation of one member (see allocate_member)."""
+    return allocate_member(member, grantees, 'random', rng)
+
+def generate_merit_based_allocation(member, grantees: List[Any]) -> Dict[str, int]:
+    """Allocation of one member in proportion to grantee quality (see allocate_member)."""
+    return allocate_member(member, grantees, 'merit')
+
+def generate_popularity_based_allocation(member, grantees: List[Any]) -> Dict[str, int]:
+    """Allocation of one member in proportion to grantee popularity (see allocate_member)."""
+    return allocate_member(member, grantees, 'popularity')
+
+def generate_coalition_allocation(member, grantees: List[Any], coalition_grantees: List[str],
+                                  rng: Optional[np.random.Generator] = None) -> Dict[str, int]:
+    """Allocation of one member split among coalition grantees (see allocate_member)."""
+    return allocate_member(member, grantees, 'coalition', rng, coalition_grantees)
 
 def get_allocation_strategy(strategy_name: str):
     """
-    Get the allocation strategy function by name.
+    Get a per-member allocation function for a registered strategy.
     
     Parameters:
     -----------
     strategy_name : str
-        Name of the allocation strategy
+        Name of the allocation strategy (unknown names give the equal split)
         
     Returns:
     --------
     function
-        The allocation strategy function
-    """
-    strategies = {
-        'random': generate_random_allocation,
-        'merit': generate_merit_based_allocation,
-        'popularity': generate_popularity_based_allocation,
-        'coalition': generate_coalition_allocation
-    }
+        function(member, grantees, rng=None) returning a dictionary
+        mapping grantee_id to allocation amount
+    """
+    def allocate(member, grantees: List[Any], rng: Optional[np.random.Generator] = None) -> Dict[str, int]:
+        return allocate_member(member, grantees, strategy_name, rng)
     
-    return strategies.get(strategy_name, generate_random_allocation) 
\ No newline at end of file
+    return allocate
\ No newline at end of file
@@ -0,0 +1,831 @@
+import numpy as np
+from collections.abc import MutableMapping
+from typing import List, Dict, Any, Optional
+
+# The batched strategy engine lives in models/allocation.py; its names are
+# re-exported here for code importing them from this module
+from .allocation import (
+    STRATEGY_CODES, EQUAL_STRATEGY_CODE, DETERMINISTIC_CODES, ADAPTIVE_CODES, strategy_code,
+    fix_rounding, top_k_mask, first_k_mask, largest_remainder, proportional_allocation, batch_allocate
+)
+from .population import MemberTable, GranteeTable
+
+def _coalition_memberships(voting_power: np.ndarray, positions: np.ndarray, coalitions: np.ndarray,
+                           grantee_mask: np.ndarray, max_allocations: int = 0) -> tuple:
+    """
+    Split each member's voting power over the coalitions that count.
+
+    Coalitions covering no current grantee are ignored, and with
+    max_allocations set each coalition keeps its first max_allocations
+    grantees and a member whose coalitions together cover more keeps only
+    their first coalition. A member's voting power is split equally over
+    their coalitions, the remainder going to the first.
+
+    Returns:
+    --------
+    tuple
+        (positions, coalitions, shares, first membership of each member,
+        capped coalition grantee mask, grantees per coalition)
+    """
+    voting_power = np.asarray(voting_power, dtype=np.int64)
+    grantee_mask = first_k_mask(np.asarray(grantee_mask, dtype=bool), max_allocations)
+    sizes = grantee_mask.sum(axis=1)
+    counted = sizes[coalitions] > 0
+    positions, coalitions = positions[counted], coalitions[counted]
+
+    first = np.ones(len(positions), dtype=bool)
+    first[1:] = positions[1:] != positions[:-1]
+    if max_allocations and len(positions):
+        covered = np.zeros((len(voting_power), grantee_mask.shape[1]), dtype=bool)
+        np.logical_or.at(covered, positions, grantee_mask[coalitions])
+        keep = first | (covered.sum(axis=1) <= max_allocations)[positions]
+        positions, coalitions, first = positions[keep], coalitions[keep], first[keep]
+
+    power = voting_power[positions]
+    count = np.bincount(positions, minlength=len(voting_power))[positions]
+    shares = power // count + np.where(first, power % count, 0)
+    return positions, coalitions, shares, first, grantee_mask, sizes
+
+def _leading_grantee(grantee_mask: np.ndarray) -> np.ndarray:
+    """One-hot rows marking each coalition's first grantee, which takes the rounding remainder."""
+    leading = np.zeros(grantee_mask.shape, dtype=bool)
+    leading[np.arange(len(grantee_mask)), grantee_mask.argmax(axis=1)] = grantee_mask.any(axis=1)
+    return leading
+
+def coalition_allocation(voting_power: np.ndarray, positions: np.ndarray, coalitions: np.ndarray,
+                         grantee_mask: np.ndarray, max_allocations: int = 0) -> tuple:
+    """
+    Allocate the voting power of coalition members over their coalitions.
+
+    Each member's voting power is split equally over their coalitions and
+    each share equally over the coalition's grantees, every remainder going
+    to the first, so a member of a single coalition gets exactly
+    Member.allocate's coalition split.
+
+    Parameters:
+    -----------
+    voting_power : numpy.ndarray
+        Voting power of each member in the batch
+    positions : numpy.ndarray
+        Member (index into voting_power) of each membership, grouped by
+        member as CoalitionIndex.pairs returns them
+    coalitions : numpy.ndarray
+        Coalition of each membership
+    grantee_mask : numpy.ndarray
+        Boolean (coalitions x grantees) matrix of each coalition's grantees
+    max_allocations : int
+        Maximum number of grantees per member (0 for no limit)
+
+    Returns:
+    --------
+    tuple
+        (integer (members x grantees) allocations, boolean (members x
+        grantees) mask of the grantees each member's allocation covers);
+        members with no counted coalition get empty rows
+    """
+    positions, coalitions, shares, first, grantee_mask, sizes = _coalition_memberships(
+        voting_power, positions, coalitions, grantee_mask, max_allocations
+    )
+    num_members = len(voting_power)
+    votes = np.zeros((num_members, grantee_mask.shape[1]), dtype=np.int64)
+    covered = np.zeros(votes.shape, dtype=bool)
+    if len(positions) == 0:
+        return votes, covered
+
+    size = sizes[coalitions]
+    members_mask = grantee_mask[coalitions]
+    membership_votes = (
+        (shares // size)[:, None] * members_mask
+        + (shares % size)[:, None] * _leading_grantee(grantee_mask)[coalitions]
+    )
+    # Memberships are grouped by member, so each member's rows sum in one pass
+    starts = np.flatnonzero(first)
+    votes[positions[starts]] = np.add.reduceat(membership_votes, starts, axis=0)
+    covered[positions[starts]] = np.logical_or.reduceat(members_mask, starts, axis=0)
+    return votes, covered
+
+def coalition_totals(voting_power: np.ndarray, positions: np.ndarray, coalitions: np.ndarray,
+                     grantee_mask: np.ndarray, max_allocations: int = 0,
+                     by_coalition: bool = False) -> np.ndarray:
+    """
+    Total votes coalition members give each grantee, without per-member rows.
+
+    Shares only enter through two sums per coalition (equal parts and
+    remainders), so the totals are one product of those sums with the
+    coalition grantee mask stacked on its first-grantee rows.
+
+    Parameters:
+    -----------
+    voting_power : numpy.ndarray
+        Voting power of each member
+    positions : numpy.ndarray
+        Member (index into voting_power) of each membership, grouped by member
+    coalitions : numpy.ndarray
+        Coalition of each membership
+    grantee_mask : numpy.ndarray
+        Boolean (coalitions x grantees) matrix of each coalition's grantees
+    max_allocations : int
+        Maximum number of grantees per member (0 for no limit)
+    by_coalition : bool
+        Return the totals of each coalition rather than their sum
+
+    Returns:
+    --------
+    numpy.ndarray
+        Integer vector of votes per grantee, or (coalitions x grantees)
+        matrix with by_coalition; equal to the column sums of the
+        coalition_allocation rows
+    """
+    positions, coalitions, shares, _, grantee_mask, sizes = _coalition_memberships(
+        voting_power, positions, coalitions, grantee_mask, max_allocations
+    )
+    num_coalitions = len(grantee_mask)
+    size = sizes[coalitions]
+    # bincount sums in float64, exact while totals stay below 2**53 units
+    equal_parts = np.bincount(coalitions, weights=shares // size, minlength=num_coalitions).astype(np.int64)
+    remainders = np.bincount(coalitions, weights=shares % size, minlength=num_coalitions).astype(np.int64)
+    leading = _leading_grantee(grantee_mask)
+    if by_coalition:
+        return equal_parts[:, None] * grantee_mask + remainders[:, None] * leading
+    return np.concatenate([equal_parts, remainders]) @ np.vstack([grantee_mask, leading]).astype(np.int64)
+
+class AllocationMatrix(MutableMapping):
+    """
+    Allocation store holding every member's votes in one NumPy
+    (members x grantees) integer matrix.
+
+    Behaves like the ``member_id -> {grantee_id: amount}`` dictionary the
+    Council used to keep, so per-member code keeps working, while batched
+    code reads and writes whole row blocks.
+    """
+
+    def __init__(self, members: Optional[List[Any]] = None, grantees: Optional[List[Any]] = None,
+                 max_allocations_per_member: int = 0):
+        """
+        Initialize an AllocationMatrix instance.
+
+        Parameters:
+        -----------
+        members : list or MemberTable
+            Member objects (one matrix row each); a MemberTable is used in
+            place rather than copied
+        grantees : list or GranteeTable
+            Grantee objects (one matrix column each); a GranteeTable is used
+            in place rather than copied
+        max_allocations_per_member : int
+            Maximum number of grantees each member may vote for (0 for no limit)
+        """
+        self.members = members if isinstance(members, MemberTable) else list(members or [])
+        self.grantees = grantees if isinstance(grantees, GranteeTable) else list(grantees or [])
+        self.max_allocations_per_member = max_allocations_per_member
+        self.grantee_ids = self._ids(self.grantees)
+        self.grantee_index = {grantee_id: j for j, grantee_id in enumerate(self.grantee_ids)}
+        self.member_index = {member_id: i for i, member_id in enumerate(self._ids(self.members))}
+        self.has_voted = np.zeros(len(self.members), dtype=bool)
+        self.is_current = np.zeros(len(self.members), dtype=bool)  # deterministic row already up to date
+        self.running_totals = np.zeros(len(self.grantees), dtype=np.int64)  # grantee units, updated by delta
+        self._init_storage()
+        self.refresh()
+
+    def _init_storage(self):
+        """Allocate the dense vote matrix."""
+        self.votes = np.zeros((len(self.members), len(self.grantees)), dtype=np.int64)
+
+    @staticmethod
+    def _ids(entities: Any) -> List[str]:
+        """Return the ids of a list of members or grantees, or of a table."""
+        if isinstance(entities, (MemberTable, GranteeTable)):
+            return entities.ids().tolist()
+        return [entity.id for entity in entities]
+
+    def _member_arrays(self, members: Any):
+        """Build the voting power, strategy, coalition and determinism arrays for members."""
+        if isinstance(members, MemberTable):
+            # Columns are read directly, without a view per member
+            voting_power = members.voting_power.copy()
+            codes = np.array([strategy_code(name) for name in members.strategy_names], dtype=np.int64)
+            strategy_codes = codes[members.strategy]
+            coalition_mask = members.coalitions.covered(np.arange(len(members)), self.coalition_grantees)
+        else:
+            voting_power = np.array([m.voting_power for m in members], dtype=np.int64)
+            strategy_codes = np.array([strategy_code(m.strategy) for m in members], dtype=np.int64)
+
+            coalition_mask = np.zeros((len(members), len(self.grantees)), dtype=bool)
+            for i, member in enumerate(members):
+                if member.coalition:
+                    columns = [self.grantee_index[g] for g in member.coalition if g in self.grantee_index]
+                    coalition_mask[i, columns] = True
+
+        is_coalition = strategy_codes == STRATEGY_CODES['coalition']
+        is_deterministic = (
+            np.isin(strategy_codes, DETERMINISTIC_CODES)
+            | (is_coalition & coalition_mask.any(axis=1))
+        )
+        return voting_power, strategy_codes, coalition_mask, is_deterministic
+
+    def refresh(self):
+        """Re-read member and grantee attributes into the batch arrays."""
+        self._refresh_coalition_grantees()
+        (self.voting_power, self.strategy_codes,
+         self.coalition_mask, self.is_deterministic) = self._member_arrays(self.members)
+        if isinstance(self.grantees, GranteeTable):
+            self.quality = self.grantees.quality.copy()
+            self.popularity = self.grantees.popularity.copy()
+        else:
+            self.quality = np.array([g.quality for g in self.grantees], dtype=float)
+            self.popularity = np.array([g.popularity for g in self.grantees], dtype=float)
+        self.is_current[:] = False
+
+    def _refresh_coalition_grantees(self):
+        """Re-read the grantee mask of every coalition of a MemberTable."""
+        self.coalition_grantees = None
+        if isinstance(self.members, MemberTable):
+            self.coalition_grantees = self.members.coalitions.grantee_mask(self.grantee_index)
+
+    def refresh_coalitions(self, rows: Optional[np.ndarray] = None):
+        """
+        Re-read coalition memberships, coalition grantees and strategies
+        after they changed, so the affected members allocate afresh.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray, optional
+            Rows of the members whose coalitions changed (default all)
+        """
+        if not isinstance(self.members, MemberTable):
+            self.refresh()
+            return
+        self._refresh_coalition_grantees()
+        rows = np.arange(len(self.members)) if rows is None else np.asarray(rows, dtype=np.int64)
+        codes = np.array([strategy_code(name) for name in self.members.strategy_names], dtype=np.int64)
+        strategy_codes = codes[self.members.strategy[rows]]
+        coalition_mask = self.members.coalitions.covered(rows, self.coalition_grantees)
+
+        self.strategy_codes[rows] = strategy_codes
+        self.coalition_mask[rows] = coalition_mask
+        self.is_deterministic[rows] = (
+            np.isin(strategy_codes, DETERMINISTIC_CODES)
+            | ((strategy_codes == STRATEGY_CODES['coalition']) & coalition_mask.any(axis=1))
+        )
+        self.is_current[rows] = False
+
+    def coalition_totals(self, rows: Optional[np.ndarray] = None, by_coalition: bool = False) -> np.ndarray:
+        """
+        Votes that coalition members would give each grantee if they all
+        allocated now, from per-coalition voting power sums.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray, optional
+            Rows of the members to count (default all); members not using
+            the coalition strategy are left out
+        by_coalition : bool
+            Return each coalition's totals rather than their sum
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer vector of votes per grantee, or (coalitions x grantees)
+            matrix with by_coalition
+        """
+        if not isinstance(self.members, MemberTable):
+            raise TypeError("Coalition totals need members stored in a MemberTable")
+        rows = np.arange(len(self.members)) if rows is None else np.asarray(rows, dtype=np.int64)
+        positions, coalitions = self.members.coalitions.pairs(rows)
+        counted = self.strategy_codes[rows][positions] == STRATEGY_CODES['coalition']
+        return coalition_totals(
+            self.voting_power[rows], positions[counted], coalitions[counted],
+            self.coalition_grantees, self.max_allocations_per_member, by_coalition
+        )
+
+    def allocate(self, rows: np.ndarray, rng: Optional[np.random.Generator] = None,
+                 behavior: Optional[Any] = None) -> np.ndarray:
+        """
+        Compute allocations for the given member rows in one batch.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Row indices of the members allocating, in allocation order
+        rng : numpy.random.Generator, optional
+            Random number generator for the random strategy
+        behavior : AdaptiveBehavior, optional
+            Learned weights of adaptive members
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer (len(rows) x grantees) matrix of allocations
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        coalition_mask, coalition_votes = self.coalition_mask[rows], None
+        is_coalition = self.strategy_codes[rows] == STRATEGY_CODES['coalition']
+        if isinstance(self.members, MemberTable) and is_coalition.any():
+            # Members of several coalitions split their voting power over them
+            positions, coalitions = self.members.coalitions.pairs(rows)
+            counted = is_coalition[positions]
+            coalition_votes, coalition_mask = coalition_allocation(
+                self.voting_power[rows], positions[counted], coalitions[counted],
+                self.coalition_grantees, self.max_allocations_per_member
+            )
+        adaptive_shares = None
+        is_adaptive = np.isin(self.strategy_codes[rows], ADAPTIVE_CODES)
+        if behavior is not None and is_adaptive.any():
+            adaptive_shares = np.zeros((len(rows), len(self.grantees)))
+            adaptive_shares[is_adaptive] = behavior.shares(rows[is_adaptive], self.strategy_codes[rows[is_adaptive]])
+        return batch_allocate(
+            self.voting_power[rows],
+            self.strategy_codes[rows],
+            self.quality,
+            self.popularity,
+            coalition_mask,
+            rng,
+            self.max_allocations_per_member,
+            coalition_votes,
+            adaptive_shares,
+            rows=rows
+        )
+
+    def update(self, rows: np.ndarray, rng: Optional[np.random.Generator] = None,
+               behavior: Optional[Any] = None):
+        """
+        Allocate and record votes for a batch of members.
+
+        Members with a deterministic strategy whose stored row is already up
+        to date are skipped: re-allocating would reproduce the same row, so
+        only newly active or changed members cost any work.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Row indices of the members allocating, in allocation order
+        rng : numpy.random.Generator, optional
+            Random number generator for the random strategy
+        behavior : AdaptiveBehavior, optional
+            Learned weights of adaptive members
+
+        Returns:
+        --------
+        tuple
+            (row indices actually updated, their new allocation rows)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[~self.is_current[rows]]
+        votes = self.allocate(rows, rng, behavior)
+        self.record(rows, votes)
+        self.is_current[rows] = self.is_deterministic[rows]
+        return rows, votes
+
+    def record(self, rows: np.ndarray, votes: np.ndarray) -> np.ndarray:
+        """
+        Store allocation rows for a batch of members.
+
+        Running per-grantee totals are updated by delta (subtract the old
+        rows, add the new ones), the same way PoolManager._setAllocation
+        updates pool units on-chain.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Row indices of the members
+        votes : numpy.ndarray
+            Integer (len(rows) x grantees) matrix of allocations
+
+        Returns:
+        --------
+        numpy.ndarray
+            Change in total votes per grantee
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        votes = np.asarray(votes, dtype=np.int64).reshape(len(rows), len(self.grantees))
+        delta = votes.sum(axis=0) - self._rows_sum(rows)
+        self._set_rows(rows, votes)
+        self.has_voted[rows] = True
+        self.is_current[rows] = False
+        self.running_totals += delta
+        return delta
+
+    def totals(self) -> np.ndarray:
+        """
+        Total allocation per grantee over all members.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer vector of total votes per grantee
+        """
+        return self.running_totals.copy()
+
+    def recompute_totals(self) -> np.ndarray:
+        """
+        Recompute total allocation per grantee from every member's row.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer vector of total votes per grantee
+        """
+        return self.votes.sum(axis=0)
+
+    def row_vector(self, row: int) -> np.ndarray:
+        """Return one member's allocation as a dense integer vector."""
+        return self.votes[row].copy()
+
+    def nonzero_entries(self):
+        """
+        Every non-zero vote in row-major order.
+
+        Returns:
+        --------
+        tuple
+            (rows, grantee columns, amounts) integer arrays
+        """
+        rows, cols = np.nonzero(self.votes)
+        return rows, cols, self.votes[rows, cols]
+
+    def group_totals(self, groups: np.ndarray, num_groups: int) -> np.ndarray:
+        """
+        Sum member rows into groups.
+
+        Parameters:
+        -----------
+        groups : numpy.ndarray
+            Group index of every member row
+        num_groups : int
+            Number of groups
+
+        Returns:
+        --------
+        numpy.ndarray
+            (num_groups x grantees) integer matrix of total votes
+        """
+        rows, cols, amounts = self.nonzero_entries()
+        num_grantees = len(self.grantees)
+        flat = groups[rows] * num_grantees + cols
+        # bincount sums in float64, exact while totals stay below 2**53 units
+        totals = np.bincount(flat, weights=amounts, minlength=num_groups * num_grantees)
+        return totals.astype(np.int64).reshape(num_groups, num_grantees)
+
+    def _rows_sum(self, rows: np.ndarray) -> np.ndarray:
+        """Sum the stored allocations of the given rows per grantee."""
+        return self.votes[rows].sum(axis=0)
+
+    def _set_rows(self, rows: np.ndarray, votes: np.ndarray):
+        """Overwrite the stored allocations of the given rows."""
+        self.votes[rows] = votes
+
+    def _append_storage_rows(self, count: int):
+        """Grow the storage by `count` empty member rows."""
+        self.votes = np.vstack([self.votes, np.zeros((count, len(self.grantees)), dtype=np.int64)])
+
+    def _delete_storage_rows(self, rows: np.ndarray):
+        """Remove (already zeroed) member rows from the storage."""
+        self.votes = np.delete(self.votes, rows, axis=0)
+
+    def _append_storage_column(self):
+        """Grow the storage by one empty grantee column."""
+        self.votes = np.hstack([self.votes, np.zeros((len(self.votes), 1), dtype=np.int64)])
+
+    def _delete_storage_column(self, column: int):
+        """Remove one grantee column from the storage."""
+        self.votes = np.delete(self.votes, column, axis=1)
+
+    def add_members(self, members: List[Any]) -> np.ndarray:
+        """
+        Add members with empty allocations, as Council.addCouncilMember does.
+
+        Parameters:
+        -----------
+        members : list
+            The new Member objects
+
+        Returns:
+        --------
+        numpy.ndarray
+            Row indices of the new members
+        """
+        ids = [member.id for member in members]
+        duplicates = [member_id for member_id in ids if member_id in self.member_index]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Members already on the council: {duplicates or ids}")
+
+        start = len(self.member_index)
+        rows = np.arange(start, start + len(members))
+        self.member_index.update(zip(ids, rows.tolist()))
+        self.members.extend(members)
+        self._refresh_coalition_grantees()
+        self._append_storage_rows(len(members))
+        self.has_voted = np.concatenate([self.has_voted, np.zeros(len(members), dtype=bool)])
+        self.is_current = np.concatenate([self.is_current, np.zeros(len(members), dtype=bool)])
+
+        arrays = self._member_arrays(members)
+        self.voting_power = np.concatenate([self.voting_power, arrays[0]])
+        self.strategy_codes = np.concatenate([self.strategy_codes, arrays[1]])
+        self.coalition_mask = np.concatenate([self.coalition_mask, arrays[2]])
+        self.is_deterministic = np.concatenate([self.is_deterministic, arrays[3]])
+        return rows
+
+    def add_member(self, member: Any) -> int:
+        """
+        Add a member with an empty allocation.
+
+        Parameters:
+        -----------
+        member : Member
+            The new member
+
+        Returns:
+        --------
+        int
+            Row index of the member
+        """
+        return int(self.add_members([member])[0])
+
+    def remove_members(self, member_ids: List[str]):
+        """
+        Remove members, first clearing their votes from the totals as
+        Council.removeCouncilMember does. Later rows shift up.
+
+        Parameters:
+        -----------
+        member_ids : list
+            IDs of the members to remove
+        """
+        rows = np.unique([self.member_index[member_id] for member_id in member_ids]).astype(np.int64)
+        self.record(rows, np.zeros((len(rows), len(self.grantees)), dtype=np.int64))
+        self._delete_storage_rows(rows)
+
+        keep = np.ones(len(self.has_voted), dtype=bool)
+        keep[rows] = False
+        self.has_voted = self.has_voted[keep]
+        self.is_current = self.is_current[keep]
+        member_keep = keep[:len(self.members)]
+        if isinstance(self.members, MemberTable):
+            self.members.remove_rows(np.flatnonzero(~member_keep))
+        else:
+            self.members[:] = [member for member, kept in zip(self.members, member_keep) if kept]
+        self.voting_power = self.voting_power[member_keep]
+        self.strategy_codes = self.strategy_codes[member_keep]
+        self.coalition_mask = self.coalition_mask[member_keep]
+        self.is_deterministic = self.is_deterministic[member_keep]
+
+        removed = set(member_ids)
+        self.member_index = {
+            member_id: row - int(np.searchsorted(rows, row))
+            for member_id, row in self.member_index.items() if member_id not in removed
+        }
+
+    def remove_member(self, member_id: str):
+        """
+        Remove a member and clear their votes from the totals.
+
+        Parameters:
+        -----------
+        member_id : str
+            ID of the member to remove
+        """
+        self.remove_members([member_id])
+
+    def set_voting_power(self, member_id: str, voting_power: int):
+        """
+        Change a member's voting power, as Council.editCouncilMember does.
+        Their stored votes are kept until they allocate again.
+
+        Parameters:
+        -----------
+        member_id : str
+            ID of the member
+        voting_power : int
+            New voting power
+        """
+        row = self.member_index[member_id]
+        self.members[row].voting_power = voting_power
+        self.voting_power[row] = voting_power
+        self.is_current[row] = False
+
+    def add_grantee(self, grantee: Any) -> int:
+        """
+        Add a grantee column with no votes, as Council.addGrantee does.
+
+        Parameters:
+        -----------
+        grantee : Grantee
+            The new grantee
+
+        Returns:
+        --------
+        int
+            Column index of the grantee
+        """
+        if grantee.id in self.grantee_index:
+            raise ValueError(f"Grantee {grantee.id} is already on the council")
+        self._append_storage_column()
+        self.running_totals = np.append(self.running_totals, 0)
+        self.grantees.append(grantee)
+        self.grantee_ids.append(grantee.id)
+        self.grantee_index[grantee.id] = len(self.grantee_ids) - 1
+        self.refresh()
+        return len(self.grantee_ids) - 1
+
+    def remove_grantee(self, grantee_id: str):
+        """
+        Remove a grantee column, dropping every vote for it from the totals
+        as PoolManager._removeGrantee zeroes the grantee's pool units.
+        Members keep their other votes until they allocate again.
+
+        Parameters:
+        -----------
+        grantee_id : str
+            ID of the grantee to remove
+
+        Returns:
+        --------
+        Grantee
+            The removed grantee (a standalone copy when grantees are a
+            GranteeTable)
+        """
+        column = self.grantee_index[grantee_id]
+        self._delete_storage_column(column)
+        self.running_totals = np.delete(self.running_totals, column)
+
+        removed = self.grantees.pop(column)
+        del self.grantee_ids[column]
+        self.grantee_index = {gid: j for j, gid in enumerate(self.grantee_ids)}
+        self.refresh()
+        return removed
+
+    def member_ids(self, rows: np.ndarray) -> np.ndarray:
+        """
+        IDs of the members in the given rows.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member row indices
+
+        Returns:
+        --------
+        numpy.ndarray
+            Object array of member IDs
+        """
+        if isinstance(self.members, MemberTable):
+            return self.members.ids(rows)
+        return np.array([self.members[i].id for i in rows], dtype=object)
+
+    def _add_member_row(self, member_id: str) -> int:
+        """Append an empty row for a member not known at construction."""
+        row = len(self.member_index)
+        self.member_index[member_id] = row
+        self._append_storage_rows(1)
+        self.has_voted = np.append(self.has_voted, False)
+        self.is_current = np.append(self.is_current, False)
+        return row
+
+    def __getitem__(self, member_id: str) -> Dict[str, int]:
+        row = self.member_index.get(member_id)
+        if row is None or not self.has_voted[row]:
+            raise KeyError(member_id)
+        return dict(zip(self.grantee_ids, self.row_vector(row).tolist()))
+
+    def __setitem__(self, member_id: str, allocations: Dict[str, int]):
+        row = self.member_index.get(member_id)
+        if row is None:
+            row = self._add_member_row(member_id)
+
+        votes = np.zeros(len(self.grantees), dtype=np.int64)
+        for grantee_id, amount in allocations.items():
+            if grantee_id in self.grantee_index:
+                votes[self.grantee_index[grantee_id]] = amount
+
+        self.record(np.array([row]), votes[None, :])
+
+    def __delitem__(self, member_id: str):
+        row = self.member_index.get(member_id)
+        if row is None or not self.has_voted[row]:
+            raise KeyError(member_id)
+        self.record(np.array([row]), np.zeros((1, len(self.grantees)), dtype=np.int64))
+        self.has_voted[row] = False
+
+    def __iter__(self):
+        voted = self.has_voted
+        return (member_id for member_id, row in self.member_index.items() if voted[row])
+
+    def __len__(self) -> int:
+        return int(self.has_voted.sum())
+
+class SparseAllocationMatrix(AllocationMatrix):
+    """
+    Allocation store keeping only non-zero votes in CSR form.
+
+    Mirrors the subgraph, which stores one Vote entity per non-zero
+    allocation. Memory and aggregation cost scale with the number of votes
+    rather than members x grantees, which pays off for large councils with
+    a small max_allocations_per_member.
+    """
+
+    def _init_storage(self):
+        """Allocate empty CSR arrays (indptr, grantee indices, amounts)."""
+        self.indptr = np.zeros(len(self.members) + 1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.data = np.zeros(0, dtype=np.int64)
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored (non-zero) votes."""
+        return len(self.data)
+
+    def _entry_rows(self) -> np.ndarray:
+        """Row index of every stored vote."""
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+    def recompute_totals(self) -> np.ndarray:
+        """
+        Recompute total allocation per grantee from every stored vote.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer vector of total votes per grantee
+        """
+        totals = np.zeros(len(self.grantees), dtype=np.int64)
+        np.add.at(totals, self.indices, self.data)
+        return totals
+
+    def row_vector(self, row: int) -> np.ndarray:
+        """Return one member's allocation as a dense integer vector."""
+        vector = np.zeros(len(self.grantees), dtype=np.int64)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        vector[self.indices[start:end]] = self.data[start:end]
+        return vector
+
+    def nonzero_entries(self):
+        """
+        Every stored vote in row-major order.
+
+        Returns:
+        --------
+        tuple
+            (rows, grantee columns, amounts) integer arrays
+        """
+        return self._entry_rows(), self.indices.copy(), self.data.copy()
+
+    def _rows_sum(self, rows: np.ndarray) -> np.ndarray:
+        """Sum the stored allocations of the given rows per grantee."""
+        selected = np.isin(self._entry_rows(), rows)
+        totals = np.zeros(len(self.grantees), dtype=np.int64)
+        np.add.at(totals, self.indices[selected], self.data[selected])
+        return totals
+
+    def _set_rows(self, rows: np.ndarray, votes: np.ndarray):
+        """Replace the stored votes of the given rows, keeping CSR order."""
+        if len(rows) == 1:
+            # Splice a single row in place of a full re-sort (replayed
+            # allocations arrive one member at a time)
+            row = rows[0]
+            start, end = self.indptr[row], self.indptr[row + 1]
+            new_cols = np.flatnonzero(votes[0])
+            self.indices = np.concatenate([self.indices[:start], new_cols, self.indices[end:]])
+            self.data = np.concatenate([self.data[:start], votes[0, new_cols], self.data[end:]])
+            self.indptr[row + 1:] += len(new_cols) - (end - start)
+            return
+
+        entry_rows = self._entry_rows()
+        keep = ~np.isin(entry_rows, rows)
+
+        new_rows, new_cols = np.nonzero(votes)
+        all_rows = np.concatenate([entry_rows[keep], rows[new_rows]])
+        all_cols = np.concatenate([self.indices[keep], new_cols])
+        all_data = np.concatenate([self.data[keep], votes[new_rows, new_cols]])
+
+        order = np.lexsort((all_cols, all_rows))
+        self.indices = all_cols[order]
+        self.data = all_data[order]
+        counts = np.bincount(all_rows, minlength=len(self.indptr) - 1)
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+
+    def _append_storage_rows(self, count: int):
+        """Grow the storage by `count` empty member rows."""
+        self.indptr = np.concatenate([self.indptr, np.full(count, self.indptr[-1])])
+
+    def _delete_storage_rows(self, rows: np.ndarray):
+        """Remove (already zeroed) member rows from the storage."""
+        self.indptr = np.delete(self.indptr, np.asarray(rows) + 1)
+
+    def _append_storage_column(self):
+        """Grow the storage by one empty grantee column (nothing to store)."""
+
+    def _delete_storage_column(self, column: int):
+        """Remove one grantee column from the storage."""
+        keep = self.indices != column
+        counts = np.bincount(self._entry_rows()[keep], minlength=len(self.indptr) - 1)
+        self.indices = self.indices[keep]
+        self.indices[self.indices > column] -= 1
+        self.data = self.data[keep]
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+
+    def __getitem__(self, member_id: str) -> Dict[str, int]:
+        row = self.member_index.get(member_id)
+        if row is None or not self.has_voted[row]:
+            raise KeyError(member_id)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return {self.grantee_ids[j]: int(v) for j, v in zip(self.indices[start:end], self.data[start:end])}
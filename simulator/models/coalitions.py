@@ -0,0 +1,257 @@
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+
+class CoalitionIndex:
+    """
+    Coalition memberships of a MemberTable.
+
+    Memberships are stored as parallel arrays of (member row, coalition)
+    pairs, sorted by member row with each member's coalitions in the order
+    they were joined, and each coalition's grantees are stored once as an
+    id list. A member may belong to several coalitions. Joining, leaving
+    and changing a coalition's grantees are a few array operations however
+    many members they touch, and the pairs of any batch of members are
+    found with two binary searches.
+    """
+
+    def __init__(self, num_members: int = 0):
+        """
+        Initialize a CoalitionIndex instance.
+
+        Parameters:
+        -----------
+        num_members : int
+            Number of member rows, none of them in a coalition
+        """
+        self.num_members = num_members
+        self.grantee_ids = []  # grantee id list of each coalition
+        self._lookup = {}
+        self.rows = np.zeros(0, dtype=np.int64)  # member row of each membership
+        self.coalitions = np.zeros(0, dtype=np.int32)  # coalition of each membership
+
+    def __len__(self) -> int:
+        return len(self.grantee_ids)
+
+    def index(self, grantee_ids: Optional[List[str]]) -> int:
+        """Return the index of the coalition supporting grantee_ids, adding it if new (-1 for none)."""
+        if not grantee_ids:
+            return -1
+        key = tuple(grantee_ids)
+        index = self._lookup.get(key)
+        if index is None:
+            index = len(self.grantee_ids)
+            self.grantee_ids.append(list(grantee_ids))
+            self._lookup[key] = index
+        return index
+
+    def _keys(self, rows: np.ndarray, coalitions: np.ndarray) -> np.ndarray:
+        """Encode (row, coalition) pairs as single integers."""
+        return rows.astype(np.int64) * (len(self) + 1) + coalitions
+
+    def _pairs_arrays(self, rows, coalitions) -> Tuple[np.ndarray, np.ndarray]:
+        """Validate (row, coalition) pairs, broadcasting a single coalition over rows."""
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.int64))
+        coalitions = np.broadcast_to(np.asarray(coalitions, dtype=np.int32), rows.shape)
+        if len(coalitions) and (coalitions.min() < 0 or coalitions.max() >= len(self)):
+            raise ValueError(f"Unknown coalition in {np.unique(coalitions).tolist()} ({len(self)} coalitions)")
+        return rows, coalitions
+
+    def join(self, rows: np.ndarray, coalitions: np.ndarray):
+        """
+        Add memberships; pairs already present are ignored.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows
+        coalitions : numpy.ndarray or int
+            Coalition each member joins (one for all of them, or one per row)
+        """
+        rows, coalitions = self._pairs_arrays(rows, coalitions)
+        keys = self._keys(rows, coalitions)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        new = first[~np.isin(keys[first], self._keys(self.rows, self.coalitions))]
+
+        rows = np.concatenate([self.rows, rows[new]])
+        coalitions = np.concatenate([self.coalitions, coalitions[new]])
+        order = np.argsort(rows, kind='stable')
+        self.rows, self.coalitions = rows[order], coalitions[order]
+
+    def leave(self, rows: np.ndarray, coalitions: Optional[np.ndarray] = None):
+        """
+        Remove memberships.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows
+        coalitions : numpy.ndarray or int, optional
+            Coalition each member leaves (default every coalition they are in)
+        """
+        if coalitions is None:
+            drop = np.isin(self.rows, rows)
+        else:
+            rows, coalitions = self._pairs_arrays(rows, coalitions)
+            drop = np.isin(self._keys(self.rows, self.coalitions), self._keys(rows, coalitions))
+        self.rows, self.coalitions = self.rows[~drop], self.coalitions[~drop]
+
+    def set_grantees(self, coalition: int, grantee_ids: List[str]) -> np.ndarray:
+        """
+        Change the grantees a coalition supports.
+
+        Parameters:
+        -----------
+        coalition : int
+            Coalition index
+        grantee_ids : list
+            New grantee ids of the coalition
+
+        Returns:
+        --------
+        numpy.ndarray
+            Rows of the coalition's members
+        """
+        old_key = tuple(self.grantee_ids[coalition])
+        if self._lookup.get(old_key) == coalition:
+            del self._lookup[old_key]
+        self.grantee_ids[coalition] = list(grantee_ids)
+        self._lookup.setdefault(tuple(grantee_ids), coalition)
+        return self.members_of([coalition])
+
+    def pairs(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Memberships of a batch of members.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows
+
+        Returns:
+        --------
+        tuple
+            (position in rows, coalition) integer arrays, grouped by
+            position with each member's coalitions in joining order
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = np.searchsorted(self.rows, rows, side='left')
+        counts = np.searchsorted(self.rows, rows, side='right') - starts
+        positions = np.repeat(np.arange(len(rows)), counts)
+        offsets = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return positions, self.coalitions[np.repeat(starts, counts) + offsets]
+
+    def members_of(self, coalitions: List[int]) -> np.ndarray:
+        """
+        Rows of the members of any of the given coalitions.
+
+        Parameters:
+        -----------
+        coalitions : list
+            Coalition indices
+
+        Returns:
+        --------
+        numpy.ndarray
+            Sorted member rows
+        """
+        return np.unique(self.rows[np.isin(self.coalitions, coalitions)])
+
+    def membership_counts(self) -> np.ndarray:
+        """
+        Number of coalitions of every member.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer count per member row
+        """
+        return np.bincount(self.rows, minlength=self.num_members)
+
+    def member_grantees(self, row: int) -> Optional[List[str]]:
+        """
+        Grantee ids a member's coalitions support, in joining order.
+
+        Parameters:
+        -----------
+        row : int
+            Member row
+
+        Returns:
+        --------
+        list or None
+            The grantee ids, or None outside any coalition
+        """
+        _, coalitions = self.pairs(np.array([row]))
+        if len(coalitions) == 0:
+            return None
+        if len(coalitions) == 1:
+            return self.grantee_ids[coalitions[0]]
+        return list(dict.fromkeys(g for c in coalitions for g in self.grantee_ids[c]))
+
+    def grantee_mask(self, grantee_index: Dict[str, int]) -> np.ndarray:
+        """
+        Boolean coalitions x grantees matrix of the grantees each coalition
+        supports.
+
+        Parameters:
+        -----------
+        grantee_index : dict
+            Column of each grantee id (grantees not listed are ignored)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Coalition grantee mask
+        """
+        mask = np.zeros((len(self), len(grantee_index)), dtype=bool)
+        for i, grantee_ids in enumerate(self.grantee_ids):
+            mask[i, [grantee_index[g] for g in grantee_ids if g in grantee_index]] = True
+        return mask
+
+    def covered(self, rows: np.ndarray, grantee_mask: np.ndarray) -> np.ndarray:
+        """
+        Grantees covered by each member's coalitions.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Member rows
+        grantee_mask : numpy.ndarray
+            Coalition grantee mask from grantee_mask
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean (len(rows) x grantees) matrix
+        """
+        covered = np.zeros((len(rows), grantee_mask.shape[1]), dtype=bool)
+        positions, coalitions = self.pairs(rows)
+        np.logical_or.at(covered, positions, grantee_mask[coalitions])
+        return covered
+
+    def extend(self, count: int):
+        """
+        Append member rows outside any coalition.
+
+        Parameters:
+        -----------
+        count : int
+            Number of new rows
+        """
+        self.num_members += count
+
+    def remove_rows(self, rows: np.ndarray):
+        """
+        Drop the memberships of removed members; later rows shift up.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the removed members
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        keep = ~np.isin(self.rows, rows)
+        self.rows = self.rows[keep] - np.searchsorted(rows, self.rows[keep])
+        self.coalitions = self.coalitions[keep]
+        self.num_members -= len(rows)
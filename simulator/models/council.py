@@ -1,5 +1,10 @@
 import numpy as np
-import pandas as pd
+
+from .allocation_matrix import AllocationMatrix, SparseAllocationMatrix
+from .exact_pool import ExactPool, UNIT_ARITHMETIC
+from .history import HistoryBuffer
+from .participation import UniformParticipation, uniform_sample
+from .population import MemberTable, GranteeTable, credit_grantees
 
 class Council:
     """
@@ -7,7 +12,11 @@ class Council:
     voting power, budget allocations, and grantees.
     """
     
-    def __init__(self, initial_pool, distribution_rate, members=None, grantees=None, annual_funding_addition=0):
+    def __init__(self, initial_pool, distribution_rate, members=None, grantees=None, annual_funding_addition=0,
+                 check_consistency=False, duration_months=12, rng=None,
+                 max_allocations_per_member=0, allocation_storage='dense', keep_history=True,
+                 participation=None, unit_arithmetic='float', token_decimals=18, coalition_churn=0.0,
+                 behavior=None):
         """
         Initialize a Council instance.
         
@@ -17,43 +26,333 @@ class Council:
             Initial funding pool size in currency units
         distribution_rate : float
             Monthly distribution rate as a fraction (0.01 to 0.1)
-        members : list
-            List of Member objects
-        grantees : list
-            List of Grantee objects
+        members : list or MemberTable
+            Member objects, or a MemberTable used in place
+        grantees : list or GranteeTable
+            Grantee objects, or a GranteeTable used in place
         annual_funding_addition : float
             Amount to add to the funding pool at the end of each year
+        check_consistency : bool
+            Compare running allocation totals against a full recompute on every read
+        duration_months : int
+            Expected number of months, used to preallocate history buffers
+        rng : numpy.random.Generator, optional
+            Random number generator for participation and random allocations
+        max_allocations_per_member : int
+            Maximum number of grantees each member may vote for (0 for no limit)
+        allocation_storage : str
+            'dense' for a members x grantees matrix, 'sparse' for CSR storage
+            of non-zero votes only
+        keep_history : bool
+            Record every month in self.history (disable when a consumer of
+            month snapshots keeps its own record)
+        participation : ParticipationModel, optional
+            Model choosing the active members each month (defaults to every
+            member)
+        unit_arithmetic : str
+            'float' splits funds as floats; 'exact' streams them through an
+            integer model of the on-chain pool (see ExactPool), keeping the
+            wei ledger in self.ledger
+        token_decimals : int
+            Decimals of the distributed token in exact unit arithmetic
+        coalition_churn : float
+            Fraction of coalition memberships moving to another coalition
+            at the start of each month (see churn_coalitions)
+        behavior : AdaptiveBehavior, optional
+            Learned weights of members with adaptive strategies, updated
+            after every month (without one they split votes equally)
         """
         self.pool_balance = initial_pool
         self.distribution_rate = distribution_rate
-        self.members = members or []
-        self.grantees = grantees or []
-        self.allocations = {}  # member_id -> {grantee_id: amount}
-        self.history = []  # Track historical state
+        storage = SparseAllocationMatrix if allocation_storage == 'sparse' else AllocationMatrix
+        self.allocations = storage(members, grantees, max_allocations_per_member)  # member_id -> {grantee_id: amount}
+        # Members and grantees are shared with the allocation store, which
+        # keeps them in step with its rows and columns
+        self.members = self.allocations.members
+        self.grantees = self.allocations.grantees
+        self.history = HistoryBuffer(self.allocations.grantee_ids, duration_months)  # Track historical state
+        self.history_columns = np.arange(len(self.grantees))  # history column of each current grantee
+        self.removed_grantees = []
         self.annual_funding_addition = annual_funding_addition
+        self.check_consistency = check_consistency
+        self.keep_history = keep_history
+        self.rng = rng or np.random.default_rng()
+        self.participation = participation or UniformParticipation(1.0)
+        self.coalition_churn = coalition_churn
+        self.behavior = behavior
+        if unit_arithmetic not in UNIT_ARITHMETIC:
+            raise ValueError(f"Unknown unit arithmetic: {unit_arithmetic} (expected one of {UNIT_ARITHMETIC})")
+        self.ledger = None
+        if unit_arithmetic == 'exact':
+            self.ledger = ExactPool(initial_pool, token_decimals, len(self.history.grantee_ids))
+            self.pool_balance = self.ledger.tokens(self.ledger.balance)
         
-    def active_members(self, participation_rate=1.0):
+    def active_member_indices(self, participation_rate=None):
+        """
+        Return indices of this month's active members.
+        
+        Parameters:
+        -----------
+        participation_rate : float, optional
+            Draw a uniform sample of this fraction of members instead of
+            asking the participation model
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Indices into self.members of the active members
+        """
+        if participation_rate is not None:
+            return uniform_sample(self.rng, len(self.members), participation_rate)
+        return self.participation.sample(self.rng, len(self.members))
+    
+    def active_members(self, participation_rate=None):
         """
-        Return active members based on participation rate.
+        Return this month's active members.
         
         Parameters:
         -----------
-        participation_rate : float
-            Fraction of members who participate (0.0 to 1.0)
+        participation_rate : float, optional
+            Draw a uniform sample of this fraction of members instead of
+            asking the participation model
             
         Returns:
         --------
         list
             List of active Member objects
         """
-        num_active = int(len(self.members) * participation_rate)
-        if num_active == 0 and len(self.members) > 0:
-            num_active = 1  # Ensure at least one member if any exist
-        return np.random.choice(self.members, num_active, replace=False).tolist()
+        return [self.members[i] for i in self.active_member_indices(participation_rate)]
+    
+    def add_members(self, members):
+        """
+        Add council members with no allocation yet.
+        
+        Parameters:
+        -----------
+        members : list
+            The new Member objects
+        """
+        self.allocations.add_members(members)
+        self.participation.add_members(len(members))
+        if self.behavior is not None:
+            self.behavior.add_members(len(members))
+    
+    def add_member(self, member):
+        """
+        Add a council member with no allocation yet.
+        
+        Parameters:
+        -----------
+        member : Member
+            The new member
+        """
+        self.add_members([member])
+    
+    def remove_members(self, member_ids):
+        """
+        Remove council members and clear their allocations from the totals.
+        
+        Parameters:
+        -----------
+        member_ids : list
+            IDs of the members to remove
+        """
+        rows = np.unique([self.allocations.member_index[member_id] for member_id in member_ids]).astype(np.int64)
+        num_members = len(self.members)
+        self.allocations.remove_members(member_ids)
+        self.participation.remove_members(rows[rows < num_members])
+        if self.behavior is not None:
+            self.behavior.remove_members(rows[rows < num_members])
+    
+    def remove_member(self, member_id):
+        """
+        Remove a council member and clear their allocation from the totals.
+        
+        Parameters:
+        -----------
+        member_id : str
+            ID of the member to remove
+        """
+        self.remove_members([member_id])
+    
+    def edit_member(self, member_id, voting_power):
+        """
+        Change a council member's voting power; their current allocation
+        stays in place until they allocate again.
+        
+        Parameters:
+        -----------
+        member_id : str
+            ID of the member
+        voting_power : int
+            New voting power
+        """
+        self.allocations.set_voting_power(member_id, voting_power)
+    
+    def add_grantee(self, grantee):
+        """
+        Add a grantee with no votes yet, with a new history column.
+        
+        Parameters:
+        -----------
+        grantee : Grantee
+            The new grantee
+        """
+        self.allocations.add_grantee(grantee)
+        self.history.add_column(grantee.id)
+        if self.ledger is not None:
+            self.ledger.add_column()
+        if self.behavior is not None:
+            self.behavior.add_grantee()
+        self.history_columns = np.append(self.history_columns, len(self.history.grantee_ids) - 1)
+    
+    def remove_grantee(self, grantee_id):
+        """
+        Remove a grantee; every vote for it stops counting.
+        
+        The grantee keeps its history column (with zero distribution from
+        now on) and is moved to self.removed_grantees.
+        
+        Parameters:
+        -----------
+        grantee_id : str
+            ID of the grantee to remove
+        """
+        index = self.allocations.grantee_index[grantee_id]
+        self.removed_grantees.append(self.allocations.remove_grantee(grantee_id))
+        self.history_columns = np.delete(self.history_columns, index)
+        if self.behavior is not None:
+            self.behavior.remove_grantee(index)
+    
+    def _coalition_table(self):
+        """Return the MemberTable whose coalitions are changed."""
+        if not isinstance(self.members, MemberTable):
+            raise TypeError("Coalition changes need members stored in a MemberTable")
+        return self.members
+    
+    def join_coalitions(self, member_indices, coalitions):
+        """
+        Put members into coalitions, keeping the ones they are already in;
+        they switch to the coalition strategy and allocate afresh.
+        
+        Parameters:
+        -----------
+        member_indices : numpy.ndarray
+            Indices into self.members of the joining members
+        coalitions : numpy.ndarray or int
+            Coalition index each member joins (one for all of them, or one
+            per member)
+        """
+        self._coalition_table().join_coalitions(member_indices, coalitions)
+        self.allocations.refresh_coalitions(np.unique(member_indices))
+    
+    def leave_coalitions(self, member_indices, coalitions=None):
+        """
+        Take members out of coalitions; members left in none revert to the
+        random strategy.
+        
+        Parameters:
+        -----------
+        member_indices : numpy.ndarray
+            Indices into self.members of the leaving members
+        coalitions : numpy.ndarray or int, optional
+            Coalition each member leaves (default every coalition they are in)
+        """
+        self._coalition_table().leave_coalitions(member_indices, coalitions)
+        self.allocations.refresh_coalitions(np.unique(member_indices))
+    
+    def set_coalition_grantees(self, coalition, grantee_ids):
+        """
+        Change the grantees a coalition supports; its members allocate
+        afresh.
+        
+        Parameters:
+        -----------
+        coalition : int
+            Coalition index
+        grantee_ids : list
+            New grantee ids of the coalition
+        """
+        rows = self._coalition_table().coalitions.set_grantees(coalition, grantee_ids)
+        self.allocations.refresh_coalitions(rows)
+    
+    def churn_coalitions(self, fraction=None):
+        """
+        Move a random fraction of coalition memberships to another coalition,
+        drawn uniformly. A member moving to a coalition they are already in
+        just leaves the old one.
+        
+        Parameters:
+        -----------
+        fraction : float, optional
+            Probability that each membership moves (defaults to
+            self.coalition_churn)
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Indices into self.members of the members who moved
+        """
+        fraction = self.coalition_churn if fraction is None else fraction
+        if fraction <= 0 or not isinstance(self.members, MemberTable):
+            return np.zeros(0, dtype=np.int64)
+        index = self.members.coalitions
+        if len(index) < 2 or len(index.rows) == 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        moving = np.flatnonzero(self.rng.random(len(index.rows)) < fraction)
+        rows, old = index.rows[moving], index.coalitions[moving]
+        new = self.rng.integers(len(index) - 1, size=len(moving))
+        new += new >= old  # skip the coalition being left
+        index.leave(rows, old)
+        index.join(rows, new)
+        rows = np.unique(rows)
+        self.allocations.refresh_coalitions(rows)
+        return rows
+    
+    def coalition_totals(self, member_indices=None, by_coalition=False):
+        """
+        Votes coalition members give each grantee, computed from
+        per-coalition voting power sums rather than member rows.
+        
+        Parameters:
+        -----------
+        member_indices : numpy.ndarray, optional
+            Indices into self.members of the members to count (default
+            all), e.g. a month's active members
+        by_coalition : bool
+            Return each coalition's totals rather than their sum
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Integer vector of votes per grantee, or (coalitions x grantees)
+            matrix with by_coalition
+        """
+        return self.allocations.coalition_totals(member_indices, by_coalition)
+    
+    def to_history_columns(self, vector):
+        """
+        Spread a per-grantee vector over the history columns, which include
+        removed grantees (as zero).
+        
+        Parameters:
+        -----------
+        vector : numpy.ndarray
+            One value per current grantee
+            
+        Returns:
+        --------
+        numpy.ndarray
+            One value per history column
+        """
+        full = np.zeros(len(self.history.grantee_ids), dtype=np.asarray(vector).dtype)
+        full[self.history_columns] = vector
+        return full
     
     def record_allocations(self, member, allocations):
         """
-        Record a member's allocations.
+        Record a member's allocations, updating per-grantee totals by delta.
         
         Parameters:
         -----------
@@ -63,22 +362,52 @@ class Council:
             Dictionary mapping grantee_id to allocation amount
         """
         self.allocations[member.id] = allocations
+    
+    def allocate_batch(self, member_indices):
+        """
+        Allocate and record votes for a batch of members in one pass.
         
+        Parameters:
+        -----------
+        member_indices : numpy.ndarray
+            Indices into self.members of the members allocating
+            
+        Returns:
+        --------
+        tuple
+            (indices of members whose allocation changed, their new
+            allocation rows); members with a deterministic strategy who
+            already hold an up-to-date allocation are skipped
+        """
+        return self.allocations.update(member_indices, self.rng, self.behavior)
+        
+    def _allocation_totals(self):
+        """Return the running per-grantee totals as an integer vector."""
+        totals = self.allocations.totals()
+        if self.check_consistency:
+            expected = self.allocations.recompute_totals()
+            if not np.array_equal(totals, expected):
+                raise RuntimeError(
+                    f"Running allocation totals {totals.tolist()} diverged from "
+                    f"full recompute {expected.tolist()}"
+                )
+        return totals
+    
     def current_allocations(self):
         """
-        Calculate current total allocations per grantee.
+        Return current total allocations per grantee.
+        
+        Totals are kept up to date by delta as allocations are recorded, so
+        this costs O(grantees). With check_consistency enabled they are also
+        compared against a full recompute over every member.
         
         Returns:
         --------
         dict
             Dictionary mapping grantee_id to total allocation amount
         """
-        total_allocations = {grantee.id: 0 for grantee in self.grantees}
-        for member_allocations in self.allocations.values():
-            for grantee_id, amount in member_allocations.items():
-                if grantee_id in total_allocations:
-                    total_allocations[grantee_id] += amount
-        return total_allocations
+        totals = self._allocation_totals()
+        return dict(zip(self.allocations.grantee_ids, totals.tolist()))
     
     def distribute_funds(self, month):
         """
@@ -94,42 +423,117 @@ class Council:
         dict
             Dictionary mapping grantee_id to distributed amount
         """
-        total_allocations = self.current_allocations()
-        total_votes = sum(total_allocations.values())
+        snapshot = self.distribute_month(month)
+        distribution = snapshot['distribution'][self.history_columns]
+        return dict(zip(self.allocations.grantee_ids, distribution.tolist()))
+    
+    def distribute_month(self, month):
+        """
+        Distribute funds based on current allocations and return a compact
+        snapshot of the month.
         
-        # Calculate amount to distribute this month
-        distribution_amount = self.pool_balance * self.distribution_rate
-        self.pool_balance -= distribution_amount
+        Parameters:
+        -----------
+        month : int
+            Current month in the simulation
+            
+        Returns:
+        --------
+        dict
+            'month', 'pool_balance', 'distribution' (amount per grantee),
+            'allocations' (total votes per grantee) and 'annual_funding_added';
+            vectors follow the history columns. With exact unit arithmetic
+            the snapshot adds the month's wei ledger (see ExactPool.close_month)
+        """
+        total_allocations = self._allocation_totals()
+        total_votes = int(total_allocations.sum())
         
-        # Distribute proportionally
-        distribution = {}
-        for grantee_id, votes in total_allocations.items():
+        if self.ledger is not None:
+            # Stream the month through the pool in integer units
+            self.ledger.start_month(self.distribution_rate)
+            paid = self.ledger.stream(total_allocations, self.history_columns, self.ledger.seconds_per_month)
+            distribution_vector = self.ledger.tokens(paid)
+        else:
+            # Calculate amount to distribute this month
+            distribution_amount = self.pool_balance * self.distribution_rate
+            self.pool_balance -= distribution_amount
+            
+            # Distribute proportionally
             if total_votes > 0:
-                distribution[grantee_id] = (votes / total_votes) * distribution_amount
+                distribution_vector = (total_allocations / total_votes) * distribution_amount
             else:
-                distribution[grantee_id] = 0
+                distribution_vector = np.zeros(len(total_allocations))
         
         # Update grantees with received funds
-        for grantee in self.grantees:
-            if grantee.id in distribution:
-                grantee.receive_funds(distribution[grantee.id])
+        credit_grantees(self.grantees, distribution_vector)
         
         # Check if it's the end of a year (month % 12 == 11 for 0-indexed months)
         annual_funding_added = 0
         if (month + 1) % 12 == 0 and self.annual_funding_addition > 0:
-            self.pool_balance += self.annual_funding_addition
+            if self.ledger is not None:
+                self.ledger.top_up(self.annual_funding_addition)
+            else:
+                self.pool_balance += self.annual_funding_addition
             annual_funding_added = self.annual_funding_addition
+        if self.ledger is not None:
+            self.pool_balance = self.ledger.tokens(self.ledger.balance)
         
-        # Record state for history
-        self.history.append({
+        return self.record_month(
+            month,
+            self.to_history_columns(distribution_vector),
+            self.to_history_columns(total_allocations),
+            annual_funding_added
+        )
+    
+    def record_month(self, month, distribution_vector, total_allocations, annual_funding_added=0):
+        """
+        Build a month snapshot and append it to the history.
+        
+        Parameters:
+        -----------
+        month : int
+            Month index
+        distribution_vector : numpy.ndarray
+            Amount distributed per history column
+        total_allocations : numpy.ndarray
+            Total votes per history column
+        annual_funding_added : float
+            Amount added to the pool this month
+            
+        Returns:
+        --------
+        dict
+            Month snapshot, as returned by distribute_month
+        """
+        snapshot = {
             'month': month,
             'pool_balance': self.pool_balance,
-            'distribution': distribution.copy(),
-            'allocations': total_allocations.copy(),
+            'distribution': distribution_vector,
+            'allocations': total_allocations,
             'annual_funding_added': annual_funding_added
-        })
-                
-        return distribution
+        }
+        if self.ledger is not None:
+            snapshot.update(self.ledger.close_month(month))
+        
+        # Adaptive members learn from the month's outcome
+        if self.behavior is not None:
+            if isinstance(self.grantees, GranteeTable):
+                viable = self.grantees.is_viable()
+            else:
+                viable = np.array([g.is_viable() for g in self.grantees], dtype=bool)
+            self.behavior.observe(self.allocations, viable, self.rng)
+        
+        # Record state for history
+        if self.keep_history:
+            self.history.append(
+                month,
+                self.pool_balance,
+                snapshot['distribution'],
+                snapshot['allocations'],
+                annual_funding_added
+            )
+        
+        return snapshot
     
     def get_history_dataframe(self):
         """
@@ -138,20 +542,33 @@ class Council:
         Returns:
         --------
         pandas.DataFrame
-            DataFrame containing simulation history
+            DataFrame containing simulation history, one row per month with
+            dist_to_*/alloc_to_* columns per grantee
         """
-        if not self.history:
-            return pd.DataFrame()
-        
-        # Basic history data
-        df = pd.DataFrame(self.history)
+        return self.history.to_wide_frame()
+    
+    def get_history_long_dataframe(self):
+        """
+        Convert history to a long (tidy) pandas DataFrame.
         
-        # Expand distribution and allocations into separate columns
-        for record in self.history:
-            for grantee_id, amount in record['distribution'].items():
-                df.loc[df['month'] == record['month'], f'dist_to_{grantee_id}'] = amount
-                
-            for grantee_id, amount in record['allocations'].items():
-                df.loc[df['month'] == record['month'], f'alloc_to_{grantee_id}'] = amount
+        Returns:
+        --------
+        pandas.DataFrame
+            DataFrame with one row per (month, grantee) and allocation and
+            distribution columns
+        """
+        return self.history.to_long_frame()
+    
+    def get_ledger_dataframe(self):
+        """
+        Per (month, grantee) payouts and rounding dust in wei.
         
-        return df 
\ No newline at end of file
+        Returns:
+        --------
+        pandas.DataFrame
+            DataFrame with one row per (month, grantee) and paid_wei and
+            dust_wei columns (exact unit arithmetic only)
+        """
+        if self.ledger is None:
+            raise ValueError("The wei ledger is only kept with exact unit arithmetic")
+        return self.ledger.grantee_frame(self.history.grantee_ids) 
\ No newline at end of file
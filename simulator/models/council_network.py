@@ -0,0 +1,438 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+from .allocation import DETERMINISTIC_CODES, strategy_code, batch_allocate
+from .history import HistoryBuffer
+from .participation import UniformParticipation
+
+# Chains with CouncilFactory deployments in the subgraph configs
+CHAINS = ('base', 'optimism', 'arbitrum', 'celo')
+
+# Super tokens generated networks stream
+SUPER_TOKENS = ('USDCx', 'DAIx', 'ETHx')
+
+def padded_allocate(
+    voting_power: np.ndarray,
+    strategy_codes: np.ndarray,
+    quality: np.ndarray,
+    popularity: np.ndarray,
+    valid: np.ndarray,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Allocate voting power for seats on different councils in one pass.
+
+    Every row is one seat, and its council's grantees sit in the first
+    columns of a matrix padded to the largest council; padding columns never
+    receive votes. Strategies follow batch_allocate without an allocation
+    cap. Coalition seats vote randomly, since coalitions are defined over
+    one council's grantees, and adaptive seats split equally.
+
+    Parameters:
+    -----------
+    voting_power : numpy.ndarray
+        Voting power of each seat
+    strategy_codes : numpy.ndarray
+        Strategy code of each seat (see STRATEGY_CODES)
+    quality : numpy.ndarray
+        (seats x max grantees) quality of the seat's council's grantees
+    popularity : numpy.ndarray
+        (seats x max grantees) popularity of the seat's council's grantees
+    valid : numpy.ndarray
+        Boolean (seats x max grantees) mask of real grantee columns
+    rng : numpy.random.Generator, optional
+        Random number generator for the random strategy
+
+    Returns:
+    --------
+    numpy.ndarray
+        Integer (seats x max grantees) matrix of allocations
+    """
+    return batch_allocate(voting_power, strategy_codes, quality, popularity, rng=rng, valid=valid)
+
+class CouncilNetwork:
+    """
+    Many councils simulated together, as deployed by CouncilFactory, with
+    members who may sit on several of them.
+
+    Each council has its own pool, distribution rate, super token and
+    grantees; members are shared. A member's position on one council is a
+    seat with its own voting power (council tokens are not transferable
+    between councils). Seat votes live in one (seats x max grantees) matrix
+    and grantee attributes in (councils x max grantees) matrices padded to
+    the largest council, so every month allocates for all active seats and
+    distributes all pools in a handful of array operations, however many
+    councils there are.
+    """
+
+    def __init__(self, members: Any, seat_member: np.ndarray, seat_council: np.ndarray,
+                 seat_voting_power: np.ndarray, grantees: List[Any], initial_pool: np.ndarray,
+                 distribution_rate: np.ndarray, annual_funding_addition: np.ndarray,
+                 chains: Optional[List[str]] = None, tokens: Optional[List[str]] = None,
+                 duration_months: int = 12, rng: Optional[np.random.Generator] = None,
+                 participation: Optional[Any] = None):
+        """
+        Initialize a CouncilNetwork instance.
+
+        Parameters:
+        -----------
+        members : MemberTable
+            Every member of the network; their strategy applies on all of
+            their councils
+        seat_member : numpy.ndarray
+            Member row of each seat
+        seat_council : numpy.ndarray
+            Council index of each seat
+        seat_voting_power : numpy.ndarray
+            Voting power of each seat
+        grantees : list
+            GranteeTable (or list of Grantee objects) of each council
+        initial_pool : numpy.ndarray
+            Initial pool of each council
+        distribution_rate : numpy.ndarray
+            Monthly distribution rate of each council
+        annual_funding_addition : numpy.ndarray
+            Amount added to each council's pool at the end of each year
+        chains : list, optional
+            Chain of each council
+        tokens : list, optional
+            Super token each council streams
+        duration_months : int
+            Expected number of months, used to preallocate history arrays
+        rng : numpy.random.Generator, optional
+            Random number generator for participation and random allocations
+        participation : ParticipationModel, optional
+            Model choosing the active members each month; an active member
+            votes on every council they sit on (defaults to every member)
+        """
+        num_councils = len(grantees)
+        self.members = members
+        self.grantees = grantees
+        self.rng = rng or np.random.default_rng()
+        self.participation = participation or UniformParticipation(1.0)
+        self.council_ids = [f"c{c + 1}" for c in range(num_councils)]
+        self.chains = list(chains) if chains is not None else [CHAINS[0]] * num_councils
+        self.tokens = list(tokens) if tokens is not None else ['USDCx'] * num_councils
+
+        # Seats, ordered by council
+        order = np.lexsort((seat_member, seat_council))
+        self.seat_member = np.asarray(seat_member, dtype=np.int64)[order]
+        self.seat_council = np.asarray(seat_council, dtype=np.int64)[order]
+        self.seat_voting_power = np.asarray(seat_voting_power, dtype=np.int64)[order]
+        codes = np.array([strategy_code(name) for name in members.strategy_names], dtype=np.int64)
+        self.seat_codes = codes[members.strategy[self.seat_member]]
+        self.seat_deterministic = np.isin(self.seat_codes, DETERMINISTIC_CODES)
+
+        # Grantee attributes padded to the largest council
+        self.num_grantees = np.array([len(g) for g in grantees], dtype=np.int64)
+        max_grantees = int(self.num_grantees.max()) if num_councils else 0
+        self.valid = np.arange(max_grantees)[None, :] < self.num_grantees[:, None]
+        self.quality = np.zeros((num_councils, max_grantees))
+        self.popularity = np.zeros((num_councils, max_grantees))
+        self.min_funding_threshold = np.zeros((num_councils, max_grantees))
+        for c, council_grantees in enumerate(grantees):
+            n = len(council_grantees)
+            self.quality[c, :n] = [g.quality for g in council_grantees]
+            self.popularity[c, :n] = [g.popularity for g in council_grantees]
+            self.min_funding_threshold[c, :n] = [g.min_funding_threshold for g in council_grantees]
+
+        self.votes = np.zeros((len(self.seat_member), max_grantees), dtype=np.int64)
+        self.is_current = np.zeros(len(self.seat_member), dtype=bool)
+        self.totals = np.zeros((num_councils, max_grantees), dtype=np.int64)  # council units, updated by delta
+        self.pool_balance = np.asarray(initial_pool, dtype=float).copy()
+        self.distribution_rate = np.broadcast_to(np.asarray(distribution_rate, dtype=float), (num_councils,)).copy()
+        self.annual_funding_addition = np.broadcast_to(
+            np.asarray(annual_funding_addition, dtype=float), (num_councils,)
+        ).copy()
+        self.received_funds = np.zeros((num_councils, max_grantees))
+
+        # History, (months x councils [x max grantees]), grown by doubling
+        capacity = max(1, int(duration_months))
+        self.size = 0
+        self.month = np.zeros(capacity, dtype=np.int64)
+        self.pool_history = np.zeros((capacity, num_councils))
+        self.top_up_history = np.zeros((capacity, num_councils))
+        self.distribution_history = np.zeros((capacity, num_councils, max_grantees))
+        self.allocation_history = np.zeros((capacity, num_councils, max_grantees), dtype=np.int64)
+
+    @property
+    def num_councils(self) -> int:
+        return len(self.grantees)
+
+    def active_seats(self) -> np.ndarray:
+        """
+        Draw this month's active members and return their seats.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Seat indices of the active members, in seat order
+        """
+        active = np.zeros(len(self.members), dtype=bool)
+        active[self.participation.sample(self.rng, len(self.members))] = True
+        return np.flatnonzero(active[self.seat_member])
+
+    def allocate(self, seats: np.ndarray) -> np.ndarray:
+        """
+        Allocate and record votes for seats on any councils in one batch.
+
+        Council totals are updated by delta, and seats with a deterministic
+        strategy whose votes are already up to date are skipped.
+
+        Parameters:
+        -----------
+        seats : numpy.ndarray
+            Seat indices, in allocation order
+
+        Returns:
+        --------
+        numpy.ndarray
+            Seats actually updated
+        """
+        seats = np.asarray(seats, dtype=np.int64)
+        seats = seats[~self.is_current[seats]]
+        councils = self.seat_council[seats]
+        votes = padded_allocate(
+            self.seat_voting_power[seats],
+            self.seat_codes[seats],
+            self.quality[councils],
+            self.popularity[councils],
+            self.valid[councils],
+            self.rng
+        )
+        np.add.at(self.totals, councils, votes - self.votes[seats])
+        self.votes[seats] = votes
+        self.is_current[seats] = self.seat_deterministic[seats]
+        return seats
+
+    def _grow(self):
+        """Double the capacity of the history arrays."""
+        capacity = len(self.month) * 2
+        for name in ('month', 'pool_history', 'top_up_history', 'distribution_history', 'allocation_history'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def distribute_month(self, month: int) -> Dict[str, Any]:
+        """
+        Distribute every council's monthly amount in proportion to its votes.
+
+        Parameters:
+        -----------
+        month : int
+            Current month in the simulation
+
+        Returns:
+        --------
+        dict
+            'month', then per council 'pool_balance', 'distribution' and
+            'allocations' (councils x max grantees) and 'annual_funding_added'
+        """
+        amounts = self.pool_balance * self.distribution_rate
+        self.pool_balance -= amounts
+
+        total_votes = self.totals.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distribution = np.where(total_votes > 0, self.totals / total_votes * amounts[:, None], 0.0)
+        self.received_funds += distribution
+
+        top_up = np.zeros(self.num_councils)
+        if (month + 1) % 12 == 0:
+            top_up = self.annual_funding_addition.copy()
+            self.pool_balance += top_up
+
+        if self.size == len(self.month):
+            self._grow()
+        i = self.size
+        self.month[i] = month
+        self.pool_history[i] = self.pool_balance
+        self.top_up_history[i] = top_up
+        self.distribution_history[i] = distribution
+        self.allocation_history[i] = self.totals
+        self.size += 1
+
+        return {
+            'month': month,
+            'pool_balance': self.pool_balance.copy(),
+            'distribution': distribution,
+            'allocations': self.totals.copy(),
+            'annual_funding_added': top_up
+        }
+
+    def iter_months(self, duration_months: int, start_month: int = 0):
+        """
+        Simulate months, yielding each month's snapshot.
+
+        Parameters:
+        -----------
+        duration_months : int
+            Number of months to simulate
+        start_month : int
+            Index of the first month
+
+        Yields:
+        -------
+        dict
+            Snapshot from distribute_month
+        """
+        for month in range(start_month, start_month + duration_months):
+            self.allocate(self.active_seats())
+            yield self.distribute_month(month)
+
+    def council_history(self, council: int) -> pd.DataFrame:
+        """
+        One council's history in the single-council wide format, so the
+        existing plots and metrics apply to it.
+
+        Parameters:
+        -----------
+        council : int
+            Council index
+
+        Returns:
+        --------
+        pandas.DataFrame
+            As returned by Council.get_history_dataframe
+        """
+        n, num_grantees = self.size, self.num_grantees[council]
+        history = HistoryBuffer([g.id for g in self.grantees[council]], n)
+        history.month[:n] = self.month[:n]
+        history.pool_balance[:n] = self.pool_history[:n, council]
+        history.annual_funding_added[:n] = self.top_up_history[:n, council]
+        history.distribution[:n] = self.distribution_history[:n, council, :num_grantees]
+        history.allocations[:n] = self.allocation_history[:n, council, :num_grantees]
+        history.size = n
+        return history.to_wide_frame()
+
+    def overlap_matrix(self) -> np.ndarray:
+        """
+        Number of members every pair of councils shares.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Integer (councils x councils) matrix; the diagonal holds each
+            council's member count
+        """
+        order = np.argsort(self.seat_member, kind='stable')
+        members, councils = self.seat_member[order], self.seat_council[order]
+        starts = np.flatnonzero(np.r_[True, members[1:] != members[:-1]])
+        sizes = np.diff(np.r_[starts, len(members)])
+
+        # Pair every seat with every seat of the same member
+        group_size = np.repeat(sizes, sizes)
+        left = np.repeat(councils, group_size)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(group_size) - group_size, group_size)
+        right = councils[np.repeat(np.repeat(starts, sizes), group_size) + offsets]
+        num_councils = self.num_councils
+        return np.bincount(left * num_councils + right, minlength=num_councils ** 2).reshape(num_councils, num_councils)
+
+    def council_frame(self) -> pd.DataFrame:
+        """
+        Per-council outcomes.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per council: chain, token, members (and how many sit on
+            other councils too), grantees, final pool, total distributed,
+            viable grantees and the mean monthly gini, concentration, hhi
+            and quality correlation
+        """
+        from utils.metrics import distribution_metrics
+
+        num_councils, n = self.num_councils, self.size
+        seats_per_member = np.bincount(self.seat_member, minlength=len(self.members))
+        metrics = {name: np.zeros(num_councils) for name in ('gini', 'concentration', 'hhi', 'quality_correlation')}
+        # Councils with the same number of grantees are measured together
+        for num_grantees in np.unique(self.num_grantees):
+            councils = np.flatnonzero(self.num_grantees == num_grantees)
+            distribution = self.distribution_history[:n, councils, :num_grantees].transpose(1, 0, 2)
+            quality = self.quality[councils, None, :num_grantees]
+            for name, values in distribution_metrics(distribution, quality).items():
+                if name in metrics:
+                    metrics[name][councils] = values.mean(axis=1) if n else 0.0
+
+        viable = (self.received_funds >= self.min_funding_threshold) & self.valid
+        return pd.DataFrame({
+            'council_id': self.council_ids,
+            'chain': self.chains,
+            'token': self.tokens,
+            'members': np.bincount(self.seat_council, minlength=num_councils),
+            'shared_members': np.bincount(
+                self.seat_council, weights=seats_per_member[self.seat_member] > 1, minlength=num_councils
+            ).astype(np.int64),
+            'grantees': self.num_grantees,
+            'final_pool': self.pool_balance,
+            'total_distributed': self.distribution_history[:n].sum(axis=(0, 2)),
+            'viable_grantees': viable.sum(axis=1),
+            **metrics
+        })
+
+    def member_frame(self) -> pd.DataFrame:
+        """
+        Per-member footprint across the network.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per member: councils sat on, total seat voting power
+            and the share of network-wide funding their current votes steer
+            (each seat's share of its council's votes, weighted by what that
+            council has distributed)
+        """
+        num_members = len(self.members)
+        council_votes = self.totals.sum(axis=1)
+        distributed = self.distribution_history[:self.size].sum(axis=(0, 2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seat_share = np.where(
+                council_votes[self.seat_council] > 0,
+                self.votes.sum(axis=1) / council_votes[self.seat_council],
+                0.0
+            )
+        steered = np.bincount(self.seat_member, weights=seat_share * distributed[self.seat_council],
+                              minlength=num_members)
+        total = distributed.sum()
+        return pd.DataFrame({
+            'member_id': self.members.ids(),
+            'councils': np.bincount(self.seat_member, minlength=num_members),
+            'voting_power': np.bincount(self.seat_member, weights=self.seat_voting_power,
+                                        minlength=num_members).astype(np.int64),
+            'funding_share': steered / total if total > 0 else np.zeros(num_members)
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Cross-council outcomes.
+
+        Returns:
+        --------
+        dict
+            'councils', 'members', 'seats', 'multi_council_members' (share of
+            members on more than one council), 'multi_council_funding_share'
+            (share of funding steered by them), 'mean_overlap' (mean members
+            shared per pair of councils), 'mean_gini', 'viable_grantees',
+            and per-token 'final_pool' and 'total_distributed' (pools in
+            different tokens are not added together)
+        """
+        councils = self.council_frame()
+        members = self.member_frame()
+        overlap = self.overlap_matrix()
+        num_councils = self.num_councils
+        pairs = num_councils * (num_councils - 1)
+        multi = members['councils'] > 1
+        by_token = councils.groupby('token')[['final_pool', 'total_distributed']].sum()
+        return {
+            'councils': num_councils,
+            'members': int((members['councils'] > 0).sum()),
+            'seats': len(self.seat_member),
+            'multi_council_members': float(multi.sum() / max(1, (members['councils'] > 0).sum())),
+            'multi_council_funding_share': float(members.loc[multi, 'funding_share'].sum()),
+            'mean_overlap': float((overlap.sum() - np.trace(overlap)) / pairs) if pairs else 0.0,
+            'mean_gini': float(councils['gini'].mean()) if num_councils else 0.0,
+            'viable_grantees': int(councils['viable_grantees'].sum()),
+            'final_pool': by_token['final_pool'].to_dict(),
+            'total_distributed': by_token['total_distributed'].to_dict()
+        }
@@ -0,0 +1,394 @@
+import numpy as np
+import pandas as pd
+from decimal import Decimal, ROUND_FLOOR
+from fractions import Fraction
+from typing import Dict, Any, List, Tuple, Union
+
+from .stream import SECONDS_PER_MONTH
+
+# Unit arithmetic modes selectable with config['unit_arithmetic']
+UNIT_ARITHMETIC = ('float', 'exact')
+
+# Largest flow rate a Superfluid pool accepts (int96)
+MAX_FLOW_RATE = 2 ** 95 - 1
+
+_INT64_MAX = int(np.iinfo(np.int64).max)
+
+def to_wei(amount: Union[int, float, str], decimals: int = 18) -> int:
+    """
+    Convert a token amount to the token's smallest unit.
+
+    The amount is read through its decimal representation, so 0.1 tokens
+    is exactly 10 ** (decimals - 1) wei; fractions of a wei are dropped.
+
+    Parameters:
+    -----------
+    amount : int, float or str
+        Amount in tokens
+    decimals : int
+        Token decimals
+
+    Returns:
+    --------
+    int
+        Amount in wei
+    """
+    return int(Decimal(str(amount)).scaleb(decimals).to_integral_value(rounding=ROUND_FLOOR))
+
+def _widen(values: np.ndarray, bound: int) -> np.ndarray:
+    """Switch to Python ints when results may reach `bound`, which int64 cannot hold."""
+    return values.astype(object) if bound > _INT64_MAX else values
+
+def member_flow_rates(flow_rate: int, units: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Split a flow rate between pool members as a Superfluid GDA pool does.
+
+    The pool pays floor(flow_rate / total_units) per unit per second; the
+    remainder is the adjustment flow, which goes back to the pool admin.
+
+    Parameters:
+    -----------
+    flow_rate : int
+        Requested flow rate in wei per second
+    units : numpy.ndarray
+        Integer units of each member
+
+    Returns:
+    --------
+    tuple
+        (flow rate of each member in wei per second, flow rate per unit)
+    """
+    total_units = int(units.sum())
+    if flow_rate <= 0 or total_units == 0:
+        return np.zeros(len(units), dtype=np.int64), 0
+    per_unit = flow_rate // total_units
+    return _widen(units, flow_rate) * per_unit, per_unit
+
+class ExactPool:
+    """
+    Integer ledger of the council's Superfluid GDA pool.
+
+    Mirrors the on-chain arithmetic instead of splitting funds as floats:
+    the balance is an exact integer in the token's smallest unit (wei),
+    pool units are the integer vote totals PoolManager passes to
+    pool.updateMemberUnits (voting power has decimals() == 0), the
+    distributor streams an integer number of wei per second, and the pool
+    pays floor(flow_rate / total_units) per unit per second. What rounding
+    holds back never leaves the council (the adjustment flow returns to the
+    pool admin); it is reported as dust per grantee and per month.
+
+    Per-grantee arithmetic is vectorized, in int64 when the bounds of the
+    result allow it and in object arrays of Python ints otherwise, so
+    18-decimal balances beyond int64 stay exact up to uint128 and beyond.
+    """
+
+    def __init__(self, balance: Union[int, float], token_decimals: int = 18, num_columns: int = 0,
+                 seconds_per_month: float = SECONDS_PER_MONTH):
+        """
+        Initialize an ExactPool instance.
+
+        Parameters:
+        -----------
+        balance : int or float
+            Initial pool balance in tokens
+        token_decimals : int
+            Decimals of the distributed super token
+        num_columns : int
+            Number of history columns (grantees, including removed ones)
+        seconds_per_month : float
+            Length of a month, rounded down to whole seconds
+        """
+        self.decimals = int(token_decimals)
+        self.scale = 10 ** self.decimals
+        self.balance = to_wei(balance, self.decimals)
+        self.seconds_per_month = int(seconds_per_month)
+        self.flow_rate = 0  # requested wei per second
+
+        self.received = np.zeros(num_columns, dtype=object)  # total wei per history column
+        self.month_paid = np.zeros(num_columns, dtype=object)
+        self.month_dust = np.zeros(num_columns, dtype=object)
+        self.month_unpaid = 0  # wei the distributor meant to stream this month but did not
+
+        self.months = []
+        self.paid_history = []
+        self.dust_history = []
+        self.unpaid_history = []
+        self.balance_history = []
+
+    def wei(self, amount: Union[int, float]) -> int:
+        """
+        Convert tokens to wei.
+
+        Parameters:
+        -----------
+        amount : int or float
+            Amount in tokens
+
+        Returns:
+        --------
+        int
+            Amount in wei, rounded down
+        """
+        return to_wei(amount, self.decimals)
+
+    def tokens(self, wei: Any) -> Any:
+        """
+        Convert wei to tokens.
+
+        Parameters:
+        -----------
+        wei : int or numpy.ndarray
+            Amount(s) in wei
+
+        Returns:
+        --------
+        float or numpy.ndarray
+            Amount(s) in tokens, correctly rounded to float
+        """
+        if np.ndim(wei) == 0:
+            return int(wei) / self.scale
+        return (np.asarray(wei, dtype=object) / self.scale).astype(float)
+
+    def add_column(self):
+        """Add a history column for a new grantee."""
+        self.received = np.append(self.received, np.zeros(1, dtype=object))
+        self.month_paid = np.append(self.month_paid, np.zeros(1, dtype=object))
+        self.month_dust = np.append(self.month_dust, np.zeros(1, dtype=object))
+
+    def set_flow_rate(self, flow_rate: int):
+        """
+        Set the distributor's flow rate.
+
+        Parameters:
+        -----------
+        flow_rate : int
+            Flow rate in wei per second
+        """
+        flow_rate = int(flow_rate)
+        if not 0 <= flow_rate <= MAX_FLOW_RATE:
+            raise ValueError(f"Flow rate {flow_rate} outside the pool's int96 range")
+        self.flow_rate = flow_rate
+
+    def start_month(self, distribution_rate: float) -> int:
+        """
+        Set the flow rate that streams distribution_rate of the balance over
+        a month, rounded down to whole wei per second.
+
+        Parameters:
+        -----------
+        distribution_rate : float
+            Monthly distribution rate as a fraction, read as a decimal
+
+        Returns:
+        --------
+        int
+            Flow rate in wei per second
+        """
+        rate = Fraction(str(distribution_rate))
+        amount = self.balance * rate.numerator // rate.denominator
+        flow_rate = amount // self.seconds_per_month
+        # Per-second rounding of the flow rate is this month's first dust
+        self.month_unpaid += amount - flow_rate * self.seconds_per_month
+        self.set_flow_rate(flow_rate)
+        return flow_rate
+
+    def pending(self, units: np.ndarray, elapsed: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Amount the pool would pay each grantee over `elapsed` seconds at the
+        current flow rate and units, without paying it.
+
+        Parameters:
+        -----------
+        units : numpy.ndarray
+            Integer units (total votes) of each current grantee
+        elapsed : int
+            Whole seconds to stream
+
+        Returns:
+        --------
+        tuple
+            (wei paid per grantee, dust per grantee, seconds actually
+            streamed); the stream stops once the balance cannot pay a
+            full second
+        """
+        units = np.asarray(units, dtype=np.int64)
+        total_units = int(units.sum())
+        per_member, per_unit = member_flow_rates(self.flow_rate, units)
+        actual = per_unit * total_units
+        elapsed = max(int(elapsed), 0)
+        if total_units == 0 or self.flow_rate == 0 or elapsed == 0:
+            zeros = np.zeros(len(units), dtype=np.int64)
+            return zeros, zeros, elapsed
+        if actual * elapsed > self.balance:
+            elapsed = self.balance // actual
+
+        paid = _widen(per_member, actual * elapsed) * elapsed
+        # Dust against each grantee's exact share of the requested flow
+        requested = self.flow_rate * elapsed
+        ideal = _widen(units, total_units * requested) * requested // total_units
+        return paid, ideal - paid, elapsed
+
+    def stream(self, units: np.ndarray, columns: np.ndarray, elapsed: int) -> np.ndarray:
+        """
+        Pay grantees for `elapsed` seconds at the current flow rate and units.
+
+        Parameters:
+        -----------
+        units : numpy.ndarray
+            Integer units (total votes) of each current grantee
+        columns : numpy.ndarray
+            History column of each current grantee
+        elapsed : int
+            Whole seconds to stream
+
+        Returns:
+        --------
+        numpy.ndarray
+            Wei paid to each current grantee
+        """
+        paid, dust, streamed = self.pending(units, elapsed)
+        total_paid = int(paid.sum())
+        self.balance -= total_paid
+        self.month_unpaid += self.flow_rate * streamed - total_paid
+        if streamed < int(elapsed):
+            # The pool ran dry and the stream stops
+            self.flow_rate = 0
+
+        # Accumulate as Python ints, which cannot overflow
+        paid_wei = paid.astype(object)
+        self.month_paid[columns] += paid_wei
+        self.month_dust[columns] += dust.astype(object)
+        self.received[columns] += paid_wei
+        return paid
+
+    def top_up(self, amount: Union[int, float]) -> int:
+        """
+        Add funds to the pool.
+
+        Parameters:
+        -----------
+        amount : int or float
+            Amount in tokens
+
+        Returns:
+        --------
+        int
+            Amount added in wei
+        """
+        wei = self.wei(amount)
+        self.balance += wei
+        return wei
+
+    def close_month(self, month: int) -> Dict[str, Any]:
+        """
+        Record the month's payouts and dust and start a new month.
+
+        Parameters:
+        -----------
+        month : int
+            Month index
+
+        Returns:
+        --------
+        dict
+            'paid_wei' and 'dust_wei' (per history column), 'month_dust_wei'
+            (everything the distributor meant to stream but did not,
+            including while no grantee had units) and 'pool_balance_wei'
+        """
+        record = {
+            'paid_wei': self.month_paid,
+            'dust_wei': self.month_dust,
+            'month_dust_wei': self.month_unpaid,
+            'pool_balance_wei': self.balance
+        }
+        self.months.append(month)
+        self.paid_history.append(self.month_paid)
+        self.dust_history.append(self.month_dust)
+        self.unpaid_history.append(self.month_unpaid)
+        self.balance_history.append(self.balance)
+
+        num_columns = len(self.received)
+        self.month_paid = np.zeros(num_columns, dtype=object)
+        self.month_dust = np.zeros(num_columns, dtype=object)
+        self.month_unpaid = 0
+        return record
+
+    def month_frame(self) -> pd.DataFrame:
+        """
+        Per-month payouts and dust.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per month: 'paid_wei', 'dust_wei' (month total),
+            'pool_balance_wei' (Python ints) and 'dust' in tokens
+        """
+        dust = np.array(self.unpaid_history, dtype=object)
+        return pd.DataFrame({
+            'month': np.array(self.months, dtype=np.int64),
+            'paid_wei': np.array([row.sum() for row in self.paid_history], dtype=object),
+            'dust_wei': dust,
+            'pool_balance_wei': np.array(self.balance_history, dtype=object),
+            'dust': self.tokens(dust)
+        })
+
+    def grantee_frame(self, grantee_ids: List[str]) -> pd.DataFrame:
+        """
+        Per-(month, grantee) payouts and dust.
+
+        Parameters:
+        -----------
+        grantee_ids : list
+            Grantee ID of each history column
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per (month, grantee): 'paid_wei' and 'dust_wei' (Python
+            ints); grantees added later are zero in earlier months
+        """
+        num_columns = len(grantee_ids)
+
+        def stack(rows):
+            matrix = np.zeros((len(rows), num_columns), dtype=object)
+            for i, row in enumerate(rows):
+                matrix[i, :len(row)] = row
+            return matrix.ravel()
+
+        return pd.DataFrame({
+            'month': np.repeat(np.array(self.months, dtype=np.int64), num_columns),
+            'grantee_id': np.tile(np.array(grantee_ids, dtype=object), len(self.months)),
+            'paid_wei': stack(self.paid_history),
+            'dust_wei': stack(self.dust_history)
+        })
+
+    def compare_balances(self, grantee_ids: List[str], onchain: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Compare simulated payouts with balances read on-chain.
+
+        Parameters:
+        -----------
+        grantee_ids : list
+            Grantee ID of each history column
+        onchain : dict
+            Grantee ID -> amount received from the pool in wei (e.g.
+            getTotalAmountReceivedByMember); BigInt strings are accepted
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per grantee: 'simulated_wei', 'onchain_wei',
+            'difference_wei' and 'matches'; grantees missing on-chain count
+            as zero
+        """
+        onchain = {str(k).lower(): int(v) for k, v in onchain.items()}
+        simulated = np.asarray(self.received, dtype=object)
+        expected = np.array([onchain.get(str(g).lower(), 0) for g in grantee_ids], dtype=object)
+        difference = simulated - expected
+        return pd.DataFrame({
+            'grantee_id': list(grantee_ids),
+            'simulated_wei': simulated,
+            'onchain_wei': expected,
+            'difference_wei': difference,
+            'matches': difference == 0
+        })
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+class HistoryBuffer:
+    """
+    Columnar simulation history kept in preallocated NumPy arrays.
+
+    Distribution and allocation history are (months x grantees) matrices;
+    pool balance and annual top-ups are per-month vectors. Buffers grow by
+    doubling if more months are recorded than were preallocated.
+    """
+
+    def __init__(self, grantee_ids: List[str], capacity: int = 12):
+        """
+        Initialize a HistoryBuffer instance.
+
+        Parameters:
+        -----------
+        grantee_ids : list
+            Grantee IDs, one per matrix column
+        capacity : int
+            Number of months to preallocate
+        """
+        self.grantee_ids = list(grantee_ids)
+        self.size = 0
+
+        capacity = max(1, int(capacity))
+        num_grantees = len(self.grantee_ids)
+        self.month = np.zeros(capacity, dtype=np.int64)
+        self.pool_balance = np.zeros(capacity, dtype=float)
+        self.annual_funding_added = np.zeros(capacity, dtype=float)
+        self.distribution = np.zeros((capacity, num_grantees), dtype=float)
+        self.allocations = np.zeros((capacity, num_grantees), dtype=np.int64)
+
+    def _grow(self):
+        """Double the capacity of every buffer."""
+        capacity = len(self.month) * 2
+        for name in ('month', 'pool_balance', 'annual_funding_added', 'distribution', 'allocations'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add_column(self, grantee_id: str):
+        """
+        Add a grantee column, zero for every month already recorded.
+
+        Parameters:
+        -----------
+        grantee_id : str
+            ID of the new grantee
+        """
+        self.grantee_ids.append(grantee_id)
+        self.distribution = np.hstack([self.distribution, np.zeros((len(self.month), 1), dtype=float)])
+        self.allocations = np.hstack([self.allocations, np.zeros((len(self.month), 1), dtype=np.int64)])
+
+    def append(self, month: int, pool_balance: float, distribution: np.ndarray,
+               allocations: np.ndarray, annual_funding_added: float = 0):
+        """
+        Record the state of one month.
+
+        Parameters:
+        -----------
+        month : int
+            Month index
+        pool_balance : float
+            Pool balance after distribution and top-up
+        distribution : numpy.ndarray
+            Amount distributed to each grantee
+        allocations : numpy.ndarray
+            Total votes for each grantee
+        annual_funding_added : float
+            Amount added to the pool this month
+        """
+        if self.size == len(self.month):
+            self._grow()
+
+        i = self.size
+        self.month[i] = month
+        self.pool_balance[i] = pool_balance
+        self.annual_funding_added[i] = annual_funding_added
+        self.distribution[i] = distribution
+        self.allocations[i] = allocations
+        self.size += 1
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        """Build the dictionary form of one month's record."""
+        return {
+            'month': int(self.month[i]),
+            'pool_balance': float(self.pool_balance[i]),
+            'distribution': dict(zip(self.grantee_ids, self.distribution[i].tolist())),
+            'allocations': dict(zip(self.grantee_ids, self.allocations[i].tolist())),
+            'annual_funding_added': float(self.annual_funding_added[i])
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("history index out of range")
+        return self._record(index)
+
+    def __iter__(self):
+        return (self._record(i) for i in range(self.size))
+
+    def to_wide_frame(self) -> pd.DataFrame:
+        """
+        Build the wide history frame with dist_to_*/alloc_to_* columns.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per month
+        """
+        if self.size == 0:
+            return pd.DataFrame()
+
+        n = self.size
+        records = [self._record(i) for i in range(n)]
+        columns = {
+            'month': self.month[:n],
+            'pool_balance': self.pool_balance[:n],
+            'distribution': [r['distribution'] for r in records],
+            'allocations': [r['allocations'] for r in records],
+            'annual_funding_added': self.annual_funding_added[:n]
+        }
+        columns.update({f'dist_to_{g}': self.distribution[:n, j] for j, g in enumerate(self.grantee_ids)})
+        columns.update({f'alloc_to_{g}': self.allocations[:n, j] for j, g in enumerate(self.grantee_ids)})
+
+        return pd.DataFrame(columns)
+
+    def to_long_frame(self) -> pd.DataFrame:
+        """
+        Build the long (tidy) history frame.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per (month, grantee) with allocation and distribution columns
+        """
+        n = self.size
+        num_grantees = len(self.grantee_ids)
+        return pd.DataFrame({
+            'month': np.repeat(self.month[:n], num_grantees),
+            'grantee_id': np.tile(np.array(self.grantee_ids, dtype=object), n),
+            'allocation': self.allocations[:n].ravel(),
+            'distribution': self.distribution[:n].ravel()
+        })
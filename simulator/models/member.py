@@ -1,6 +1,8 @@
 import numpy as np
 from typing import List, Dict, Any, Optional
 
+from .allocation import allocate_member
+
 class Member:
     """
     Member model representing a council member with voting power and allocation strategies.
@@ -17,16 +19,22 @@ class Member:
         voting_power : int
             Amount of voting power (non-transferable tokens)
         strategy : str
-            Allocation strategy ('random', 'merit', 'popularity', 'coalition')
+            Allocation strategy (any name registered in models/allocation.py,
+            e.g. 'random', 'merit', 'popularity', 'coalition')
         """
         self.id = id
         self.voting_power = voting_power
         self.strategy = strategy
         self.coalition = None  # For coalition-based strategies
         
-    def allocate(self, grantees: List[Any], strategy: Optional[str] = None) -> Dict[str, int]:
+    def allocate(self, grantees: List[Any], strategy: Optional[str] = None,
+                 rng: Optional[np.random.Generator] = None) -> Dict[str, int]:
         """
         Allocate voting power to grantees based on strategy.
+
+        Runs the member through the batched strategy engine as a batch of
+        one (see models/allocation.py), so the result matches the member's
+        row of a council's allocation matrix.
         
         Parameters:
         -----------
@@ -34,86 +42,15 @@ class Member:
             List of Grantee objects
         strategy : str, optional
             Override the member's default strategy
+        rng : numpy.random.Generator, optional
+            Random number generator for the random strategy
             
         Returns:
         --------
         dict
             Dictionary mapping grantee_id to allocation amount
         """
-        strategy = strategy or self.strategy
-        allocations = {}
-        
-        if not grantees:
-            return allocations
-        
-        if strategy == 'random':
-            # Random allocation
-            weights = np.random.random(len(grantees))
-            weights = weights / weights.sum() * self.voting_power
-            
-            for i, grantee in enumerate(grantees):
-                allocations[grantee.id] = int(weights[i])
-                
-        elif strategy == 'merit':
-            # Allocate based on grantee quality
-            total_quality = sum(g.quality for g in grantees)
-            if total_quality > 0:
-                for grantee in grantees:
-                    allocations[grantee.id] = int((grantee.quality / total_quality) * self.voting_power)
-            else:
-                # Equal allocation if no quality information
-                equal_amount = self.voting_power // len(grantees)
-                for grantee in grantees:
-                    allocations[grantee.id] = equal_amount
-                
-        elif strategy == 'popularity':
-            # Allocate based on grantee popularity
-            total_popularity = sum(g.popularity for g in grantees)
-            if total_popularity > 0:
-                for grantee in grantees:
-                    allocations[grantee.id] = int((grantee.popularity / total_popularity) * self.voting_power)
-            else:
-                # Equal allocation if no popularity information
-                equal_amount = self.voting_power // len(grantees)
-                for grantee in grantees:
-                    allocations[grantee.id] = equal_amount
-        
-        elif strategy == 'coalition':
-            # Allocate based on coalition preferences
-            if self.coalition:
-                coalition_grantees = [g for g in grantees if g.id in self.coalition]
-                if coalition_grantees:
-                    equal_amount = self.voting_power // len(coalition_grantees)
-                    for grantee in coalition_grantees:
-                        allocations[grantee.id] = equal_amount
-                else:
-                    # Fallback to random if no coalition grantees present
-                    return self.allocate(grantees, 'random')
-            else:
-                # Fallback to random if no coalition defined
-                return self.allocate(grantees, 'random')
-        
-        else:
-            # Default to equal allocation for unknown strategies
-            equal_amount = self.voting_power // len(grantees)
-            for grantee in grantees:
-                allocations[grantee.id] = equal_amount
-        
-        # Ensure we don't allocate more than voting power due to rounding
-        total_allocated = sum(allocations.values())
-        if total_allocated > self.voting_power:
-            # Adjust the largest allocation down
-            max_grantee = max(allocations, key=allocations.get)
-            allocations[max_grantee] -= (total_allocated - self.voting_power)
-        
-        # Ensure we allocate all voting power
-        remaining = self.voting_power - sum(allocations.values())
-        if remaining > 0 and allocations:
-            # Add remaining to the smallest allocation
-            min_grantee = min(allocations, key=allocations.get)
-            allocations[min_grantee] += remaining
-                
-        return allocations
+        return allocate_member(self, grantees, strategy, rng)
     
     def join_coalition(self, coalition_grantees):
         """
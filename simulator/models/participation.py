@@ -0,0 +1,255 @@
+import numpy as np
+from typing import Dict, Any, Optional
+
+# Participation models selectable with config['participation_model']
+PARTICIPATION_MODELS = ('uniform', 'propensity', 'markov')
+
+def uniform_sample(rng: np.random.Generator, num_members: int, participation_rate: float) -> np.ndarray:
+    """
+    Draw a fixed-size uniform sample of member rows.
+
+    Parameters:
+    -----------
+    rng : numpy.random.Generator
+        Random number generator
+    num_members : int
+        Number of members
+    participation_rate : float
+        Fraction of members who participate (0.0 to 1.0)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Rows of the active members, in random order
+    """
+    num_active = int(num_members * participation_rate)
+    if num_active == 0 and num_members > 0:
+        num_active = 1  # Ensure at least one member if any exist
+    return rng.choice(num_members, num_active, replace=False)
+
+def member_propensities(
+    num_members: int,
+    participation_rate: float,
+    heterogeneity: float = 0.0,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Draw per-member participation probabilities averaging participation_rate.
+
+    Propensities follow a Beta distribution with mean participation_rate and
+    variance heterogeneity * rate * (1 - rate): 0 gives every member the same
+    propensity, 1 splits members into those who always and those who never
+    participate.
+
+    Parameters:
+    -----------
+    num_members : int
+        Number of members
+    participation_rate : float
+        Mean participation probability (0.0 to 1.0)
+    heterogeneity : float
+        Spread of propensities across members (0.0 to 1.0)
+    rng : numpy.random.Generator, optional
+        Random number generator
+
+    Returns:
+    --------
+    numpy.ndarray
+        Participation probability of each member
+    """
+    rate = float(np.clip(participation_rate, 0.0, 1.0))
+    if heterogeneity <= 0 or rate in (0.0, 1.0):
+        return np.full(num_members, rate)
+
+    rng = rng or np.random.default_rng()
+    if heterogeneity >= 1:
+        return (rng.random(num_members) < rate).astype(float)
+    concentration = 1.0 / heterogeneity - 1.0
+    return rng.beta(rate * concentration, (1.0 - rate) * concentration, num_members)
+
+class ParticipationModel:
+    """
+    Chooses which members are active each month.
+
+    Models return row indices into the council's members, so sampling never
+    builds member objects. Models that keep per-member state are told about
+    membership changes through add_members and remove_members, keeping the
+    state aligned with the council's rows.
+    """
+
+    def sample(self, rng: np.random.Generator, num_members: int) -> np.ndarray:
+        """
+        Draw this month's active members.
+
+        Parameters:
+        -----------
+        rng : numpy.random.Generator
+            Random number generator
+        num_members : int
+            Number of members on the council
+
+        Returns:
+        --------
+        numpy.ndarray
+            Rows of the active members, in allocation order
+        """
+        raise NotImplementedError
+
+    def add_members(self, count: int):
+        """
+        Extend per-member state for members appended to the council.
+
+        Parameters:
+        -----------
+        count : int
+            Number of new members
+        """
+
+    def remove_members(self, rows: np.ndarray):
+        """
+        Drop per-member state of removed members.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the removed members
+        """
+
+    @staticmethod
+    def _at_least_one(rng: np.random.Generator, active: np.ndarray) -> np.ndarray:
+        """Activate one random member when a month would otherwise have none."""
+        if len(active) and not active.any():
+            active[rng.integers(len(active))] = True
+        return np.flatnonzero(active)
+
+class UniformParticipation(ParticipationModel):
+    """
+    The same fraction of members every month, drawn uniformly without
+    replacement and independently of earlier months.
+    """
+
+    def __init__(self, participation_rate: float = 1.0):
+        """
+        Initialize a UniformParticipation instance.
+
+        Parameters:
+        -----------
+        participation_rate : float
+            Fraction of members who participate (0.0 to 1.0)
+        """
+        self.participation_rate = participation_rate
+
+    def sample(self, rng: np.random.Generator, num_members: int) -> np.ndarray:
+        return uniform_sample(rng, num_members, self.participation_rate)
+
+class PropensityParticipation(ParticipationModel):
+    """
+    Every member participates independently with their own probability,
+    so the number of active members varies from month to month.
+    """
+
+    def __init__(self, propensity: np.ndarray):
+        """
+        Initialize a PropensityParticipation instance.
+
+        Parameters:
+        -----------
+        propensity : numpy.ndarray
+            Participation probability of each member
+        """
+        self.propensity = np.asarray(propensity, dtype=float).copy()
+        self.default_propensity = float(self.propensity.mean()) if len(self.propensity) else 1.0
+
+    def sample(self, rng: np.random.Generator, num_members: int) -> np.ndarray:
+        return self._at_least_one(rng, rng.random(num_members) < self.propensity)
+
+    def add_members(self, count: int):
+        # New members participate at the council's average rate
+        self.propensity = np.append(self.propensity, np.full(count, self.default_propensity))
+
+    def remove_members(self, rows: np.ndarray):
+        self.propensity = np.delete(self.propensity, rows)
+
+class MarkovParticipation(PropensityParticipation):
+    """
+    Participation as a two-state Markov chain per member, so members who
+    were active last month tend to stay active (churn).
+
+    With propensity r and persistence rho, an active member stays active
+    with probability r + rho * (1 - r) and an inactive one returns with
+    probability r * (1 - rho). Each member's long-run participation stays
+    r, and rho is the correlation between consecutive months: 0 is the
+    propensity model, 1 freezes the first month's active set.
+    """
+
+    def __init__(self, propensity: np.ndarray, persistence: float = 0.5):
+        """
+        Initialize a MarkovParticipation instance.
+
+        Parameters:
+        -----------
+        propensity : numpy.ndarray
+            Long-run participation probability of each member
+        persistence : float
+            Correlation between a member's activity in consecutive months
+            (0.0 to 1.0)
+        """
+        super().__init__(propensity)
+        self.persistence = float(np.clip(persistence, 0.0, 1.0))
+        self.active = None  # drawn from the propensities in the first month
+
+    def sample(self, rng: np.random.Generator, num_members: int) -> np.ndarray:
+        draws = rng.random(num_members)
+        if self.active is None:
+            self.active = draws < self.propensity
+        else:
+            stay = self.propensity + self.persistence * (1.0 - self.propensity)
+            rejoin = self.propensity * (1.0 - self.persistence)
+            self.active = draws < np.where(self.active, stay, rejoin)
+        return self._at_least_one(rng, self.active)
+
+    def add_members(self, count: int):
+        super().add_members(count)
+        if self.active is not None:
+            self.active = np.append(self.active, np.zeros(count, dtype=bool))
+
+    def remove_members(self, rows: np.ndarray):
+        super().remove_members(rows)
+        if self.active is not None:
+            self.active = np.delete(self.active, rows)
+
+def create_participation(config: Dict[str, Any], num_members: int,
+                         rng: Optional[np.random.Generator] = None) -> ParticipationModel:
+    """
+    Build the participation model a configuration asks for.
+
+    Parameters:
+    -----------
+    config : dict
+        Simulation parameters; 'participation_model', 'participation_rate',
+        'participation_heterogeneity' and 'participation_persistence' are used
+    num_members : int
+        Number of members
+    rng : numpy.random.Generator, optional
+        Random number generator for member propensities (the uniform model
+        draws none)
+
+    Returns:
+    --------
+    ParticipationModel
+        The participation model
+    """
+    model = config.get('participation_model', 'uniform')
+    participation_rate = config.get('participation_rate', 0.8)
+
+    if model == 'uniform':
+        return UniformParticipation(participation_rate)
+    if model not in PARTICIPATION_MODELS:
+        raise ValueError(f"Unknown participation model: {model} (expected one of {PARTICIPATION_MODELS})")
+
+    propensity = member_propensities(
+        num_members, participation_rate, config.get('participation_heterogeneity', 0.0), rng
+    )
+    if model == 'propensity':
+        return PropensityParticipation(propensity)
+    return MarkovParticipation(propensity, config.get('participation_persistence', 0.5))
@@ -0,0 +1,608 @@
+import re
+import numpy as np
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional, Union
+
+from .member import Member
+from .grantee import Grantee
+from .coalitions import CoalitionIndex
+
+def _parse_ids(ids: List[str], prefix: str) -> Optional[np.ndarray]:
+    """Return the serial numbers of ids of the form <prefix><n>, or None if any id differs."""
+    pattern = re.compile(re.escape(prefix) + r'([1-9][0-9]*)')
+    serials = []
+    for entity_id in ids:
+        match = pattern.fullmatch(entity_id)
+        if match is None:
+            return None
+        serials.append(int(match.group(1)))
+    return np.array(serials, dtype=np.int64)
+
+class _IdColumn:
+    """
+    Integer id column shared by the population tables.
+
+    Generated ids (m1, m2, ... or g1, g2, ...) are stored as their int64
+    serial number and formatted on access. A table that receives any other
+    id (such as an address from a replayed event log) switches to keeping
+    every id as a string label.
+    """
+
+    def __init__(self, prefix: str, serials: np.ndarray):
+        self.prefix = prefix
+        self.serials = np.asarray(serials, dtype=np.int64)
+        self.labels = None
+
+    def __len__(self) -> int:
+        return len(self.serials) if self.labels is None else len(self.labels)
+
+    def get(self, row: int) -> str:
+        if self.labels is not None:
+            return self.labels[row]
+        return f"{self.prefix}{self.serials[row]}"
+
+    def strings(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return ids as an object array of strings."""
+        if self.labels is not None:
+            return self.labels.copy() if rows is None else self.labels[rows]
+        serials = self.serials if rows is None else self.serials[rows]
+        return np.array([f"{self.prefix}{n}" for n in serials.tolist()], dtype=object)
+
+    def append(self, ids: List[str]):
+        serials = None if self.labels is not None else _parse_ids(ids, self.prefix)
+        if serials is None:
+            if self.labels is None:
+                self.labels = self.strings()
+                self.serials = np.zeros(0, dtype=np.int64)
+            self.labels = np.concatenate([self.labels, np.array(ids, dtype=object)])
+        else:
+            self.serials = np.concatenate([self.serials, serials])
+
+    def delete(self, rows: Union[int, np.ndarray]):
+        if self.labels is not None:
+            self.labels = np.delete(self.labels, rows)
+        else:
+            self.serials = np.delete(self.serials, rows)
+
+class MemberView(Member):
+    """
+    Lightweight Member backed by one row of a MemberTable.
+
+    Attribute reads and writes go straight to the table's arrays, so code
+    written against Member (allocate, join_coalition, plots) keeps working.
+    A view addresses its row by position: take fresh views after members
+    are removed.
+    """
+
+    def __init__(self, table: 'MemberTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._table._ids.get(self._row)
+
+    @property
+    def voting_power(self) -> int:
+        return int(self._table.voting_power[self._row])
+
+    @voting_power.setter
+    def voting_power(self, value: int):
+        self._table.voting_power[self._row] = value
+
+    @property
+    def strategy(self) -> str:
+        return self._table.strategy_names[self._table.strategy[self._row]]
+
+    @strategy.setter
+    def strategy(self, value: str):
+        self._table.set_strategy(self._row, value)
+
+    @property
+    def coalition(self) -> Optional[List[str]]:
+        return self._table.coalitions.member_grantees(self._row)
+
+    @coalition.setter
+    def coalition(self, grantee_ids: Optional[List[str]]):
+        coalitions = self._table.coalitions
+        coalitions.leave(self._row)
+        index = coalitions.index(grantee_ids)
+        if index >= 0:
+            coalitions.join(self._row, index)
+
+    def __repr__(self) -> str:
+        return f"MemberView({self.id!r}, voting_power={self.voting_power}, strategy={self.strategy!r})"
+
+class MemberTable(Sequence):
+    """
+    Council members stored as a struct of typed NumPy arrays.
+
+    One row per member: an int64 id serial, int64 voting power and an int8
+    index into strategy_names. Coalition memberships live in a
+    CoalitionIndex of (member, coalition) pairs, with each coalition's
+    grantee ids stored once, so a member may belong to several coalitions.
+    A population of tens of thousands of members costs a few bytes per
+    member instead of one Python object each, and the batch allocation
+    engines read the columns directly.
+
+    Indexing and iteration return MemberView objects, which behave like
+    Member instances.
+    """
+
+    def __init__(self, voting_power: np.ndarray, ids: Optional[np.ndarray] = None, strategy: str = 'random'):
+        """
+        Initialize a MemberTable instance.
+
+        Parameters:
+        -----------
+        voting_power : numpy.ndarray
+            Voting power of each member
+        ids : numpy.ndarray, optional
+            Id serial numbers, member n having id "m<n>" (defaults to 1..N)
+        strategy : str
+            Initial allocation strategy of every member
+        """
+        self.voting_power = np.asarray(voting_power, dtype=np.int64).copy()
+        num_members = len(self.voting_power)
+        if ids is None:
+            ids = np.arange(1, num_members + 1)
+        self._ids = _IdColumn('m', ids)
+        self.strategy_names = ['random']
+        self.strategy = np.zeros(num_members, dtype=np.int8)
+        self.coalitions = CoalitionIndex(num_members)
+        if strategy != 'random':
+            self.assign_strategy(strategy)
+
+    @classmethod
+    def from_members(cls, members: List[Any]) -> 'MemberTable':
+        """
+        Build a table from Member objects.
+
+        Parameters:
+        -----------
+        members : list
+            Member objects
+
+        Returns:
+        --------
+        MemberTable
+            Table holding the members' attributes
+        """
+        table = cls(np.zeros(0, dtype=np.int64))
+        table.extend(members)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.voting_power)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [MemberView(self, i) for i in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Member row {row} out of range")
+        return MemberView(self, row)
+
+    def ids(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Member ids as strings.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray, optional
+            Rows to return (default all)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Object array of member ids
+        """
+        return self._ids.strings(rows)
+
+    def strategy_code(self, strategy: str) -> int:
+        """Return the index of a strategy name in strategy_names, adding it if new."""
+        if strategy not in self.strategy_names:
+            self.strategy_names.append(strategy)
+        return self.strategy_names.index(strategy)
+
+    def set_strategy(self, rows: Union[int, np.ndarray], strategy: str):
+        """
+        Set the strategy of some members.
+
+        Parameters:
+        -----------
+        rows : int or numpy.ndarray
+            Rows (or a boolean row mask) of the members
+        strategy : str
+            Strategy name
+        """
+        self.strategy[rows] = self.strategy_code(strategy)
+
+    def assign_strategy(self, strategy: str):
+        """
+        Give every member outside a coalition the same strategy.
+
+        Parameters:
+        -----------
+        strategy : str
+            Strategy name
+        """
+        self.set_strategy(self.strategy != self.strategy_code('coalition'), strategy)
+
+    def strategies(self) -> np.ndarray:
+        """
+        Strategy name of every member.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Object array of strategy names
+        """
+        return np.array(self.strategy_names, dtype=object)[self.strategy]
+
+    def join_coalitions(self, rows: np.ndarray, coalitions: np.ndarray,
+                        grantee_ids: Optional[List[List[str]]] = None):
+        """
+        Put members into coalitions, switching them to the coalition strategy.
+        Members keep the coalitions they are already in, so the same row
+        may be given several times to join several coalitions.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the joining members
+        coalitions : numpy.ndarray
+            Coalition each member joins: an index into grantee_ids, or into
+            self.coalitions without grantee_ids
+        grantee_ids : list, optional
+            Grantee ids supported by each coalition
+        """
+        coalitions = np.asarray(coalitions)
+        if grantee_ids is not None:
+            indices = np.array([self.coalitions.index(ids) for ids in grantee_ids], dtype=np.int32)
+            coalitions = indices[coalitions]
+        self.coalitions.join(rows, coalitions)
+        self.set_strategy(rows, 'coalition')
+
+    def leave_coalitions(self, rows: np.ndarray, coalitions: Optional[np.ndarray] = None):
+        """
+        Take members out of coalitions; those left in none revert to the
+        random strategy, as Member.leave_coalition does.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the leaving members
+        coalitions : numpy.ndarray or int, optional
+            Coalition each member leaves (default every coalition they are in)
+        """
+        self.coalitions.leave(rows, coalitions)
+        rows = np.unique(rows)
+        self.set_strategy(rows[self.coalitions.membership_counts()[rows] == 0], 'random')
+
+    def extend(self, members: List[Any]):
+        """
+        Append members, copying their attributes into the columns.
+
+        Parameters:
+        -----------
+        members : list
+            Member objects (or views of another table)
+        """
+        members = list(members)
+        self._ids.append([m.id for m in members])
+        self.voting_power = np.concatenate([
+            self.voting_power, np.array([m.voting_power for m in members], dtype=np.int64)
+        ])
+        self.strategy = np.concatenate([
+            self.strategy, np.array([self.strategy_code(m.strategy) for m in members], dtype=np.int8)
+        ])
+        start = self.coalitions.num_members
+        coalitions = np.array([self.coalitions.index(m.coalition) for m in members], dtype=np.int32)
+        self.coalitions.extend(len(members))
+        joined = np.flatnonzero(coalitions >= 0)
+        self.coalitions.join(start + joined, coalitions[joined])
+
+    def append(self, member: Any):
+        """
+        Append one member.
+
+        Parameters:
+        -----------
+        member : Member
+            The new member
+        """
+        self.extend([member])
+
+    def remove_rows(self, rows: np.ndarray):
+        """
+        Remove members; later rows shift up.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray
+            Rows of the members to remove
+        """
+        self._ids.delete(rows)
+        self.voting_power = np.delete(self.voting_power, rows)
+        self.strategy = np.delete(self.strategy, rows)
+        self.coalitions.remove_rows(rows)
+
+class GranteeView(Grantee):
+    """
+    Lightweight Grantee backed by one row of a GranteeTable.
+
+    Like MemberView, a view addresses its row by position.
+    """
+
+    def __init__(self, table: 'GranteeTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._table._ids.get(self._row)
+
+    @property
+    def name(self) -> str:
+        return self._table.name[self._row]
+
+    @property
+    def quality(self) -> float:
+        return self._table.quality[self._row]
+
+    @property
+    def popularity(self) -> float:
+        return self._table.popularity[self._row]
+
+    @property
+    def min_funding_threshold(self) -> float:
+        return self._table.min_funding_threshold[self._row]
+
+    @property
+    def received_funds(self) -> float:
+        return float(self._table.received_funds[self._row])
+
+    @property
+    def monthly_funding(self) -> np.ndarray:
+        return self._table.monthly_funding(self._row)
+
+    def receive_funds(self, amount):
+        self._table.receive_funds(np.array([amount], dtype=float), np.array([self._row]))
+
+    def funding_stability(self):
+        return float(self._table.funding_stability()[self._row])
+
+    def detach(self) -> Grantee:
+        """Copy the row into a standalone Grantee."""
+        grantee = Grantee(self.id, self.name, self.quality, self.popularity, self.min_funding_threshold)
+        grantee.received_funds = self.received_funds
+        grantee.monthly_funding = self.monthly_funding.tolist()
+        return grantee
+
+class GranteeTable(Sequence):
+    """
+    Grantees stored as a struct of typed NumPy arrays.
+
+    Monthly funding is kept in one preallocated (grantees x months) matrix
+    that grows by doubling, like HistoryBuffer, instead of a Python list
+    per grantee; the batch engines credit every grantee in one operation.
+
+    Indexing and iteration return GranteeView objects, which behave like
+    Grantee instances.
+    """
+
+    def __init__(self, names: List[str], quality: np.ndarray, popularity: np.ndarray,
+                 min_funding_threshold: np.ndarray, ids: Optional[np.ndarray] = None, capacity: int = 12):
+        """
+        Initialize a GranteeTable instance.
+
+        Parameters:
+        -----------
+        names : list
+            Project name of each grantee
+        quality : numpy.ndarray
+            Quality of each grantee (0.0 to 1.0)
+        popularity : numpy.ndarray
+            Popularity of each grantee (0.0 to 1.0)
+        min_funding_threshold : numpy.ndarray
+            Minimum funding for each grantee to be viable
+        ids : numpy.ndarray, optional
+            Id serial numbers, grantee n having id "g<n>" (defaults to 1..N)
+        capacity : int
+            Number of funding months to preallocate
+        """
+        self.name = np.array(names, dtype=object)
+        num_grantees = len(self.name)
+        if ids is None:
+            ids = np.arange(1, num_grantees + 1)
+        self._ids = _IdColumn('g', ids)
+        self.quality = np.asarray(quality, dtype=float).copy()
+        self.popularity = np.asarray(popularity, dtype=float).copy()
+        self.min_funding_threshold = np.broadcast_to(
+            np.asarray(min_funding_threshold, dtype=float), (num_grantees,)
+        ).copy()
+        self.received_funds = np.zeros(num_grantees, dtype=float)
+        self.funding = np.zeros((num_grantees, max(1, int(capacity))), dtype=float)
+        self.funding_months = np.zeros(num_grantees, dtype=np.int64)
+
+    @classmethod
+    def from_grantees(cls, grantees: List[Any]) -> 'GranteeTable':
+        """
+        Build a table from Grantee objects.
+
+        Parameters:
+        -----------
+        grantees : list
+            Grantee objects
+
+        Returns:
+        --------
+        GranteeTable
+            Table holding the grantees' attributes and funding
+        """
+        table = cls([], np.zeros(0), np.zeros(0), np.zeros(0))
+        for grantee in grantees:
+            table.append(grantee)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [GranteeView(self, i) for i in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Grantee row {row} out of range")
+        return GranteeView(self, row)
+
+    def ids(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Grantee ids as strings.
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray, optional
+            Rows to return (default all)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Object array of grantee ids
+        """
+        return self._ids.strings(rows)
+
+    def receive_funds(self, amounts: np.ndarray, rows: Optional[np.ndarray] = None):
+        """
+        Record one month of funds received.
+
+        Parameters:
+        -----------
+        amounts : numpy.ndarray
+            Amount received by each grantee in rows
+        rows : numpy.ndarray, optional
+            Rows of the grantees (default all, in order)
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        if len(rows) == 0:
+            return
+        if self.funding_months[rows].max() >= self.funding.shape[1]:
+            grown = np.zeros((len(self), self.funding.shape[1] * 2), dtype=float)
+            grown[:, :self.funding.shape[1]] = self.funding
+            self.funding = grown
+        self.received_funds[rows] += amounts
+        self.funding[rows, self.funding_months[rows]] = amounts
+        self.funding_months[rows] += 1
+
+    def monthly_funding(self, row: int) -> np.ndarray:
+        """
+        Funds received each month by one grantee.
+
+        Parameters:
+        -----------
+        row : int
+            Row of the grantee
+
+        Returns:
+        --------
+        numpy.ndarray
+            Amount per month received
+        """
+        return self.funding[row, :self.funding_months[row]].copy()
+
+    def is_viable(self) -> np.ndarray:
+        """
+        Check which grantees have received enough funding to be viable.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean vector, True where funding reaches the threshold
+        """
+        return self.received_funds >= self.min_funding_threshold
+
+    def funding_stability(self) -> np.ndarray:
+        """
+        Coefficient of variation of each grantee's monthly funding.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Stability per grantee (0 for grantees with no funding)
+        """
+        stability = np.zeros(len(self))
+        for months in np.unique(self.funding_months):
+            rows = np.flatnonzero(self.funding_months == months)
+            funding = self.funding[rows, :months]
+            mean = funding.mean(axis=1) if months else np.zeros(len(rows))
+            funded = mean > 0
+            stability[rows[funded]] = funding[funded].std(axis=1) / mean[funded]
+        return stability
+
+    def append(self, grantee: Any):
+        """
+        Append a grantee, copying its attributes and funding so far.
+
+        Parameters:
+        -----------
+        grantee : Grantee
+            The new grantee
+        """
+        monthly = np.asarray(grantee.monthly_funding, dtype=float)
+        capacity = max(self.funding.shape[1], len(monthly))
+        funding = np.zeros((len(self) + 1, capacity), dtype=float)
+        funding[:len(self), :self.funding.shape[1]] = self.funding
+        funding[-1, :len(monthly)] = monthly
+
+        self._ids.append([grantee.id])
+        self.name = np.append(self.name, np.array([grantee.name], dtype=object))
+        self.quality = np.append(self.quality, grantee.quality)
+        self.popularity = np.append(self.popularity, grantee.popularity)
+        self.min_funding_threshold = np.append(self.min_funding_threshold, grantee.min_funding_threshold)
+        self.received_funds = np.append(self.received_funds, grantee.received_funds)
+        self.funding = funding
+        self.funding_months = np.append(self.funding_months, len(monthly))
+
+    def pop(self, row: int) -> Grantee:
+        """
+        Remove a grantee; later rows shift up.
+
+        Parameters:
+        -----------
+        row : int
+            Row of the grantee
+
+        Returns:
+        --------
+        Grantee
+            Standalone copy of the removed grantee
+        """
+        grantee = self[row].detach()
+        self._ids.delete(row)
+        for name in ('name', 'quality', 'popularity', 'min_funding_threshold',
+                     'received_funds', 'funding', 'funding_months'):
+            setattr(self, name, np.delete(getattr(self, name), row, axis=0))
+        return grantee
+
+def credit_grantees(grantees: Any, amounts: np.ndarray):
+    """
+    Record one month of funds for every grantee.
+
+    Parameters:
+    -----------
+    grantees : GranteeTable or list
+        Grantees, in the order of amounts
+    amounts : numpy.ndarray
+        Amount received by each grantee
+    """
+    if isinstance(grantees, GranteeTable):
+        grantees.receive_funds(np.asarray(amounts, dtype=float))
+    else:
+        for grantee, amount in zip(grantees, np.asarray(amounts).tolist()):
+            grantee.receive_funds(amount)
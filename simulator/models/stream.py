@@ -0,0 +1,400 @@
+import heapq
+from collections import Counter
+
+import numpy as np
+from typing import Any, Dict, Iterator, Optional
+
+from .population import credit_grantees
+
+# Average month length (365.25 / 12 days) in seconds
+SECONDS_PER_MONTH = 2629800.0
+
+# Order of events sharing a timestamp: close the month (after any top-up)
+# before the next one starts, and apply membership changes before votes
+EVENT_PRIORITY = {
+    'top_up': 0,
+    'month_end': 1,
+    'month_start': 2,
+    'set_flow_rate': 3,
+    'add_member': 4,
+    'add_members': 4,
+    'remove_member': 4,
+    'remove_members': 4,
+    'edit_member': 4,
+    'add_grantee': 4,
+    'remove_grantee': 4,
+    'set_max_allocations': 4,
+    'allocate': 4,
+    'vote': 5
+}
+
+class StreamEngine:
+    """
+    Event-driven continuous-time model of the council's Superfluid stream.
+
+    Like the GDA pool behind PoolManager, funds flow at a constant rate that
+    is split between grantees in proportion to their units (total votes).
+    The engine jumps from one event to the next (vote updates, membership
+    and grantee changes, top-ups, flow-rate updates) and integrates
+    flow rate x elapsed time analytically in between, so the cost depends on
+    the number of events rather than the time resolution, and grantee
+    balances are known at any timestamp.
+
+    At each month start the flow rate is reset to distribution_rate x pool
+    balance per month, as a distributor rebalancing the stream monthly
+    would, and the month's active members are scheduled to vote at uniformly
+    drawn times. At each month end the month is recorded in the council
+    history in the same form as Council.distribute_month.
+
+    With simulate_votes disabled, members only vote through 'allocate'
+    events, which record given allocations as BudgetAllocated does; this is
+    how recorded council event logs are replayed (see utils.replay).
+
+    When the council uses exact unit arithmetic, the stream runs through its
+    integer pool ledger over whole seconds, so replayed payouts can be
+    checked against on-chain balances to the wei.
+    """
+
+    def __init__(self, council: Any, participation_rate: Optional[float] = None,
+                 vote_resolution: float = 86400.0, start_time: float = 0.0,
+                 simulate_votes: bool = True):
+        """
+        Initialize a StreamEngine instance.
+
+        Parameters:
+        -----------
+        council : Council
+            Council whose pool, allocations and history the engine drives
+        participation_rate : float, optional
+            Fraction of members who vote each month, drawn uniformly
+            (defaults to the council's participation model)
+        vote_resolution : float
+            Vote times are rounded down to this many seconds, and members
+            voting at the same time are allocated in one batch
+        start_time : float
+            Time in seconds at which the stream starts
+        simulate_votes : bool
+            Schedule votes by the members' strategies every month
+        """
+        self.council = council
+        self.participation_rate = participation_rate
+        self.vote_resolution = vote_resolution
+        self.simulate_votes = simulate_votes
+        self.start_time = float(start_time)
+        self.time = self.start_time
+        self.flow_rate = 0.0
+        self.months_scheduled = 0
+        self.skipped = Counter()  # events ignored because they referenced unknown members or grantees
+
+        num_columns = len(council.history.grantee_ids)
+        self.streamed = np.zeros(num_columns)  # total received per history column
+        self.month_streamed = np.zeros(num_columns)  # received since the month started
+        self.month_top_up = 0.0
+        self.last_snapshot = None
+
+        self._events = []
+        self._sequence = 0
+
+    def schedule(self, time: float, kind: str, payload: Any = None):
+        """
+        Schedule an event.
+
+        Parameters:
+        -----------
+        time : float
+            Event time in seconds (not earlier than the current time)
+        kind : str
+            One of EVENT_PRIORITY: 'vote' (array of member IDs),
+            'add_member' (Member), 'add_members' (list of Members),
+            'remove_member' (member ID), 'remove_members' (list of IDs),
+            'edit_member' ((member ID, voting power)), 'add_grantee'
+            (Grantee), 'remove_grantee' (grantee ID), 'set_max_allocations'
+            (int), 'allocate' (list of (member ID, grantee IDs, amounts)),
+            'top_up' (amount), 'set_flow_rate' (tokens per second),
+            'month_start' and 'month_end' (month index)
+        payload : object
+            Event data
+        """
+        if kind not in EVENT_PRIORITY:
+            raise ValueError(f"Unknown event kind: {kind}")
+        if time < self.time:
+            raise ValueError(f"Cannot schedule an event at {time} before the current time {self.time}")
+        heapq.heappush(self._events, (float(time), EVENT_PRIORITY[kind], self._sequence, kind, payload))
+        self._sequence += 1
+
+    def schedule_months(self, duration_months: int, annual_funding_addition: float = 0):
+        """
+        Schedule month boundaries and annual top-ups for the next months.
+
+        Parameters:
+        -----------
+        duration_months : int
+            Number of months to add
+        annual_funding_addition : float
+            Amount added to the pool at the end of every twelfth month
+        """
+        for _ in range(duration_months):
+            month = self.months_scheduled
+            start = self.start_time + month * SECONDS_PER_MONTH
+            self.schedule(start, 'month_start', month)
+            self.schedule(start + SECONDS_PER_MONTH, 'month_end', month)
+            if (month + 1) % 12 == 0 and annual_funding_addition > 0:
+                self.schedule(start + SECONDS_PER_MONTH, 'top_up', annual_funding_addition)
+            self.months_scheduled += 1
+
+    def extend_months(self, end_time: float, annual_funding_addition: float = 0):
+        """
+        Schedule further months until every month starting by `end_time`
+        is scheduled, for runs whose length is not known up front.
+
+        Parameters:
+        -----------
+        end_time : float
+            Time in seconds to cover
+        annual_funding_addition : float
+            Amount added to the pool at the end of every twelfth month
+        """
+        needed = int(np.floor((end_time - self.start_time) / SECONDS_PER_MONTH)) + 1
+        if needed > self.months_scheduled:
+            self.schedule_months(needed - self.months_scheduled, annual_funding_addition)
+
+    def _units(self) -> np.ndarray:
+        """Current units (total votes) per grantee."""
+        return self.council.allocations.running_totals
+
+    def _pending(self, time: float) -> tuple:
+        """Amount streamed per grantee from the current time to `time`, and the total."""
+        units = self._units()
+        ledger = self.council.ledger
+        if ledger is not None:
+            paid, _, _ = ledger.pending(units, int(time) - int(self.time))
+            return ledger.tokens(paid), ledger.tokens(int(paid.sum()))
+        total_units = int(units.sum())
+        elapsed = time - self.time
+        if elapsed <= 0 or self.flow_rate <= 0 or total_units == 0:
+            return np.zeros(len(units)), 0.0
+
+        # The stream stops when the pool runs dry
+        amount = min(self.flow_rate * elapsed, self.council.pool_balance)
+        return units * (amount / total_units), amount
+
+    def advance(self, time: float):
+        """
+        Integrate the stream up to `time`.
+
+        Parameters:
+        -----------
+        time : float
+            Time in seconds (not earlier than the current time)
+        """
+        if time < self.time:
+            raise ValueError(f"Cannot advance to {time} before the current time {self.time}")
+
+        ledger = self.council.ledger
+        if ledger is not None:
+            # Whole seconds elapse between integer timestamps
+            paid = ledger.stream(self._units(), self.council.history_columns, int(time) - int(self.time))
+            shares = ledger.tokens(paid)
+            columns = self.council.history_columns
+            self.streamed[columns] += shares
+            self.month_streamed[columns] += shares
+            self.council.pool_balance = ledger.tokens(ledger.balance)
+            if ledger.flow_rate == 0:
+                self.flow_rate = 0.0
+            self.time = time
+            return
+
+        shares, amount = self._pending(time)
+        if amount > 0:
+            columns = self.council.history_columns
+            self.streamed[columns] += shares
+            self.month_streamed[columns] += shares
+            self.council.pool_balance -= amount
+            if self.council.pool_balance <= 0:
+                self.council.pool_balance = 0.0
+                self.flow_rate = 0.0
+        self.time = time
+
+    def balances(self, time: Optional[float] = None) -> np.ndarray:
+        """
+        Total amount each grantee has received by `time`, without advancing.
+
+        Parameters:
+        -----------
+        time : float, optional
+            Time in seconds, not earlier than the current time and not past
+            the next event (defaults to the current time)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Amount received per history column
+        """
+        balances = self.streamed.copy()
+        if time is not None:
+            if self._events and time > self._events[0][0]:
+                raise ValueError("balances() cannot look past the next scheduled event")
+            shares, _ = self._pending(time)
+            balances[self.council.history_columns] += shares
+        return balances
+
+    def _schedule_votes(self, month: int):
+        """Draw the month's active members and schedule their votes."""
+        council = self.council
+        active = council.active_member_indices(self.participation_rate)
+        if len(active) == 0:
+            return
+
+        # Uniform vote times within the month, bucketed by the resolution
+        offsets = council.rng.random(len(active)) * SECONDS_PER_MONTH
+        buckets = np.floor(offsets / self.vote_resolution).astype(np.int64)
+        order = np.argsort(buckets, kind='stable')
+        member_ids = council.allocations.member_ids(active)[order]
+        buckets = buckets[order]
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)]
+        for start, end in zip(starts, ends):
+            self.schedule(self.time + buckets[start] * self.vote_resolution, 'vote', member_ids[start:end])
+
+    def _apply(self, kind: str, payload: Any):
+        """Apply one event at the current time."""
+        council = self.council
+
+        if kind == 'vote':
+            member_index = council.allocations.member_index
+            rows = np.array([member_index[m] for m in payload if m in member_index], dtype=np.int64)
+            council.allocate_batch(rows)
+        elif kind == 'month_start':
+            if council.ledger is not None:
+                self.flow_rate = council.ledger.tokens(council.ledger.start_month(council.distribution_rate))
+            else:
+                self.flow_rate = council.pool_balance * council.distribution_rate / SECONDS_PER_MONTH
+            if self.simulate_votes:
+                council.churn_coalitions()
+                self._schedule_votes(payload)
+        elif kind == 'month_end':
+            credit_grantees(council.grantees, self.month_streamed[council.history_columns])
+            self.last_snapshot = council.record_month(
+                payload,
+                self.month_streamed,
+                council.to_history_columns(council._allocation_totals()),
+                self.month_top_up
+            )
+            self.month_streamed = np.zeros(len(self.month_streamed))
+            self.month_top_up = 0.0
+        elif kind == 'top_up':
+            if council.ledger is not None:
+                council.ledger.top_up(payload)
+                council.pool_balance = council.ledger.tokens(council.ledger.balance)
+            else:
+                council.pool_balance += payload
+            self.month_top_up += payload
+        elif kind == 'set_flow_rate':
+            self.flow_rate = float(payload)
+            if council.ledger is not None:
+                council.ledger.set_flow_rate(council.ledger.wei(payload))
+        elif kind == 'allocate':
+            self._record_allocations(payload)
+        elif kind in ('add_member', 'add_members'):
+            members = [payload] if kind == 'add_member' else payload
+            new = list({m.id: m for m in members if m.id not in council.allocations.member_index}.values())
+            self._skip(kind, len(members) - len(new))
+            council.add_members(new)
+        elif kind in ('remove_member', 'remove_members'):
+            member_ids = [payload] if kind == 'remove_member' else payload
+            known = list(dict.fromkeys(m for m in member_ids if m in council.allocations.member_index))
+            self._skip(kind, len(member_ids) - len(known))
+            council.remove_members(known)
+        elif kind == 'edit_member':
+            member_id, voting_power = payload
+            if member_id in council.allocations.member_index:
+                council.edit_member(member_id, voting_power)
+            else:
+                self._skip(kind)
+        elif kind == 'add_grantee':
+            if payload.id in council.allocations.grantee_index:
+                self._skip(kind)
+            else:
+                council.add_grantee(payload)
+                self.streamed = np.append(self.streamed, 0.0)
+                self.month_streamed = np.append(self.month_streamed, 0.0)
+        elif kind == 'set_max_allocations':
+            council.allocations.max_allocations_per_member = int(payload)
+        elif kind == 'remove_grantee':
+            index = council.allocations.grantee_index.get(payload)
+            if index is not None:
+                # Credit what the grantee streamed this month before it goes
+                column = council.history_columns[index]
+                council.grantees[index].receive_funds(float(self.month_streamed[column]))
+                council.remove_grantee(payload)
+            else:
+                self._skip(kind)
+
+    def _skip(self, kind: str, count: int = 1):
+        """Count events ignored for referencing unknown members or grantees."""
+        if count:
+            self.skipped[kind] += count
+
+    def _record_allocations(self, allocations: list):
+        """
+        Record given allocations, each replacing the member's previous one.
+
+        Like the subgraph's BudgetAllocated handler, an allocation naming an
+        unknown member or grantee is skipped as a whole. When a member
+        allocates more than once in a batch, the last allocation wins.
+        """
+        allocations_store = self.council.allocations
+        member_index = allocations_store.member_index
+        grantee_index = allocations_store.grantee_index
+
+        latest = {}
+        for member_id, grantee_ids, amounts in allocations:
+            row = member_index.get(member_id)
+            columns = [grantee_index.get(g) for g in grantee_ids]
+            if row is None or None in columns:
+                self._skip('allocate')
+                continue
+            latest[row] = (columns, amounts)
+        if not latest:
+            return
+
+        rows = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        votes = np.zeros((len(rows), len(allocations_store.grantee_ids)), dtype=np.int64)
+        for i, (columns, amounts) in enumerate(latest.values()):
+            votes[i, columns] = amounts
+        allocations_store.record(rows, votes)
+
+    def iter_months(self, end_time: float) -> Iterator[Dict[str, Any]]:
+        """
+        Process every event up to `end_time`, yielding each month snapshot.
+
+        Parameters:
+        -----------
+        end_time : float
+            Time in seconds to run until
+
+        Yields:
+        -------
+        dict
+            Month snapshot, as returned by Council.distribute_month
+        """
+        while self._events and self._events[0][0] <= end_time:
+            time, _, _, kind, payload = heapq.heappop(self._events)
+            self.advance(time)
+            self._apply(kind, payload)
+            if kind == 'month_end':
+                yield self.last_snapshot
+        self.advance(end_time)
+
+    def run_until(self, end_time: float):
+        """
+        Process every event up to `end_time`.
+
+        Parameters:
+        -----------
+        end_time : float
+            Time in seconds to run until
+        """
+        for _ in self.iter_months(end_time):
+            pass
@@ -1,3 +1,3 @@
 # Utils package initialization
 from .helpers import generate_members, generate_grantees
-from .simulation_runner import run_simulation, run_batch_simulations 
\ No newline at end of file
+from .simulation_runner import run_simulation, iter_simulation, run_batch_simulations 
\ No newline at end of file
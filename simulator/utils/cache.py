@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from config import DATA_PATHS, CACHE_SETTINGS, FEATURES
+
+# Source trees whose contents determine simulation results
+_SOURCE_DIRS = ('models', 'utils')
+_SOURCE_FILES = ('config.py',)
+
+_code_version = None
+_default_cache = None
+
+def code_version() -> str:
+    """
+    Hash of the simulator source code, so cached results are invalidated
+    whenever the models, the runner or the defaults change.
+
+    Returns:
+    --------
+    str
+        Short hex digest of the source files
+    """
+    global _code_version
+    if _code_version is None:
+        root = Path(__file__).resolve().parent.parent
+        paths = [root / name for name in _SOURCE_FILES]
+        for directory in _SOURCE_DIRS:
+            paths.extend(sorted((root / directory).glob('*.py')))
+
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(path.relative_to(root).as_posix().encode())
+            digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+def _json_default(value: Any) -> Any:
+    """Convert NumPy scalars and other values for canonical JSON encoding."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def config_key(config: Dict[str, Any], **extra) -> str:
+    """
+    Build the cache key for a simulation config.
+
+    Parameters:
+    -----------
+    config : dict
+        Simulation configuration, including 'random_seed'
+    **extra
+        Additional parameters that affect the result (e.g. batch settings)
+
+    Returns:
+    --------
+    str
+        Hex digest of the canonical config, seed and code version
+    """
+    payload = {
+        'config': config,
+        'seed': config.get('random_seed'),
+        'extra': extra,
+        'code_version': code_version()
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ResultCache:
+    """
+    Two-level cache of simulation results.
+
+    Results are kept as live objects in an in-memory LRU layer and pickled
+    to an on-disk layer; each layer evicts its least recently used entries
+    once its total (pickled) size exceeds its byte budget. Cached results are
+    shared, so callers must not mutate them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_bytes: int = CACHE_SETTINGS['memory_bytes'],
+        max_disk_bytes: int = CACHE_SETTINGS['disk_bytes']
+    ):
+        """
+        Initialize a ResultCache instance.
+
+        Parameters:
+        -----------
+        cache_dir : str, optional
+            Directory for the on-disk layer (None keeps results in memory only)
+        max_memory_bytes : int
+            Size budget of the in-memory layer
+        max_disk_bytes : int
+            Size budget of the on-disk layer
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _remember(self, key: str, result: Any, size: int):
+        """Insert a result into the memory layer and evict to budget."""
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (result, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _evict_disk(self):
+        """Delete the least recently used cache files until under budget."""
+        entries = []
+        for path in self.cache_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Parameters:
+        -----------
+        key : str
+            Cache key from config_key
+
+        Returns:
+        --------
+        object or None
+            The cached result, or None on a miss
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry[0]
+
+        if self.cache_dir is None:
+            return None
+
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            result = pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)
+        self._remember(key, result, len(payload))
+        return result
+
+    def put(self, key: str, result: Any):
+        """
+        Store a result in both layers.
+
+        Parameters:
+        -----------
+        key : str
+            Cache key from config_key
+        result : object
+            Picklable simulation result
+        """
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, result, len(payload))
+
+        if self.cache_dir is None or len(payload) > self.max_disk_bytes:
+            return
+
+        # Write atomically so a concurrent reader never sees a partial file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict_disk()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for `key`, computing and storing it on a miss.
+
+        Parameters:
+        -----------
+        key : str
+            Cache key from config_key
+        compute : callable
+            Zero-argument function producing the result
+
+        Returns:
+        --------
+        object
+            Cached or freshly computed result
+        """
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        """Remove every cached result from both layers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide result cache.
+
+    The disk layer lives under DATA_PATHS['results_dir'] and is only used
+    when FEATURES['save_results'] is enabled.
+
+    Returns:
+    --------
+    ResultCache
+        Shared cache instance
+    """
+    global _default_cache
+    if _default_cache is None:
+        cache_dir = os.path.join(DATA_PATHS['results_dir'], 'cache') if FEATURES['save_results'] else None
+        _default_cache = ResultCache(cache_dir)
+    return _default_cache
@@ -0,0 +1,288 @@
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Files of a checkpoint directory
+STATE_FILE = 'state.ckpt'
+RUNS_FILE = 'runs.ckpt'
+
+# Length prefix of each record in the runs log
+_RECORD_HEADER = struct.Struct('<Q')
+
+def checkpoint_dir(config: Dict[str, Any], **extra) -> Path:
+    """
+    Checkpoint directory of a simulation config under DATA_PATHS['results_dir'].
+
+    The directory is named after the result cache key, so a checkpoint is
+    only resumed by the same config, seed, run settings and code version.
+
+    Parameters:
+    -----------
+    config : dict
+        Simulation configuration, including 'random_seed'
+    **extra
+        Run settings that affect the result (e.g. batch size)
+
+    Returns:
+    --------
+    pathlib.Path
+        Checkpoint directory (not created)
+    """
+    from config import DATA_PATHS
+    from utils.cache import config_key
+
+    return Path(DATA_PATHS['results_dir']) / 'checkpoints' / config_key(config, **extra)[:16]
+
+def _pickle(value: Any) -> bytes:
+    """Pickle a value; NumPy arrays pickle as raw buffers."""
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _decode(data: bytes) -> Any:
+    return pickle.loads(zlib.decompress(data))
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a single simulation or a batch.
+
+    The run state (a dict holding the council, or the stream engine, and
+    the next month) is pickled in the caller's thread, which copies its
+    arrays, and compressed and written by a background thread that
+    replaces the previous checkpoint atomically. A newer state arriving
+    while one is being written supersedes it, so the simulation never
+    waits on the disk. Finished batch runs are appended to a log one
+    record at a time and never rewritten; a record cut short by a crash
+    is ignored when the log is read back.
+    """
+
+    def __init__(self, directory: str, every: int = 6, resume: bool = True, background: bool = True):
+        """
+        Initialize a Checkpointer instance.
+
+        Parameters:
+        -----------
+        directory : str
+            Checkpoint directory (created on first write)
+        every : int
+            Save the run state every this many months (0 never saves it)
+        resume : bool
+            Keep an existing checkpoint to resume from (False deletes it)
+        background : bool
+            Write from a background thread (False writes before returning)
+        """
+        self.directory = Path(directory)
+        self.every = int(every)
+        self.background = background
+        if not resume:
+            self._remove_files()
+        else:
+            self._truncate_runs()
+
+        self._condition = threading.Condition()
+        self._pending_state = None
+        self._pending_runs = []
+        self._writing = False
+        self._error = None
+        self._thread = None
+
+    def due(self, month: int) -> bool:
+        """
+        Whether the state should be saved after `month`.
+
+        Parameters:
+        -----------
+        month : int
+            Month just completed (0-indexed)
+
+        Returns:
+        --------
+        bool
+        """
+        return self.every > 0 and (month + 1) % self.every == 0
+
+    def save_state(self, state: Dict[str, Any]):
+        """
+        Checkpoint the run state.
+
+        Parameters:
+        -----------
+        state : dict
+            Picklable run state, e.g. {'council', 'engine', 'month'}
+        """
+        self._submit(state=_pickle(state))
+
+    def has_state(self) -> bool:
+        """
+        Whether a run state has been checkpointed.
+
+        Returns:
+        --------
+        bool
+        """
+        return (self.directory / STATE_FILE).exists()
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the last checkpointed run state.
+
+        Returns:
+        --------
+        dict or None
+            The state passed to save_state, or None without a checkpoint
+        """
+        path = self.directory / STATE_FILE
+        if not path.exists():
+            return None
+        return _decode(path.read_bytes())
+
+    def record_run(self, index: int, result: Any = None):
+        """
+        Record a finished batch run.
+
+        Parameters:
+        -----------
+        index : int
+            Index of the run in the batch
+        result : object
+            Picklable result of the run (None when it is stored elsewhere)
+        """
+        self._submit(run=_pickle((int(index), result)))
+
+    def completed_runs(self) -> Dict[int, Any]:
+        """
+        Batch runs recorded so far.
+
+        Returns:
+        --------
+        dict
+            Run index -> result passed to record_run
+        """
+        return self._read_runs()[0]
+
+    def _read_runs(self) -> tuple:
+        """Read the runs log, returning the runs and the length of its complete records."""
+        path = self.directory / RUNS_FILE
+        if not path.exists():
+            return {}, 0
+        data = path.read_bytes()
+
+        runs = {}
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            (length,) = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            if start + length > len(data):
+                break  # record cut short by a crash
+            index, result = _decode(data[start:start + length])
+            runs[index] = result
+            offset = start + length
+        return runs, offset
+
+    def _truncate_runs(self):
+        """Drop a record cut short by a crash, so new records follow complete ones."""
+        path = self.directory / RUNS_FILE
+        if path.exists():
+            _, length = self._read_runs()
+            if length < path.stat().st_size:
+                with open(path, 'r+b') as f:
+                    f.truncate(length)
+
+    def _submit(self, state: Optional[bytes] = None, run: Optional[bytes] = None):
+        """Queue a write, or write it now without a background thread."""
+        if not self.background:
+            self._write(state, [run] if run is not None else [])
+            return
+        with self._condition:
+            self._raise_error()
+            if state is not None:
+                self._pending_state = state
+            if run is not None:
+                self._pending_runs.append(run)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name='checkpoint-writer', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _writer(self):
+        """Background loop writing whatever is pending."""
+        while True:
+            with self._condition:
+                while self._pending_state is None and not self._pending_runs and self._thread is not None:
+                    self._condition.wait()
+                if self._thread is None and self._pending_state is None and not self._pending_runs:
+                    return
+                state, runs = self._pending_state, self._pending_runs
+                self._pending_state, self._pending_runs = None, []
+                self._writing = True
+            try:
+                self._write(state, runs)
+            except BaseException as e:
+                with self._condition:
+                    self._error = e
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, state: Optional[bytes], runs: list):
+        """Compress and append run records, then atomically replace the state file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if runs:
+            with open(self.directory / RUNS_FILE, 'ab') as f:
+                for record in runs:
+                    record = zlib.compress(record, 1)
+                    f.write(_RECORD_HEADER.pack(len(record)))
+                    f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+        if state is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zlib.compress(state, 1))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.directory / STATE_FILE)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def _raise_error(self):
+        """Re-raise a failed background write in the caller's thread."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self):
+        """Wait until every queued checkpoint is on disk."""
+        with self._condition:
+            while self._pending_state is not None or self._pending_runs or self._writing:
+                self._condition.wait()
+            self._raise_error()
+
+    def close(self):
+        """Write what is queued and stop the background thread."""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            self._raise_error()
+
+    def clear(self):
+        """Stop writing and delete the checkpoint, e.g. once the run finished."""
+        self.close()
+        self._remove_files()
+
+    def _remove_files(self):
+        for name in (STATE_FILE, RUNS_FILE):
+            path = self.directory / name
+            if path.exists():
+                path.unlink()
+        if self.directory.exists() and not any(self.directory.iterdir()):
+            self.directory.rmdir()
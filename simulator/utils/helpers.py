@@ -1,16 +1,16 @@
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import string
-import random
 
 def generate_members(
     num_members: int,
     voting_power_distribution: str = 'equal',
     power_skew: float = 0.5,
-    total_voting_power: int = 100000
-) -> List[Any]:
+    total_voting_power: int = 100000,
+    rng: Optional[np.random.Generator] = None
+) -> Any:
     """
-    Generate a list of council members with specified voting power distribution.
+    Generate council members with specified voting power distribution.
     
     Parameters:
     -----------
@@ -22,19 +22,20 @@ def generate_members(
         Skew parameter for custom distribution (0.0 to 1.0)
     total_voting_power : int
         Total voting power to distribute among members
+    rng : numpy.random.Generator, optional
+        Random number generator
         
     Returns:
     --------
-    list
-        List of Member objects
+    MemberTable
+        Members m1..mN, in one row each
     """
-    from models.member import Member
+    from models.population import MemberTable
     
     if num_members <= 0:
-        return []
+        return MemberTable(np.zeros(0, dtype=np.int64))
     
-    # Generate member IDs
-    member_ids = [f"m{i+1}" for i in range(num_members)]
+    rng = rng or np.random.default_rng()
     
     # Generate voting power based on distribution
     if voting_power_distribution == 'equal':
@@ -45,13 +46,13 @@ def generate_members(
         # Normal distribution
         mean = total_voting_power / num_members
         std_dev = mean * 0.5  # Adjust standard deviation as needed
-        voting_power = np.random.normal(mean, std_dev, num_members)
+        voting_power = rng.normal(mean, std_dev, num_members)
         voting_power = np.clip(voting_power, mean * 0.1, mean * 3)  # Clip to reasonable range
         
     elif voting_power_distribution == 'pareto':
         # Pareto distribution (power law)
         shape = 1.5  # Pareto shape parameter (lower = more unequal)
-        voting_power = np.random.pareto(shape, num_members) + 1
+        voting_power = rng.pareto(shape, num_members) + 1
         
     elif voting_power_distribution == 'custom':
         # Custom distribution based on power_skew
@@ -62,7 +63,7 @@ def generate_members(
         else:
             # Generate exponential distribution with varying rate
             rate = 5 * (1 - power_skew) + 0.1  # Rate parameter (higher = more equal)
-            voting_power = np.random.exponential(1/rate, num_members)
+            voting_power = rng.exponential(1/rate, num_members)
     
     else:
         # Default to equal distribution
@@ -81,21 +82,17 @@ def generate_members(
         idx = np.argmax(voting_power)
         voting_power[idx] += diff
     
-    # Create Member objects
-    members = []
-    for i in range(num_members):
-        members.append(Member(member_ids[i], int(voting_power[i])))
-    
-    return members
+    return MemberTable(voting_power)
 
 def generate_grantees(
     num_grantees: int,
     quality_distribution: str = 'uniform',
     popularity_correlation: float = 0.5,
-    min_funding_threshold: float = 1000
-) -> List[Any]:
+    min_funding_threshold: float = 1000,
+    rng: Optional[np.random.Generator] = None
+) -> Any:
     """
-    Generate a list of grantees with specified quality and popularity distributions.
+    Generate grantees with specified quality and popularity distributions.
     
     Parameters:
     -----------
@@ -107,76 +104,70 @@ def generate_grantees(
         Correlation between quality and popularity (-1.0 to 1.0)
     min_funding_threshold : float
         Minimum funding threshold for viability
+    rng : numpy.random.Generator, optional
+        Random number generator
         
     Returns:
     --------
-    list
-        List of Grantee objects
+    GranteeTable
+        Grantees g1..gN, in one row each
     """
-    from models.grantee import Grantee
+    from models.population import GranteeTable
     
     if num_grantees <= 0:
-        return []
+        return GranteeTable([], np.zeros(0), np.zeros(0), np.zeros(0))
+    
+    rng = rng or np.random.default_rng()
     
-    # Generate grantee IDs and names
-    grantee_ids = [f"g{i+1}" for i in range(num_grantees)]
-    grantee_names = [generate_project_name() for _ in range(num_grantees)]
+    # Generate grantee names
+    grantee_names = [generate_project_name(rng) for _ in range(num_grantees)]
     
     # Generate quality based on distribution
     if quality_distribution == 'uniform':
         # Uniform distribution
-        quality = np.random.uniform(0.1, 1.0, num_grantees)
+        quality = rng.uniform(0.1, 1.0, num_grantees)
         
     elif quality_distribution == 'normal':
         # Normal distribution
-        quality = np.random.normal(0.5, 0.15, num_grantees)
+        quality = rng.normal(0.5, 0.15, num_grantees)
         quality = np.clip(quality, 0.1, 1.0)  # Clip to valid range
         
     elif quality_distribution == 'bimodal':
         # Bimodal distribution (mix of high and low quality)
-        group1 = np.random.normal(0.25, 0.1, num_grantees // 2)
-        group2 = np.random.normal(0.75, 0.1, num_grantees - num_grantees // 2)
+        group1 = rng.normal(0.25, 0.1, num_grantees // 2)
+        group2 = rng.normal(0.75, 0.1, num_grantees - num_grantees // 2)
         quality = np.concatenate([group1, group2])
-        np.random.shuffle(quality)
+        rng.shuffle(quality)
         quality = np.clip(quality, 0.1, 1.0)  # Clip to valid range
         
     else:
         # Default to uniform distribution
-        quality = np.random.uniform(0.1, 1.0, num_grantees)
+        quality = rng.uniform(0.1, 1.0, num_grantees)
     
     # Generate popularity based on quality and correlation
     if popularity_correlation >= 0:
         # Positive correlation
         # Base popularity on quality with some random noise
-        noise = np.random.normal(0, 0.2, num_grantees)
+        noise = rng.normal(0, 0.2, num_grantees)
         popularity = quality * popularity_correlation + (1 - popularity_correlation) * noise
     else:
         # Negative correlation
         # Inverse relationship between quality and popularity
-        noise = np.random.normal(0, 0.2, num_grantees)
+        noise = rng.normal(0, 0.2, num_grantees)
         popularity = (1 - quality) * abs(popularity_correlation) + (1 - abs(popularity_correlation)) * noise
     
     # Clip and normalize popularity
     popularity = np.clip(popularity, 0.1, 1.0)
     
-    # Create Grantee objects
-    grantees = []
-    for i in range(num_grantees):
-        # Vary minimum funding threshold slightly
-        threshold = min_funding_threshold * (0.8 + 0.4 * quality[i])
-        
-        grantees.append(Grantee(
-            grantee_ids[i],
-            grantee_names[i],
-            quality=quality[i],
-            popularity=popularity[i],
-            min_funding_threshold=threshold
-        ))
-    
-    return grantees
+    # Vary minimum funding threshold slightly
+    threshold = min_funding_threshold * (0.8 + 0.4 * quality)
+    
+    return GranteeTable(grantee_names, quality, popularity, threshold)
 
-def generate_project_name() -> str:
+def generate_project_name(rng: Optional[np.random.Generator] = None) -> str:
     """Generate a random project name."""
+    rng = rng or np.random.default_rng()
+    
     adjectives = [
         "Decentralized", "Autonomous", "Open", "Distributed", "Transparent",
         "Sustainable", "Innovative", "Community", "Global", "Resilient",
@@ -189,31 +180,47 @@ def generate_project_name() -> str:
         "System", "Framework", "Alliance", "Guild", "Venture"
     ]
     
-    return f"{random.choice(adjectives)} {random.choice(nouns)}"
+    return f"{rng.choice(adjectives)} {rng.choice(nouns)}"
 
-def setup_coalitions(members: List[Any], grantees: List[Any], coalition_size: float, coalition_focus: int) -> List[Any]:
+def setup_coalitions(
+    members: List[Any],
+    grantees: List[Any],
+    coalition_size: float,
+    coalition_focus: int,
+    rng: Optional[np.random.Generator] = None,
+    coalition_overlap: float = 0.0
+) -> List[Any]:
     """
     Set up coalitions among members.
     
     Parameters:
     -----------
-    members : list
-        List of Member objects
-    grantees : list
-        List of Grantee objects
+    members : MemberTable or list
+        Members (a MemberTable is updated in place)
+    grantees : GranteeTable or list
+        Grantees
     coalition_size : float
         Fraction of members in coalitions (0.0 to 1.0)
     coalition_focus : int
         Number of grantees each coalition supports
+    rng : numpy.random.Generator, optional
+        Random number generator
+    coalition_overlap : float
+        Fraction of coalition members who also join a second coalition
+        (0.0 to 1.0; MemberTable only, list members stay in one)
         
     Returns:
     --------
-    list
-        Updated list of Member objects
+    MemberTable or list
+        The updated members
     """
+    from models.population import MemberTable, GranteeTable
+    
     if not members or not grantees or coalition_size <= 0 or coalition_focus <= 0:
         return members
     
+    rng = rng or np.random.default_rng()
+    
     # Determine number of coalitions (roughly 1 coalition per 10 members)
     num_coalitions = max(1, int(len(members) / 10))
     
@@ -221,14 +228,15 @@ def setup_coalitions(members: List[Any], grantees: List[Any], coalition_size: fl
     num_coalition_members = int(len(members) * coalition_size)
     
     # Select members for coalitions
-    coalition_members = np.random.choice(members, num_coalition_members, replace=False)
+    coalition_rows = rng.choice(len(members), num_coalition_members, replace=False)
     
     # Create coalitions
+    grantee_ids = grantees.ids() if isinstance(grantees, GranteeTable) else [g.id for g in grantees]
     coalitions = []
     for _ in range(num_coalitions):
         # Select random grantees for this coalition
-        coalition_grantees = np.random.choice(
-            [g.id for g in grantees],
+        coalition_grantees = rng.choice(
+            grantee_ids,
             min(coalition_focus, len(grantees)),
             replace=False
         ).tolist()
@@ -239,15 +247,65 @@ def setup_coalitions(members: List[Any], grantees: List[Any], coalition_size: fl
     members_per_coalition = num_coalition_members // num_coalitions
     remaining = num_coalition_members % num_coalitions
     
-    member_index = 0
-    for i, coalition in enumerate(coalitions):
-        # Calculate number of members in this coalition
-        count = members_per_coalition + (1 if i < remaining else 0)
+    counts = members_per_coalition + (np.arange(num_coalitions) < remaining)
+    member_coalitions = np.repeat(np.arange(num_coalitions), counts)
+    
+    if isinstance(members, MemberTable):
+        members.join_coalitions(coalition_rows, member_coalitions, coalitions)
+        
+        # Some members also join a second, different coalition
+        num_overlapping = int(num_coalition_members * coalition_overlap)
+        if num_overlapping > 0 and num_coalitions > 1:
+            overlapping = rng.choice(num_coalition_members, num_overlapping, replace=False)
+            second = rng.integers(num_coalitions - 1, size=num_overlapping)
+            second += second >= member_coalitions[overlapping]
+            members.join_coalitions(coalition_rows[overlapping], second, coalitions)
+    else:
+        for row, coalition in zip(coalition_rows, member_coalitions):
+            members[row].join_coalition(coalitions[coalition])
+    
+    return members 
+
+def assign_council_seats(
+    num_members: int,
+    num_councils: int,
+    seats_per_council: int,
+    membership_skew: float = 1.5,
+    rng: Optional[np.random.Generator] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Seat members of a shared population on several councils.
+    
+    Each council draws its members without replacement, weighted by a
+    Pareto-distributed activity per member, so a few members sit on many
+    councils and most on one or none.
+    
+    Parameters:
+    -----------
+    num_members : int
+        Size of the shared member population
+    num_councils : int
+        Number of councils
+    seats_per_council : int
+        Members per council (capped at num_members)
+    membership_skew : float
+        Pareto shape of member activity (lower = more members on many councils)
+    rng : numpy.random.Generator, optional
+        Random number generator
         
-        # Assign members to this coalition
-        for j in range(count):
-            if member_index < len(coalition_members):
-                coalition_members[member_index].join_coalition(coalition)
-                member_index += 1
+    Returns:
+    --------
+    tuple
+        (member row, council index) of every seat
+    """
+    rng = rng or np.random.default_rng()
+    
+    activity = rng.pareto(membership_skew, num_members) + 1
+    activity /= activity.sum()
+    seats = min(seats_per_council, num_members)
     
-    return members 
\ No newline at end of file
+    seat_member = np.concatenate([
+        rng.choice(num_members, seats, replace=False, p=activity) for _ in range(num_councils)
+    ]) if num_councils else np.zeros(0, dtype=np.int64)
+    seat_council = np.repeat(np.arange(num_councils), seats)
+    return seat_member, seat_council
\ No newline at end of file
@@ -0,0 +1,195 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+def gini(distribution: np.ndarray) -> np.ndarray:
+    """
+    Gini coefficient along the last (grantee) axis.
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        Amounts per grantee, e.g. (months x grantees) or (runs x months x grantees)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Gini coefficient per row (0 = perfect equality, 1 = perfect inequality);
+        rows with no funding give 0
+    """
+    values = np.sort(np.asarray(distribution, dtype=float), axis=-1)
+    n = values.shape[-1]
+    if n == 0:
+        return np.zeros(values.shape[:-1])
+
+    totals = values.sum(axis=-1)
+    index = np.arange(1, n + 1)
+    weighted = (index * values).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 2 * weighted / (n * totals) - (n + 1) / n
+    return np.where(totals == 0, 0.0, result)
+
+def concentration_ratio(distribution: np.ndarray, top_n: int = 3) -> np.ndarray:
+    """
+    Percentage of funds going to the top N grantees, along the last axis.
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        Amounts per grantee
+    top_n : int
+        Number of top grantees to consider
+
+    Returns:
+    --------
+    numpy.ndarray
+        Concentration ratio per row as a percentage
+    """
+    values = np.asarray(distribution, dtype=float)
+    totals = values.sum(axis=-1)
+    top = -np.sort(-values, axis=-1)[..., :top_n].sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = top / totals * 100
+    return np.where(totals == 0, 0.0, result)
+
+def herfindahl_index(distribution: np.ndarray) -> np.ndarray:
+    """
+    Herfindahl-Hirschman index (sum of squared funding shares), along the last axis.
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        Amounts per grantee
+
+    Returns:
+    --------
+    numpy.ndarray
+        HHI per row, from 1/grantees (even split) to 1 (one grantee gets everything)
+    """
+    values = np.asarray(distribution, dtype=float)
+    totals = values.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(totals == 0, 0.0, values / totals)
+    return (shares ** 2).sum(axis=-1)
+
+def coefficient_of_variation(distribution: np.ndarray) -> np.ndarray:
+    """
+    Funding stability per grantee: std / mean over the month axis (second to last).
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        (... x months x grantees) amounts
+
+    Returns:
+    --------
+    numpy.ndarray
+        Coefficient of variation per grantee (0 for grantees with no funding)
+    """
+    values = np.asarray(distribution, dtype=float)
+    mean = values.mean(axis=-2)
+    std = values.std(axis=-2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = std / mean
+    return np.where(mean > 0, result, 0.0)
+
+def quality_funding_correlation(distribution: np.ndarray, quality: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between grantee quality and funding, along the last axis.
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        Amounts per grantee
+    quality : numpy.ndarray
+        Quality per grantee, broadcastable against distribution
+
+    Returns:
+    --------
+    numpy.ndarray
+        Correlation per row (0 where either side has no variance)
+    """
+    values = np.asarray(distribution, dtype=float)
+    quality = np.broadcast_to(np.asarray(quality, dtype=float), values.shape)
+
+    value_dev = values - values.mean(axis=-1, keepdims=True)
+    quality_dev = quality - quality.mean(axis=-1, keepdims=True)
+    covariance = (value_dev * quality_dev).sum(axis=-1)
+    scale = np.sqrt((value_dev ** 2).sum(axis=-1) * (quality_dev ** 2).sum(axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = covariance / scale
+    return np.where(scale > 0, result, 0.0)
+
+def distribution_metrics(
+    distribution: np.ndarray,
+    quality: Optional[np.ndarray] = None,
+    top_n: int = 3
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every distribution metric in one vectorized pass.
+
+    Parameters:
+    -----------
+    distribution : numpy.ndarray
+        (months x grantees) matrix, or (runs x months x grantees) tensor
+    quality : numpy.ndarray, optional
+        Quality per grantee, broadcastable against distribution
+    top_n : int
+        Number of top grantees for the concentration ratio
+
+    Returns:
+    --------
+    dict
+        'gini', 'concentration', 'hhi' (per month), 'stability' (per grantee)
+        and, with quality, 'quality_correlation' (per month)
+    """
+    distribution = np.asarray(distribution, dtype=float)
+    metrics = {
+        'gini': gini(distribution),
+        'concentration': concentration_ratio(distribution, top_n),
+        'hhi': herfindahl_index(distribution),
+        'stability': coefficient_of_variation(distribution)
+    }
+    if quality is not None:
+        metrics['quality_correlation'] = quality_funding_correlation(distribution, quality)
+    return metrics
+
+def batch_distribution_metrics(
+    distributions: List[np.ndarray],
+    qualities: Optional[List[np.ndarray]] = None,
+    top_n: int = 3
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Compute distribution metrics for many runs.
+
+    Runs sharing a (months x grantees) shape are stacked into one
+    runs x months x grantees tensor and computed in a single pass.
+
+    Parameters:
+    -----------
+    distributions : list
+        (months x grantees) distribution matrix per run
+    qualities : list, optional
+        Quality vector per run
+    top_n : int
+        Number of top grantees for the concentration ratio
+
+    Returns:
+    --------
+    list
+        Metrics dictionary per run, as returned by distribution_metrics
+    """
+    distributions = [np.asarray(d, dtype=float) for d in distributions]
+    if not distributions:
+        return []
+
+    if len({d.shape for d in distributions}) == 1:
+        quality = None
+        if qualities is not None:
+            quality = np.stack([np.asarray(q, dtype=float) for q in qualities])[:, None, :]
+        stacked = distribution_metrics(np.stack(distributions), quality, top_n)
+        return [{name: values[i] for name, values in stacked.items()} for i in range(len(distributions))]
+
+    return [
+        distribution_metrics(d, None if qualities is None else qualities[i], top_n)
+        for i, d in enumerate(distributions)
+    ]
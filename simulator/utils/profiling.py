@@ -0,0 +1,253 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL_STAGE = nullcontext()
+_EXHAUSTED = object()
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process.
+
+    Returns:
+    --------
+    int or None
+        High-water mark in bytes (None where the resource module is unavailable)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageProfiler:
+    """
+    Registry of per-stage timers, counters and gauges for a simulation run.
+
+    Code under measurement wraps each stage in ``with profiler.stage(name)``;
+    a disabled profiler hands out a shared no-op context, so instrumented
+    code costs next to nothing when profiling is off. Peak RSS is sampled at
+    the end of every stage, which shows the stage that raised the process
+    high-water mark.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize a StageProfiler instance.
+
+        Parameters:
+        -----------
+        enabled : bool
+            Record measurements (False makes every method a no-op)
+        """
+        self.enabled = enabled
+        self.stages = OrderedDict()  # name -> {'calls', 'seconds', 'peak_rss'}
+        self.counters = OrderedDict()
+        self.gauges = OrderedDict()
+        self.profile = None
+        self.profile_stats = None
+
+    def stage(self, name: str):
+        """
+        Context manager timing one execution of a stage.
+
+        Parameters:
+        -----------
+        name : str
+            Stage name; repeated executions accumulate
+
+        Returns:
+        --------
+        context manager
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_rss': None})
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['peak_rss'] = peak_rss_bytes()
+
+    def count(self, name: str, amount: int = 1):
+        """
+        Add to a counter.
+
+        Parameters:
+        -----------
+        name : str
+            Counter name
+        amount : int
+            Amount to add
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(amount)
+
+    def gauge(self, name: str, value: float):
+        """
+        Record a size, keeping the largest value seen.
+
+        Parameters:
+        -----------
+        name : str
+            Gauge name
+        value : float
+            Observed value
+        """
+        if self.enabled:
+            self.gauges[name] = max(self.gauges.get(name, value), value)
+
+    def iterate(self, name: str, iterator: Iterator[Any]) -> Iterator[Any]:
+        """
+        Time the work done to produce each item of an iterator as a stage,
+        excluding the time the consumer spends on the item.
+
+        Parameters:
+        -----------
+        name : str
+            Stage name
+        iterator : iterator
+            Iterator to wrap
+
+        Yields:
+        -------
+        object
+            The iterator's items
+        """
+        iterator = iter(iterator)
+        while True:
+            with self.stage(name):
+                item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item
+
+    @contextmanager
+    def capture(self, sort: str = 'cumulative', limit: int = 30):
+        """
+        Run the enclosed code under cProfile.
+
+        The formatted statistics are kept in self.profile_stats and the raw
+        profile in self.profile, which can be saved with dump_stats.
+
+        Parameters:
+        -----------
+        sort : str
+            pstats sort key for the formatted statistics
+        limit : int
+            Number of functions in the formatted statistics
+        """
+        if not self.enabled:
+            yield
+            return
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(limit)
+            self.profile_stats = stream.getvalue()
+
+    def report(self) -> pd.DataFrame:
+        """
+        Per-stage timing table.
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per stage, in first-run order: calls, total and mean
+            seconds, share of the measured time and peak RSS (MB) after the
+            stage last ran
+        """
+        rows = [
+            {
+                'stage': name,
+                'calls': entry['calls'],
+                'total_s': entry['seconds'],
+                'mean_s': entry['seconds'] / entry['calls'],
+                'peak_rss_mb': None if entry['peak_rss'] is None else entry['peak_rss'] / 1024 ** 2
+            }
+            for name, entry in self.stages.items()
+        ]
+        df = pd.DataFrame(rows, columns=['stage', 'calls', 'total_s', 'mean_s', 'peak_rss_mb'])
+        total = df['total_s'].sum()
+        df['share'] = df['total_s'] / total if total > 0 else 0.0
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        All measurements as plain data.
+
+        Returns:
+        --------
+        dict
+            'stages' (as in report), 'counters', 'gauges' and 'peak_rss_mb'
+        """
+        peak = peak_rss_bytes()
+        return {
+            'stages': self.report().to_dict('records'),
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'peak_rss_mb': None if peak is None else peak / 1024 ** 2
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Serialize the measurements as JSON.
+
+        Parameters:
+        -----------
+        path : str, optional
+            File to write the JSON to
+
+        Returns:
+        --------
+        str
+            JSON document
+        """
+        document = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(document)
+        return document
+
+    def format_report(self) -> str:
+        """
+        Human-readable stage table followed by counters and gauges.
+
+        Returns:
+        --------
+        str
+            Report text
+        """
+        lines = [self.report().to_string(index=False, float_format=lambda v: f"{v:.4f}")]
+        for title, values in (('Counters', self.counters), ('Gauges', self.gauges)):
+            if values:
+                lines.append(f"\n{title}:")
+                lines.extend(f"  {name}: {value:,}" for name, value in values.items())
+        peak = peak_rss_bytes()
+        if peak is not None:
+            lines.append(f"\nPeak RSS: {peak / 1024 ** 2:,.1f} MB")
+        return '\n'.join(lines)
@@ -0,0 +1,394 @@
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple, Optional, Iterator, Iterable
+
+# Council.sol events and the stream engine events they replay as
+EVENT_KINDS = {
+    'CouncilMemberAdded': 'add_members',
+    'CouncilMemberRemoved': 'remove_members',
+    'CouncilMemberEdited': 'edit_member',
+    'GranteeAdded': 'add_grantee',
+    'GranteeRemoved': 'remove_grantee',
+    'BudgetAllocated': 'allocate',
+    'MaxAllocationsPerMemberSet': 'set_max_allocations'
+}
+
+# Engine events that carry a list and can be merged with their neighbours
+_BATCHED_KINDS = ('add_members', 'remove_members', 'allocate')
+
+def _to_int(value: Any) -> int:
+    """Convert a BigInt (string or number) to int."""
+    return int(value) if value is not None else 0
+
+def _account(ref: Any) -> str:
+    """Account address of an entity reference (dict, entity ID or address)."""
+    if isinstance(ref, dict):
+        ref = ref.get('account') or ref.get('id')
+    # Entity IDs are '<council>-<account>'
+    return str(ref).rsplit('-', 1)[-1].lower()
+
+def normalize_event(raw: Dict[str, Any], council_id: Optional[str] = None) -> Optional[Tuple]:
+    """
+    Convert a raw contract event to a replay record.
+
+    Accepts flat events ({'event': 'CouncilMemberAdded', 'blockTimestamp':
+    ..., 'member': ..., 'votingPower': ...}) as well as events with their
+    parameters nested under 'args' or 'params', as written by ethers and
+    the subgraph. BigInt values may be strings.
+
+    Parameters:
+    -----------
+    raw : dict
+        Raw event
+    council_id : str, optional
+        Only keep events emitted by this council (matched against
+        'address' or 'council' when present)
+
+    Returns:
+    --------
+    tuple or None
+        (timestamp, block number, log index, engine event kind, payload),
+        or None for events that do not affect allocations (e.g. Withdrawn)
+        or belong to another council
+    """
+    name = raw.get('event') or raw.get('eventName') or raw.get('type')
+    kind = EVENT_KINDS.get(name)
+    if kind is None:
+        return None
+
+    if council_id is not None:
+        source = raw.get('address') or raw.get('council')
+        if source is not None and _account(source) != council_id.lower():
+            return None
+
+    args = raw.get('args') or raw.get('params') or raw
+    timestamp = raw.get('timestamp', raw.get('blockTimestamp'))
+    if timestamp is None:
+        raise ValueError(f"Event {name} has no timestamp")
+
+    if kind == 'add_members':
+        payload = (_account(args['member']), _to_int(args['votingPower']))
+    elif kind == 'remove_members':
+        payload = _account(args['member'])
+    elif kind == 'edit_member':
+        payload = (_account(args['member']), _to_int(args['votingPower']))
+    elif kind == 'add_grantee':
+        payload = (_account(args['grantee']), args.get('metadata') or '')
+    elif kind == 'remove_grantee':
+        payload = _account(args['grantee'])
+    elif kind == 'allocate':
+        allocation = args.get('allocation') or args
+        payload = (
+            _account(args['member']),
+            [_account(a) for a in allocation.get('accounts') or []],
+            [_to_int(a) for a in allocation.get('amounts') or []]
+        )
+    else:
+        payload = _to_int(args['maxAllocationsPerMember'])
+
+    return (
+        float(timestamp),
+        _to_int(raw.get('blockNumber')),
+        _to_int(raw.get('logIndex')),
+        kind,
+        payload
+    )
+
+def entities_to_events(data: Dict[str, Any]) -> List[Tuple]:
+    """
+    Convert a subgraph entity export to replay records.
+
+    The export holds the council's current members and grantees and its
+    allocation history, so members and grantees are added when the first
+    allocation is made and the allocations are replayed in order. Members
+    and grantees removed before the export are not in it; their allocations
+    are skipped, as the subgraph handler does for unknown entities.
+
+    Parameters:
+    -----------
+    data : dict
+        GraphQL response ({'data': ...}) or its data, with either a
+        'council' entity or top-level 'councilMembers', 'grantees' and
+        'allocations' lists
+
+    Returns:
+    --------
+    list
+        Replay records, as returned by normalize_event
+    """
+    data = data.get('data', data)
+    council = data.get('council') or (data.get('councils') or [{}])[0]
+    members = data.get('councilMembers', council.get('councilMembers', []))
+    grantees = data.get('grantees', council.get('grantees', []))
+    allocations = sorted(
+        data.get('allocations', council.get('allocations', [])),
+        key=lambda a: _to_int(a['allocatedAt'])
+    )
+
+    if allocations:
+        start = float(_to_int(allocations[0]['allocatedAt']))
+    else:
+        start = float(_to_int(council.get('createdAt')))
+
+    events = []
+    if 'maxAllocationsPerMember' in council:
+        events.append((start, 0, 0, 'set_max_allocations', _to_int(council['maxAllocationsPerMember'])))
+    for grantee in grantees:
+        events.append((start, 0, 0, 'add_grantee', (_account(grantee), grantee.get('metadata') or '')))
+    for member in members:
+        events.append((start, 0, 0, 'add_members', (_account(member), _to_int(member['votingPower']))))
+    for allocation in allocations:
+        votes = allocation.get('votes') or []
+        events.append((
+            float(_to_int(allocation['allocatedAt'])), 0, 0, 'allocate',
+            (
+                _account(allocation['councilMember']),
+                [_account(vote['grantee']) for vote in votes],
+                [_to_int(vote['amount']) for vote in votes]
+            )
+        ))
+    return events
+
+def _read_raw_events(path: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of raw events from a JSON Lines or Parquet file."""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Replaying Parquet event logs requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path) as f:
+        chunk = []
+        for line in f:
+            if line.strip():
+                chunk.append(json.loads(line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def iter_event_chunks(path: str, chunk_size: int = 10000, council_id: Optional[str] = None) -> Iterator[List[Tuple]]:
+    """
+    Read an event log in chronological chunks.
+
+    JSON Lines (.jsonl, one raw event per line) and Parquet (.parquet, one
+    row per raw event, needs pyarrow) logs are streamed, so memory is bounded
+    by the chunk size. A .json file is loaded whole: either a list of raw
+    events or a subgraph entity export (see entities_to_events).
+
+    Events are ordered by (timestamp, block number, log index) within each
+    chunk; the log itself must already be in that order across chunks.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the event log
+    chunk_size : int
+        Number of raw events per chunk
+    council_id : str, optional
+        Only keep events emitted by this council
+
+    Yields:
+    -------
+    list
+        Replay records, as returned by normalize_event
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            events = entities_to_events(data)
+        else:
+            events = [e for e in (normalize_event(raw, council_id) for raw in data) if e is not None]
+        events.sort(key=lambda e: e[:3])
+        for i in range(0, len(events), chunk_size):
+            yield events[i:i + chunk_size]
+        return
+
+    last_key = None
+    for raw_chunk in _read_raw_events(path, chunk_size):
+        events = [e for e in (normalize_event(raw, council_id) for raw in raw_chunk) if e is not None]
+        if not events:
+            continue
+        events.sort(key=lambda e: e[:3])
+        if last_key is not None and events[0][:3] < last_key:
+            raise ValueError(
+                f"Event log {path} is not in chronological order: event at {events[0][:3]} "
+                f"follows {last_key} from the previous chunk"
+            )
+        last_key = events[-1][:3]
+        yield events
+
+def create_replay_council(config: Dict[str, Any]) -> Any:
+    """
+    Set up an empty council for replaying an event log.
+
+    Parameters:
+    -----------
+    config : dict
+        Simulation parameters; the pool, distribution rate, annual funding
+        addition, allocation storage and unit arithmetic are used
+
+    Returns:
+    --------
+    Council
+        Council with no members or grantees
+    """
+    from models.council import Council
+
+    max_allocations_per_member = config.get('max_allocations_per_member', 0)
+    allocation_storage = config.get('allocation_storage', 'auto')
+    if allocation_storage == 'auto':
+        allocation_storage = 'sparse' if max_allocations_per_member else 'dense'
+
+    return Council(
+        config.get('initial_pool', 100000),
+        config.get('distribution_rate', 0.05),
+        annual_funding_addition=config.get('annual_funding_addition', 0),
+        check_consistency=config.get('check_consistency', False),
+        duration_months=config.get('duration_months', 12),
+        max_allocations_per_member=max_allocations_per_member,
+        allocation_storage=allocation_storage,
+        unit_arithmetic=config.get('unit_arithmetic', 'float'),
+        token_decimals=config.get('token_decimals', 18)
+    )
+
+def _engine_payload(kind: str, payloads: List[Any], min_funding_threshold: float) -> Any:
+    """Build the stream engine payload for a group of replay records."""
+    from models.member import Member
+    from models.grantee import Grantee
+
+    if kind == 'add_members':
+        return [Member(member_id, voting_power) for member_id, voting_power in payloads]
+    if kind == 'add_grantee':
+        grantee_id, metadata = payloads[0]
+        return Grantee(grantee_id, metadata or grantee_id, min_funding_threshold=min_funding_threshold)
+    if kind in _BATCHED_KINDS:
+        return payloads
+    return payloads[0]
+
+def iter_replay(
+    events: Iterable[List[Tuple]],
+    engine: Any,
+    config: Dict[str, Any],
+    resolution: float = 0
+) -> Iterator[Dict[str, Any]]:
+    """
+    Replay event chunks through a stream engine, yielding month snapshots.
+
+    Consecutive membership and allocation events in the same resolution
+    bucket are applied as one batch. Months are scheduled as the log
+    advances; the month in progress when the log ends is not closed.
+
+    Parameters:
+    -----------
+    events : iterable
+        Chronological chunks of replay records, from iter_event_chunks
+    engine : StreamEngine
+        Engine driving the council, with simulate_votes disabled and
+        start_time at the first event
+    config : dict
+        Simulation parameters ('annual_funding_addition',
+        'min_funding_threshold')
+    resolution : float
+        Event times are rounded down to this many seconds from the start
+        (0 applies every event at its own timestamp)
+
+    Yields:
+    -------
+    dict
+        Month snapshot, as returned by Council.distribute_month
+    """
+    annual_funding_addition = config.get('annual_funding_addition', 0)
+    min_funding_threshold = config.get('min_funding_threshold', 0)
+    start = engine.start_time
+
+    group_time, group_kind, group = None, None, []
+
+    def flush():
+        engine.extend_months(group_time, annual_funding_addition)
+        engine.schedule(group_time, group_kind, _engine_payload(group_kind, group, min_funding_threshold))
+        return engine.iter_months(group_time)
+
+    for chunk in events:
+        for timestamp, _, _, kind, payload in chunk:
+            if resolution > 0:
+                timestamp = start + np.floor((timestamp - start) / resolution) * resolution
+            if group and (timestamp != group_time or kind != group_kind or kind not in _BATCHED_KINDS):
+                yield from flush()
+                group = []
+            group_time, group_kind = timestamp, kind
+            group.append(payload)
+    if group:
+        yield from flush()
+
+def replay_simulation(
+    path: str,
+    config: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 10000,
+    council_id: Optional[str] = None,
+    duration_months: Optional[int] = None
+) -> Tuple[Any, pd.DataFrame]:
+    """
+    Replay a recorded council event log through the continuous stream model.
+
+    Members, grantees and allocations follow the log; the pool, distribution
+    rate and annual funding come from the config, so the same history can be
+    replayed under different funding parameters.
+
+    Parameters:
+    -----------
+    path : str
+        Event log (.jsonl, .json or .parquet), see iter_event_chunks
+    config : dict, optional
+        Simulation parameters (defaults to DEFAULT_CONFIG);
+        'vote_resolution_seconds' sets the batching resolution
+    chunk_size : int
+        Number of events read at a time
+    council_id : str, optional
+        Only replay events emitted by this council
+    duration_months : int, optional
+        Number of months to run; by default the run ends with the month of
+        the last event, and longer runs hold the final allocations
+
+    Returns:
+    --------
+    tuple
+        (Council object, DataFrame with simulation history); the number of
+        events skipped for referencing unknown members or grantees is in
+        df.attrs['skipped_events']
+    """
+    from config import DEFAULT_CONFIG
+    from models.stream import StreamEngine, SECONDS_PER_MONTH
+
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    council = create_replay_council(config)
+
+    chunks = iter_event_chunks(path, chunk_size, council_id)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"Event log {path} has no council events")
+
+    engine = StreamEngine(council, start_time=first[0][0], simulate_votes=False)
+
+    def all_chunks():
+        yield first
+        yield from chunks
+
+    for _ in iter_replay(all_chunks(), engine, config, config.get('vote_resolution_seconds', 0)):
+        pass
+
+    # Close the month of the last event, then any further requested months
+    engine.extend_months(engine.time, config.get('annual_funding_addition', 0))
+    if duration_months is not None and duration_months > engine.months_scheduled:
+        engine.schedule_months(duration_months - engine.months_scheduled, config.get('annual_funding_addition', 0))
+    engine.run_until(engine.start_time + engine.months_scheduled * SECONDS_PER_MONTH)
+
+    df = council.get_history_dataframe()
+    df.attrs['skipped_events'] = dict(engine.skipped)
+    return council, df
@@ -0,0 +1,231 @@
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Tables of a result store, each a Hive-partitioned Parquet dataset
+# (<root>/<table>/run_id=<n>/part-0.parquet)
+HISTORY_TABLE = 'history'
+RUNS_TABLE = 'runs'
+
+def _pyarrow():
+    """Import pyarrow lazily, with a clear error when it is missing."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The result store requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+def history_to_long(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convert a wide history frame (dist_to_*/alloc_to_* columns) to long columns.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        History frame from Council.get_history_dataframe
+
+    Returns:
+    --------
+    dict
+        'month', 'grantee_id', 'allocation', 'distribution' and
+        'pool_balance' arrays, one entry per (month, grantee)
+    """
+    grantee_ids = [c[len('dist_to_'):] for c in df.columns if c.startswith('dist_to_')]
+    num_months, num_grantees = len(df), len(grantee_ids)
+    return {
+        'month': np.repeat(df['month'].to_numpy(dtype=np.int64), num_grantees),
+        'grantee_id': np.tile(np.array(grantee_ids, dtype=object), num_months),
+        'allocation': df[[f'alloc_to_{g}' for g in grantee_ids]].to_numpy(dtype=np.int64).ravel(),
+        'distribution': df[[f'dist_to_{g}' for g in grantee_ids]].to_numpy(dtype=float).ravel(),
+        'pool_balance': np.repeat(df['pool_balance'].to_numpy(dtype=float), num_grantees)
+    }
+
+def _config_columns(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a config into typed metadata columns.
+
+    Numbers are stored as float64 and everything else as strings, so runs
+    with int and float values of the same parameter share one schema.
+    """
+    from config import DEFAULT_CONFIG
+
+    columns = {}
+    for key in sorted({**DEFAULT_CONFIG, **config}):
+        value = config.get(key, DEFAULT_CONFIG.get(key))
+        if isinstance(value, (bool, np.bool_)):
+            columns[key] = bool(value)
+        elif isinstance(value, (int, float, np.number)):
+            columns[key] = float(value)
+        else:
+            columns[key] = None if value is None else str(value)
+    return columns
+
+class ResultStore:
+    """
+    Columnar store of batch simulation results.
+
+    Each run is written as its own partition as soon as it finishes, so a
+    batch never has to be held in memory: the history table holds one row
+    per (run, month, grantee) in long format, which works for runs with
+    different numbers of grantees, and the runs table holds each run's
+    config and summary. Loading goes through pyarrow datasets, which only
+    read the requested columns and partitions.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize a ResultStore instance.
+
+        Parameters:
+        -----------
+        root : str
+            Directory holding the store's tables (created on first write)
+        """
+        self.root = Path(root)
+
+    def _partition_path(self, table: str, run_id: int) -> Path:
+        return self.root / table / f"run_id={run_id}" / "part-0.parquet"
+
+    def _write_table(self, table: Any, path: Path):
+        """Write a Parquet file atomically, so readers never see a partial run."""
+        pa = _pyarrow()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Dot-prefixed temporary files are ignored by dataset discovery
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+        os.close(fd)
+        try:
+            pa.parquet.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def run_ids(self) -> List[int]:
+        """
+        IDs of the runs in the store.
+
+        Returns:
+        --------
+        list
+            Sorted run IDs
+        """
+        runs_dir = self.root / RUNS_TABLE
+        if not runs_dir.exists():
+            return []
+        return sorted(int(p.name.split('=', 1)[1]) for p in runs_dir.glob('run_id=*'))
+
+    def next_run_id(self) -> int:
+        """
+        First free run ID, so further batches can be appended to the store.
+
+        Returns:
+        --------
+        int
+            One past the largest run ID in the store (0 when empty)
+        """
+        run_ids = self.run_ids()
+        return run_ids[-1] + 1 if run_ids else 0
+
+    def write_run(self, run_id: int, config: Dict[str, Any], summary: Dict[str, Any],
+                  parameter_varied: str = 'None'):
+        """
+        Write one finished run.
+
+        Parameters:
+        -----------
+        run_id : int
+            ID of the run (its partition key)
+        config : dict
+            Configuration the run used
+        summary : dict
+            Summary from summarize_simulation
+        parameter_varied : str
+            Parameter varied across the batch
+        """
+        pa = _pyarrow()
+
+        history = pa.table(history_to_long(summary['history']))
+        self._write_table(history, self._partition_path(HISTORY_TABLE, run_id))
+
+        metadata = {
+            **_config_columns(config),
+            'parameter_varied': parameter_varied,
+            'final_pool': float(summary['final_pool']),
+            'num_members_final': int(summary['num_members']),
+            'viable_grantees': int(summary['viable_grantees']),
+            'config': json.dumps(config, sort_keys=True, default=str)
+        }
+        runs = pa.table({name: [value] for name, value in metadata.items()})
+        self._write_table(runs, self._partition_path(RUNS_TABLE, run_id))
+
+    def dataset(self, table: str = HISTORY_TABLE) -> Any:
+        """
+        Open a table as a lazy pyarrow dataset.
+
+        Parameters:
+        -----------
+        table : str
+            'history' or 'runs'
+
+        Returns:
+        --------
+        pyarrow.dataset.Dataset
+            Dataset with run_id as a partition column; nothing is read
+            until it is scanned
+        """
+        pa = _pyarrow()
+        return pa.dataset.dataset(self.root / table, format='parquet', partitioning='hive')
+
+    def _load(self, table: str, columns: Optional[List[str]], run_ids: Optional[List[int]]) -> pd.DataFrame:
+        pa = _pyarrow()
+        if not (self.root / table).exists():
+            return pd.DataFrame()
+        row_filter = None
+        if run_ids is not None:
+            row_filter = pa.dataset.field('run_id').isin(list(run_ids))
+        return self.dataset(table).to_table(columns=columns, filter=row_filter).to_pandas()
+
+    def load_history(self, columns: Optional[List[str]] = None, run_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Load history rows, reading only the requested columns and runs.
+
+        Parameters:
+        -----------
+        columns : list, optional
+            Columns to load, from 'run_id', 'month', 'grantee_id',
+            'allocation', 'distribution' and 'pool_balance' (default all)
+        run_ids : list, optional
+            Runs to load (default all)
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Long history frame
+        """
+        return self._load(HISTORY_TABLE, columns, run_ids)
+
+    def load_runs(self, columns: Optional[List[str]] = None, run_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Load run metadata: config parameters, the full config as JSON,
+        'parameter_varied', 'final_pool', 'num_members_final' and
+        'viable_grantees'.
+
+        Parameters:
+        -----------
+        columns : list, optional
+            Columns to load (default all)
+        run_ids : list, optional
+            Runs to load (default all)
+
+        Returns:
+        --------
+        pandas.DataFrame
+            One row per run
+        """
+        return self._load(RUNS_TABLE, columns, run_ids)
@@ -1,25 +1,37 @@
+import os
 import numpy as np
 import pandas as pd
-from concurrent.futures import ProcessPoolExecutor
-from functools import partial
-from typing import Dict, Any, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple, Optional, Iterator, Callable
 
-def run_simulation(config: Dict[str, Any]) -> Tuple[Any, pd.DataFrame]:
+def create_council(config: Dict[str, Any], context: Optional[Any] = None, keep_history: bool = True) -> Any:
     """
-    Run a single simulation with the given configuration.
+    Generate members and grantees and set up a council for the given configuration.
     
     Parameters:
     -----------
     config : dict
         Dictionary containing simulation parameters
+    context : SimulationContext, optional
+        Context carrying the random number generator (defaults to one
+        seeded from config['random_seed'])
+    keep_history : bool
+        Record every month in council.history
         
     Returns:
     --------
-    tuple
-        (Council object, DataFrame with simulation history)
+    Council
+        Council ready to simulate; its rng continues the context's stream
     """
+    from models.adaptive import create_behavior
     from models.council import Council
+    from models.participation import create_participation
     from utils.helpers import generate_members, generate_grantees, setup_coalitions
+    from utils.context import SimulationContext
+    
+    context = context or SimulationContext(config.get('random_seed'))
+    rng = context.rng
+    profiler = context.profiler
     
     # Extract parameters
     num_members = config.get('num_members', 100)
@@ -34,55 +46,429 @@ def run_simulation(config: Dict[str, Any]) -> Tuple[Any, pd.DataFrame]:
     allocation_strategy = config.get('allocation_strategy', 'random')
     coalition_size = config.get('coalition_size', 0.3)
     coalition_focus = config.get('coalition_focus', 2)
-    participation_rate = config.get('participation_rate', 0.8)
+    coalition_overlap = config.get('coalition_overlap', 0.0)
     duration_months = config.get('duration_months', 12)
+    check_consistency = config.get('check_consistency', False)
+    max_allocations_per_member = config.get('max_allocations_per_member', 0)
+    allocation_storage = config.get('allocation_storage', 'auto')
+    if allocation_storage == 'auto':
+        allocation_storage = 'sparse' if max_allocations_per_member else 'dense'
     
     # Generate members and grantees
-    members = generate_members(
-        num_members,
-        voting_power_distribution,
-        power_skew
-    )
-    
-    grantees = generate_grantees(
-        num_grantees,
-        quality_distribution,
-        popularity_correlation
-    )
+    with profiler.stage('generate_members'):
+        members = generate_members(
+            num_members,
+            voting_power_distribution,
+            power_skew,
+            rng=rng
+        )
+    
+    with profiler.stage('generate_grantees'):
+        grantees = generate_grantees(
+            num_grantees,
+            quality_distribution,
+            popularity_correlation,
+            rng=rng
+        )
     
     # Set up coalitions if using coalition strategy
     if allocation_strategy == 'coalition':
-        members = setup_coalitions(members, grantees, coalition_size, coalition_focus)
+        with profiler.stage('setup_coalitions'):
+            members = setup_coalitions(members, grantees, coalition_size, coalition_focus, rng, coalition_overlap)
     
-    # Set member strategies
-    for member in members:
-        if member.strategy != 'coalition':  # Don't override coalition strategy
-            member.strategy = allocation_strategy
+    # Set member strategies (coalition members keep theirs)
+    members.assign_strategy(allocation_strategy)
+    
+    # Participation model (non-uniform models draw member propensities)
+    participation = create_participation(config, len(members), rng)
+    
+    # Learned weights of adaptive strategies
+    behavior = create_behavior(config, len(members), len(grantees))
     
     # Initialize council
-    council = Council(
-        initial_pool, 
-        distribution_rate, 
-        members, 
-        grantees,
-        annual_funding_addition
-    )
+    with profiler.stage('council_init'):
+        council = Council(
+            initial_pool, 
+            distribution_rate, 
+            members, 
+            grantees,
+            annual_funding_addition,
+            check_consistency,
+            duration_months,
+            rng,
+            max_allocations_per_member,
+            allocation_storage,
+            keep_history,
+            participation,
+            config.get('unit_arithmetic', 'float'),
+            config.get('token_decimals', 18),
+            config.get('coalition_churn', 0.0),
+            behavior
+        )
+    profiler.gauge('members', len(members))
+    profiler.gauge('grantees', len(grantees))
+    return council
+
+def iter_simulation(
+    config: Dict[str, Any],
+    context: Optional[Any] = None,
+    council: Optional[Any] = None,
+    checkpointer: Optional[Any] = None,
+    start_month: int = 0,
+    engine: Optional[Any] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run a simulation month by month, yielding a snapshot after each month.
     
-    # Run simulation for specified duration
-    for month in range(duration_months):
-        # Members allocate voting power
-        for member in council.active_members(participation_rate):
-            allocations = member.allocate(council.grantees)
-            council.record_allocations(member, allocations)
+    Snapshots are independent of each other, so a consumer that drops months
+    it has processed (with a council created with keep_history=False) runs in
+    memory that does not grow with the duration. Stopping iteration early
+    leaves the council in its state after the last yielded month.
+    
+    Parameters:
+    -----------
+    config : dict
+        Dictionary containing simulation parameters
+    context : SimulationContext, optional
+        Context used to create the council when none is given; its
+        profiler times the allocation and distribution stages
+    council : Council, optional
+        Council to simulate (defaults to create_council(config, context))
+    checkpointer : Checkpointer, optional
+        Checkpointer saving the run state every checkpointer.every months
+    start_month : int
+        First month to simulate, when resuming a monthly run
+    engine : StreamEngine, optional
+        Engine to continue, when resuming a continuous run
+        
+    Yields:
+    -------
+    dict
+        'month', 'pool_balance', 'distribution' (amount per grantee),
+        'allocations' (total votes per grantee) and 'annual_funding_added'
+    """
+    from utils.profiling import StageProfiler
+    
+    if council is None:
+        council = create_council(config, context)
+    profiler = context.profiler if context is not None else StageProfiler(enabled=False)
+    
+    duration_months = config.get('duration_months', 12)
+    
+    if config.get('time_model', 'monthly') == 'continuous':
+        from models.stream import StreamEngine, SECONDS_PER_MONTH
+        
+        # Stream funds continuously between vote and top-up events
+        if engine is None:
+            engine = StreamEngine(council, vote_resolution=config.get('vote_resolution_seconds', 86400))
+            engine.schedule_months(duration_months, council.annual_funding_addition)
+        for snapshot in profiler.iterate('stream', engine.iter_months(duration_months * SECONDS_PER_MONTH)):
+            if checkpointer is not None and checkpointer.due(snapshot['month']):
+                with profiler.stage('checkpoint'):
+                    checkpointer.save_state({'council': council, 'engine': engine, 'month': snapshot['month'] + 1})
+            yield snapshot
+        return
+    
+    for month in range(start_month, duration_months):
+        # Active members allocate voting power in one batch, after
+        # coalition memberships change hands
+        with profiler.stage('allocation'):
+            council.churn_coalitions()
+            changed_rows, _ = council.allocate_batch(council.active_member_indices())
+        profiler.count('member_allocations', len(changed_rows))
         
         # Distribute funds based on allocations
-        council.distribute_funds(month)
+        with profiler.stage('distribution'):
+            snapshot = council.distribute_month(month)
+        profiler.count('months')
+        profiler.gauge('members_with_allocations', len(council.allocations))
+        
+        if checkpointer is not None and checkpointer.due(month):
+            with profiler.stage('checkpoint'):
+                checkpointer.save_state({'council': council, 'engine': None, 'month': month + 1})
+        yield snapshot
+
+def run_simulation(config: Dict[str, Any], context: Optional[Any] = None,
+                   checkpointer: Optional[Any] = None) -> Tuple[Any, pd.DataFrame]:
+    """
+    Run a single simulation with the given configuration.
+    
+    Parameters:
+    -----------
+    config : dict
+        Dictionary containing simulation parameters
+    context : SimulationContext, optional
+        Context carrying the random number generator (defaults to one
+        seeded from config['random_seed'])
+    checkpointer : Checkpointer, optional
+        Checkpointer to resume from and save to; a resumed run continues
+        with the council, RNG and history of its last checkpoint
+        
+    Returns:
+    --------
+    tuple
+        (Council object, DataFrame with simulation history)
+    """
+    from utils.context import SimulationContext
+    
+    context = context or SimulationContext(config.get('random_seed'))
+    state = resume_state(config, context, checkpointer)
+    
+    # Run simulation for specified duration
+    for _ in iter_simulation(config, context, state['council'], checkpointer, state['month'], state['engine']):
+        pass
+    council = state['council']
     
     # Get history as DataFrame
-    df = council.get_history_dataframe()
+    with context.profiler.stage('history_frame'):
+        df = council.get_history_dataframe()
     
     return council, df
 
+def resume_state(config: Dict[str, Any], context: Optional[Any] = None,
+                 checkpointer: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Load a run's last checkpoint, or set up a new run without one.
+    
+    Parameters:
+    -----------
+    config : dict
+        Dictionary containing simulation parameters
+    context : SimulationContext, optional
+        Context used to create the council of a new run
+    checkpointer : Checkpointer, optional
+        Checkpointer holding the run's state
+        
+    Returns:
+    --------
+    dict
+        'council', 'engine' (continuous runs, None until the run has
+        started) and 'month' (first month left to simulate)
+    """
+    state = checkpointer.load_state() if checkpointer is not None else None
+    if state is None:
+        state = {'council': create_council(config, context), 'engine': None, 'month': 0}
+    return state
+
+def create_council_network(config: Dict[str, Any], context: Optional[Any] = None) -> Any:
+    """
+    Generate a network of councils sharing members for the given configuration.
+    
+    Every council gets config['num_members'] seats drawn from a shared
+    population of config['network_members'] members (0 sizes it so members
+    sit on about three councils on average), a grantee count varying
+    around config['num_grantees'], and a pool scattered around
+    config['initial_pool']; chains and super tokens are assigned at random.
+    
+    Parameters:
+    -----------
+    config : dict
+        Dictionary containing simulation parameters
+    context : SimulationContext, optional
+        Context carrying the random number generator (defaults to one
+        seeded from config['random_seed'])
+        
+    Returns:
+    --------
+    CouncilNetwork
+        Network ready to simulate
+    """
+    from models.council_network import CouncilNetwork, CHAINS, SUPER_TOKENS
+    from models.participation import create_participation
+    from models.population import MemberTable
+    from utils.helpers import generate_members, generate_grantees, assign_council_seats
+    from utils.context import SimulationContext
+    
+    context = context or SimulationContext(config.get('random_seed'))
+    rng = context.rng
+    profiler = context.profiler
+    
+    num_councils = config.get('num_councils', 1)
+    seats_per_council = config.get('num_members', 100)
+    num_grantees = config.get('num_grantees', 10)
+    network_members = config.get('network_members', 0) or max(seats_per_council, num_councils * seats_per_council // 3)
+    
+    with profiler.stage('assign_seats'):
+        seat_member, seat_council = assign_council_seats(
+            network_members, num_councils, seats_per_council, rng=rng
+        )
+    
+    with profiler.stage('generate_councils'):
+        seat_voting_power = np.concatenate([
+            generate_members(
+                int((seat_council == c).sum()),
+                config.get('voting_power_distribution', 'equal'),
+                config.get('power_skew', 0.5),
+                rng=rng
+            ).voting_power
+            for c in range(num_councils)
+        ]) if num_councils else np.zeros(0, dtype=np.int64)
+        grantee_counts = rng.integers(max(1, num_grantees // 2), num_grantees + num_grantees // 2 + 1, num_councils)
+        grantees = [
+            generate_grantees(
+                int(count),
+                config.get('quality_distribution', 'uniform'),
+                config.get('popularity_correlation', 0.5),
+                config.get('min_funding_threshold', 1000),
+                rng=rng
+            )
+            for count in grantee_counts
+        ]
+        initial_pool = config.get('initial_pool', 100000) * rng.lognormal(0.0, 0.5, num_councils)
+        chains = rng.choice(CHAINS, num_councils).tolist()
+        tokens = rng.choice(SUPER_TOKENS, num_councils).tolist()
+    
+    # Members carry their total voting power across councils and one
+    # strategy on all of them
+    members = MemberTable(np.bincount(seat_member, weights=seat_voting_power, minlength=network_members))
+    members.assign_strategy(config.get('allocation_strategy', 'random'))
+    participation = create_participation(config, network_members, rng)
+    
+    with profiler.stage('network_init'):
+        network = CouncilNetwork(
+            members,
+            seat_member,
+            seat_council,
+            seat_voting_power,
+            grantees,
+            initial_pool,
+            config.get('distribution_rate', 0.05),
+            config.get('annual_funding_addition', 0),
+            chains,
+            tokens,
+            config.get('duration_months', 12),
+            rng,
+            participation
+        )
+    profiler.gauge('councils', num_councils)
+    profiler.gauge('members', network_members)
+    profiler.gauge('seats', len(seat_member))
+    return network
+
+def run_network_simulation(config: Dict[str, Any], context: Optional[Any] = None) -> Tuple[Any, pd.DataFrame]:
+    """
+    Run a multi-council simulation with the given configuration.
+    
+    Parameters:
+    -----------
+    config : dict
+        Dictionary containing simulation parameters (monthly time model)
+    context : SimulationContext, optional
+        Context carrying the random number generator (defaults to one
+        seeded from config['random_seed'])
+        
+    Returns:
+    --------
+    tuple
+        (CouncilNetwork object, DataFrame of per-council outcomes)
+    """
+    from utils.context import SimulationContext
+    
+    if config.get('time_model', 'monthly') != 'monthly':
+        raise ValueError("Multi-council simulations support the monthly time model only")
+    if config.get('unit_arithmetic', 'float') != 'float':
+        raise ValueError("Multi-council simulations support float unit arithmetic only")
+    
+    context = context or SimulationContext(config.get('random_seed'))
+    profiler = context.profiler
+    network = create_council_network(config, context)
+    
+    for month in range(config.get('duration_months', 12)):
+        # Every active seat on every council allocates in one batch
+        with profiler.stage('allocation'):
+            changed_seats = network.allocate(network.active_seats())
+        profiler.count('seat_allocations', len(changed_seats))
+        
+        # Every pool distributes in one pass
+        with profiler.stage('distribution'):
+            network.distribute_month(month)
+        profiler.count('months')
+    
+    with profiler.stage('council_frame'):
+        df = network.council_frame()
+    
+    return network, df
+
+def summarize_simulation(council: Any, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Reduce a finished simulation to a compact, picklable summary.
+    
+    Parameters:
+    -----------
+    council : Council
+        Council object after the simulation
+    df : pandas.DataFrame
+        DataFrame with simulation history
+        
+    Returns:
+    --------
+    dict
+        Summary with the history frame, final pool and per-grantee outcomes
+    """
+    grantees = [
+        {
+            'id': grantee.id,
+            'name': grantee.name,
+            'quality': float(grantee.quality),
+            'popularity': float(grantee.popularity),
+            'received_funds': float(grantee.received_funds),
+            'viable': bool(grantee.is_viable())
+        }
+        for grantee in council.grantees
+    ]
+    
+    return {
+        'history': df,
+        'final_pool': float(council.pool_balance),
+        'num_members': len(council.members),
+        'grantees': grantees,
+        'viable_grantees': sum(1 for g in grantees if g['viable'])
+    }
+
+def _run_batch_job(job: Tuple[Dict[str, Any], np.random.SeedSequence]) -> Dict[str, Any]:
+    """
+    Run one batch simulation with its own seed and return its summary.
+    
+    Parameters:
+    -----------
+    job : tuple
+        (configuration dictionary, SeedSequence for this run)
+        
+    Returns:
+    --------
+    dict
+        Summary from summarize_simulation
+    """
+    from utils.context import SimulationContext
+    
+    config, seed_sequence = job
+    council, df = run_simulation(config, SimulationContext(seed_sequence))
+    return summarize_simulation(council, df)
+
+def resolve_workers(workers: Optional[int], num_jobs: int) -> int:
+    """
+    Decide how many worker processes to use for a batch.
+    
+    Parameters:
+    -----------
+    workers : int, optional
+        Requested number of workers (None or 0 for one per CPU)
+    num_jobs : int
+        Number of simulations in the batch
+        
+    Returns:
+    --------
+    int
+        Number of worker processes (1 means run in-process)
+    """
+    from config import FEATURES
+    
+    if not FEATURES.get('parallel_processing', False):
+        return 1
+    if not workers:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, num_jobs))
+
 def create_parameter_variations(
     base_config: Dict[str, Any],
     parameter: str,
@@ -153,14 +539,95 @@ def create_parameter_variations(
     
     return configs
 
+def create_batch_configs(base_config: Dict[str, Any], parameter_to_vary: str, num_simulations: int) -> List[Dict[str, Any]]:
+    """
+    Build the configurations of a batch.
+    
+    Parameters:
+    -----------
+    base_config : dict
+        Base configuration dictionary
+    parameter_to_vary : str
+        Name of the parameter to vary ('None' repeats the base config)
+    num_simulations : int
+        Number of simulations
+        
+    Returns:
+    --------
+    list
+        List of configuration dictionaries
+    """
+    if parameter_to_vary == "None":
+        # Run the same simulation multiple times (Monte Carlo)
+        return [base_config.copy() for _ in range(num_simulations)]
+    # Create variations of the specified parameter
+    return create_parameter_variations(base_config, parameter_to_vary, num_simulations)
+
+def iter_batch_simulations(
+    configs: List[Dict[str, Any]],
+    random_seed: Any = 42,
+    workers: Optional[int] = 1,
+    run_job: Callable[[Tuple[Dict[str, Any], np.random.SeedSequence]], Any] = _run_batch_job,
+    run_ids: Optional[List[int]] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Run a batch of simulations, yielding each summary as soon as its run
+    finishes, so callers can write results out without holding the batch.
+    
+    Each run gets an independent seed spawned from a SeedSequence rooted at
+    random_seed, so results do not depend on the worker count.
+    
+    Parameters:
+    -----------
+    configs : list
+        Configuration per run
+    random_seed : int
+        Root seed of the batch
+    workers : int, optional
+        Number of worker processes (1 runs in-process, None or 0 uses one
+        per CPU); ignored when FEATURES['parallel_processing'] is off
+    run_job : callable
+        Module-level function running one (config, SeedSequence) job
+        (defaults to a full run reduced by summarize_simulation)
+    run_ids : list, optional
+        Indices into configs of the runs to execute (default all); each
+        run keeps the seed of its index, so finishing a partly completed
+        batch gives the same results as running it in one go
+        
+    Yields:
+    -------
+    tuple
+        (index of the run in configs, result of run_job), in completion order
+    """
+    # Spawn one independent seed per run
+    seed_sequence = np.random.SeedSequence(random_seed)
+    jobs = list(zip(configs, seed_sequence.spawn(len(configs))))
+    if run_ids is None:
+        run_ids = range(len(jobs))
+    
+    num_workers = resolve_workers(workers, len(run_ids))
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(run_job, jobs[i]): i for i in run_ids}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    else:
+        for i in run_ids:
+            yield i, run_job(jobs[i])
+
 def run_batch_simulations(
     base_config: Dict[str, Any],
     parameter_to_vary: str,
-    num_simulations: int
+    num_simulations: int,
+    workers: Optional[int] = 1,
+    checkpointer: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Run multiple simulations with variations of a parameter.
     
+    Each run gets an independent seed spawned from a SeedSequence rooted at
+    the config's random_seed, so results do not depend on the worker count.
+    
     Parameters:
     -----------
     base_config : dict
@@ -169,32 +636,33 @@ def run_batch_simulations(
         Name of the parameter to vary
     num_simulations : int
         Number of simulations to run
+    workers : int, optional
+        Number of worker processes (1 runs in-process, None or 0 uses one
+        per CPU); ignored when FEATURES['parallel_processing'] is off
+    checkpointer : Checkpointer, optional
+        Checkpointer recording each finished run; runs it already holds
+        are not run again
         
     Returns:
     --------
     dict
-        Dictionary containing batch simulation results
+        Dictionary containing batch configs and per-run summaries
     """
-    if parameter_to_vary == "None":
-        # Run the same simulation multiple times (Monte Carlo)
-        configs = [base_config.copy() for _ in range(num_simulations)]
-    else:
-        # Create variations of the specified parameter
-        configs = create_parameter_variations(base_config, parameter_to_vary, num_simulations)
+    configs = create_batch_configs(base_config, parameter_to_vary, num_simulations)
     
-    # Run simulations (sequentially for now)
-    # TODO: Implement parallel processing for large simulations
-    results = []
-    for config in configs:
-        results.append(run_simulation(config))
+    summaries = [None] * len(configs)
+    completed = checkpointer.completed_runs() if checkpointer is not None else {}
+    for i, summary in completed.items():
+        summaries[i] = summary
+    remaining = [i for i in range(len(configs)) if i not in completed]
     
-    # For small numbers of simulations, sequential is fine
-    # For larger batches, we could use parallel processing:
-    # with ProcessPoolExecutor() as executor:
-    #     results = list(executor.map(run_simulation, configs))
+    for i, summary in iter_batch_simulations(configs, base_config.get('random_seed', 42), workers, run_ids=remaining):
+        summaries[i] = summary
+        if checkpointer is not None:
+            checkpointer.record_run(i, summary)
     
     return {
         'configs': configs,
-        'results': results,
+        'summaries': summaries,
         'parameter_varied': parameter_to_vary
     } 
\ No newline at end of file
@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Dict, Any, List, Tuple, Optional, Union
+
+SWEEP_METHODS = ('grid', 'latin_hypercube', 'sobol')
+
+# Per-run outcomes aggregated by run_sweep
+SWEEP_METRICS = (
+    'final_pool', 'total_distributed', 'viable_grantees',
+    'gini', 'concentration', 'hhi', 'quality_correlation'
+)
+
+def parameter_bounds(parameters: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Look up sweep bounds in PARAMETER_RANGES.
+
+    Parameters:
+    -----------
+    parameters : list
+        PARAMETER_RANGES keys to sweep
+
+    Returns:
+    --------
+    tuple
+        (lower bounds, upper bounds, integer mask); parameters whose range
+        and default are all integers are swept over integers
+    """
+    from config import PARAMETER_RANGES
+
+    unknown = [p for p in parameters if p not in PARAMETER_RANGES]
+    if unknown:
+        raise ValueError(f"Cannot sweep {unknown}: not in PARAMETER_RANGES ({sorted(PARAMETER_RANGES)})")
+    if len(set(parameters)) != len(parameters):
+        raise ValueError(f"Duplicate sweep parameters: {parameters}")
+
+    ranges = [PARAMETER_RANGES[p] for p in parameters]
+    low = np.array([r[0] for r in ranges], dtype=float)
+    high = np.array([r[1] for r in ranges], dtype=float)
+    is_integer = np.array([all(isinstance(v, int) for v in r) for r in ranges], dtype=bool)
+    return low, high, is_integer
+
+def unit_samples(
+    num_dimensions: int,
+    method: str = 'grid',
+    num_points: int = 16,
+    levels: Union[int, List[int]] = 5,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Sample points in the unit hypercube.
+
+    Parameters:
+    -----------
+    num_dimensions : int
+        Number of swept parameters
+    method : str
+        'grid' (full factorial over `levels` evenly spaced values per
+        dimension), 'latin_hypercube' or 'sobol' (scrambled; needs scipy,
+        and num_points is rounded up to a power of two to keep the sequence
+        balanced)
+    num_points : int
+        Number of points for latin_hypercube and sobol
+    levels : int or list
+        Values per dimension for grid
+    rng : numpy.random.Generator, optional
+        Random number generator for latin_hypercube and sobol
+
+    Returns:
+    --------
+    numpy.ndarray
+        (points x dimensions) samples in [0, 1]
+    """
+    rng = rng or np.random.default_rng()
+
+    if method == 'grid':
+        levels = [levels] * num_dimensions if np.isscalar(levels) else list(levels)
+        if len(levels) != num_dimensions:
+            raise ValueError(f"Expected {num_dimensions} grid levels, got {len(levels)}")
+        axes = [np.linspace(0.0, 1.0, n) if n > 1 else np.array([0.5]) for n in levels]
+        mesh = np.meshgrid(*axes, indexing='ij')
+        return np.stack([m.ravel() for m in mesh], axis=-1)
+
+    if method == 'latin_hypercube':
+        # One point per stratum in every dimension, strata paired at random
+        strata = np.argsort(rng.random((num_dimensions, num_points)), axis=1).T
+        return (strata + rng.random((num_points, num_dimensions))) / num_points
+
+    if method == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError as e:
+            raise ImportError("Sobol sweeps require scipy (pip install scipy)") from e
+        exponent = int(np.ceil(np.log2(max(num_points, 1))))
+        return qmc.Sobol(num_dimensions, scramble=True, seed=rng).random_base2(exponent)
+
+    raise ValueError(f"Unknown sweep method: {method} (expected one of {SWEEP_METHODS})")
+
+def sample_parameters(
+    parameters: List[str],
+    method: str = 'grid',
+    num_points: int = 16,
+    levels: Union[int, List[int]] = 5,
+    rng: Optional[np.random.Generator] = None
+) -> pd.DataFrame:
+    """
+    Generate sweep points over PARAMETER_RANGES.
+
+    Parameters:
+    -----------
+    parameters : list
+        PARAMETER_RANGES keys to sweep
+    method : str
+        'grid', 'latin_hypercube' or 'sobol' (see unit_samples)
+    num_points : int
+        Number of points for latin_hypercube and sobol
+    levels : int or list
+        Values per parameter for grid
+    rng : numpy.random.Generator, optional
+        Random number generator
+
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per distinct point, one column per parameter; integer
+        parameters are rounded
+    """
+    low, high, is_integer = parameter_bounds(parameters)
+    values = low + unit_samples(len(parameters), method, num_points, levels, rng) * (high - low)
+    values[:, is_integer] = np.round(values[:, is_integer])
+
+    points = pd.DataFrame(values, columns=parameters)
+    for name in np.array(parameters)[is_integer]:
+        points[name] = points[name].astype(np.int64)
+    # Rounding can merge grid points of integer parameters
+    return points.drop_duplicates(ignore_index=True)
+
+def create_sweep_configs(base_config: Dict[str, Any], points: pd.DataFrame, replicates: int = 1) -> List[Dict[str, Any]]:
+    """
+    Build one configuration per sweep point and replicate.
+
+    Parameters:
+    -----------
+    base_config : dict
+        Configuration for every parameter not swept
+    points : pandas.DataFrame
+        Sweep points from sample_parameters
+    replicates : int
+        Monte Carlo replicates per point
+
+    Returns:
+    --------
+    list
+        Configurations, point-major (replicates of a point are adjacent)
+    """
+    configs = []
+    for point in points.to_dict('records'):
+        point = {k: v.item() if isinstance(v, np.generic) else v for k, v in point.items()}
+        configs.extend({**base_config, **point} for _ in range(replicates))
+    return configs
+
+def _run_sweep_job(job: Tuple[Dict[str, Any], np.random.SeedSequence]) -> Dict[str, float]:
+    """
+    Run one sweep simulation and reduce it to scalar outcomes.
+
+    Only SWEEP_METRICS travel back from worker processes, rather than the
+    history frame, so sweeps over thousands of runs stay cheap to collect.
+    """
+    from utils.context import SimulationContext
+    from utils.metrics import distribution_metrics
+    from utils.simulation_runner import create_council, iter_simulation
+
+    config, seed_sequence = job
+    council = create_council(config, SimulationContext(seed_sequence))
+    for _ in iter_simulation(config, council=council):
+        pass
+
+    distribution = council.history.distribution[:council.history.size]
+    quality_by_id = {g.id: g.quality for g in list(council.grantees) + council.removed_grantees}
+    quality = np.array([quality_by_id[g] for g in council.history.grantee_ids])
+    metrics = distribution_metrics(distribution, quality)
+    return {
+        'final_pool': float(council.pool_balance),
+        'total_distributed': float(distribution.sum()),
+        'viable_grantees': float(sum(g.is_viable() for g in council.grantees)),
+        'gini': float(metrics['gini'].mean()),
+        'concentration': float(metrics['concentration'].mean()),
+        'hhi': float(metrics['hhi'].mean()),
+        'quality_correlation': float(metrics['quality_correlation'].mean())
+    }
+
+def aggregate_replicates(outcomes: np.ndarray, confidence: float = 0.95) -> Dict[str, np.ndarray]:
+    """
+    Mean and normal-approximation confidence interval over replicates.
+
+    Parameters:
+    -----------
+    outcomes : numpy.ndarray
+        (points x replicates x metrics) outcomes
+    confidence : float
+        Confidence level of the interval
+
+    Returns:
+    --------
+    dict
+        'mean', 'std', 'ci_low' and 'ci_high', each (points x metrics); the
+        interval collapses to the mean with a single replicate
+    """
+    replicates = outcomes.shape[1]
+    mean = outcomes.mean(axis=1)
+    std = outcomes.std(axis=1, ddof=1) if replicates > 1 else np.zeros_like(mean)
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * std / np.sqrt(replicates)
+    return {'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+def run_sweep(
+    base_config: Dict[str, Any],
+    parameters: List[str],
+    method: str = 'grid',
+    num_points: int = 16,
+    levels: Union[int, List[int]] = 5,
+    replicates: int = 10,
+    workers: Optional[int] = None,
+    confidence: float = 0.95,
+    checkpointer: Optional[Any] = None
+) -> pd.DataFrame:
+    """
+    Run a parameter sweep and aggregate replicates per point.
+
+    Every run gets its own seed spawned from base_config['random_seed'], so
+    results do not depend on the worker count.
+
+    Parameters:
+    -----------
+    base_config : dict
+        Configuration for every parameter not swept
+    parameters : list
+        PARAMETER_RANGES keys to sweep
+    method : str
+        'grid', 'latin_hypercube' or 'sobol'
+    num_points : int
+        Number of points for latin_hypercube and sobol
+    levels : int or list
+        Values per parameter for grid
+    replicates : int
+        Monte Carlo replicates per point
+    workers : int, optional
+        Number of worker processes (None or 0 uses one per CPU)
+    confidence : float
+        Confidence level of the intervals
+    checkpointer : Checkpointer, optional
+        Checkpointer recording the outcomes of each finished run; runs it
+        already holds are not run again
+
+    Returns:
+    --------
+    pandas.DataFrame
+        One row per point: the parameter values, then <metric>_mean,
+        <metric>_ci_low and <metric>_ci_high for each of SWEEP_METRICS
+    """
+    from utils.context import SimulationContext
+    from utils.simulation_runner import iter_batch_simulations
+
+    seed = base_config.get('random_seed', 42)
+    sampling_rng = SimulationContext(seed).rng
+    points = sample_parameters(parameters, method, num_points, levels, sampling_rng)
+    configs = create_sweep_configs(base_config, points, replicates)
+
+    outcomes = np.zeros((len(configs), len(SWEEP_METRICS)))
+    completed = checkpointer.completed_runs() if checkpointer is not None else {}
+    for i, result in completed.items():
+        outcomes[i] = [result[name] for name in SWEEP_METRICS]
+    remaining = [i for i in range(len(configs)) if i not in completed]
+
+    for i, result in iter_batch_simulations(configs, seed, workers, _run_sweep_job, remaining):
+        outcomes[i] = [result[name] for name in SWEEP_METRICS]
+        if checkpointer is not None:
+            checkpointer.record_run(i, result)
+
+    stats = aggregate_replicates(outcomes.reshape(len(points), replicates, len(SWEEP_METRICS)), confidence)
+    columns = {}
+    for j, name in enumerate(SWEEP_METRICS):
+        columns[f'{name}_mean'] = stats['mean'][:, j]
+        columns[f'{name}_ci_low'] = stats['ci_low'][:, j]
+        columns[f'{name}_ci_high'] = stats['ci_high'][:, j]
+    return pd.concat([points, pd.DataFrame(columns)], axis=1)
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -8,8 +9,14 @@ from typing import Dict, Any, List, Optional
 from models.council import Council
 from models.member import Member
 from models.grantee import Grantee
-from utils.simulation_runner import run_simulation, run_batch_simulations
+from utils.simulation_runner import iter_simulation, resume_state, run_batch_simulations
 from utils.helpers import generate_members, generate_grantees
+from utils.metrics import batch_distribution_metrics
+from utils.cache import get_result_cache, config_key
+from utils.checkpoint import Checkpointer, checkpoint_dir
+from utils.context import SimulationContext
+from utils.profiling import StageProfiler
+from config import DEFAULT_CONFIG, FEATURES, CHECKPOINT_SETTINGS
 from visualization.plots import (
     create_funding_pool_plot,
     create_grantee_allocation_plot,
@@ -17,6 +24,26 @@ from visualization.plots import (
     create_network_plot
 )
 
+# Allocation strategy choices, mapped to config['allocation_strategy']
+ALLOCATION_STRATEGY_OPTIONS = {
+    "Random": 'random',
+    "Merit-based": 'merit',
+    "Popularity-based": 'popularity',
+    "Coalition": 'coalition',
+    "Reinforcement": 'reinforcement',
+    "Herding": 'herding',
+    "Bounded Rational": 'bounded_rational'
+}
+
+# Network tab grouping choices, mapped to create_network_plot's group_by
+NETWORK_GROUPING_OPTIONS = {
+    "Auto": 'auto',
+    "Voting Power Decile": 'decile',
+    "Strategy": 'strategy',
+    "Coalition": 'coalition',
+    "Individual Members": None
+}
+
 def run_dashboard():
     """Run the Streamlit dashboard for the Council funding simulation."""
     
@@ -71,7 +98,7 @@ def run_dashboard():
         st.subheader("Member Behavior")
         allocation_strategy = st.selectbox(
             "Allocation Strategy",
-            ["Random", "Merit-based", "Popularity-based", "Coalition"]
+            list(ALLOCATION_STRATEGY_OPTIONS)
         )
         
         if allocation_strategy == "Coalition":
@@ -85,16 +112,107 @@ def run_dashboard():
                 1, min(5, num_grantees), 2,
                 help="Number of grantees each coalition supports"
             )
+            coalition_overlap = st.slider(
+                "Coalition Overlap (%)",
+                0, 100, 0,
+                help="Percentage of coalition members who also join a second coalition"
+            )
+            coalition_churn = st.slider(
+                "Coalition Churn (%)",
+                0, 50, 0,
+                help="Percentage of coalition memberships moving to another coalition each month"
+            )
         else:
             coalition_size = 30
             coalition_focus = 2
+            coalition_overlap = 0
+            coalition_churn = 0
+        
+        if allocation_strategy in ("Reinforcement", "Herding", "Bounded Rational"):
+            learning_rate = st.slider(
+                "Learning Rate",
+                0.0, 1.0, 0.2,
+                help="Weight members give each month's outcome when updating their allocation weights"
+            )
+            if allocation_strategy == "Bounded Rational":
+                exploration_rate = 0.05
+                rationality = st.slider(
+                    "Rationality",
+                    0.0, 20.0, 5.0,
+                    help="How sharply members prefer the grantees they find most attractive"
+                )
+                perception_noise = st.slider(
+                    "Perception Noise",
+                    0.0, 1.0, 0.1,
+                    help="Noise in how members perceive grantee viability"
+                )
+            else:
+                exploration_rate = st.slider(
+                    "Exploration Rate",
+                    0.0, 1.0, 0.05,
+                    help="Share of voting power members split equally instead of following their weights"
+                )
+                rationality = 5.0
+                perception_noise = 0.1
+        else:
+            learning_rate = 0.2
+            exploration_rate = 0.05
+            rationality = 5.0
+            perception_noise = 0.1
         
         participation_rate = st.slider("Member Participation Rate (%)", 10, 100, 80) / 100
         
+        participation_model = st.selectbox(
+            "Participation Model",
+            ["Uniform", "Propensity", "Markov"],
+            help="Same share of members drawn every month, per-member propensities, "
+                 "or propensities where active members tend to stay active"
+        )
+        participation_heterogeneity = 0.0
+        participation_persistence = 0.5
+        if participation_model != "Uniform":
+            participation_heterogeneity = st.slider(
+                "Participation Heterogeneity", 0.0, 1.0, 0.0,
+                help="Spread of participation propensities across members (0 = identical)"
+            )
+        if participation_model == "Markov":
+            participation_persistence = st.slider(
+                "Participation Persistence", 0.0, 1.0, 0.5,
+                help="Correlation of a member's activity between consecutive months"
+            )
+        
+        max_allocations_per_member = st.slider(
+            "Max Allocations per Member",
+            0, num_grantees, 0,
+            help="Maximum number of grantees each member can vote for (0 = no limit)"
+        )
+        
         # Temporal parameters
         st.subheader("Temporal Parameters")
         duration_months = st.slider("Simulation Duration (months)", 1, 36, 12)
         
+        time_model = st.selectbox(
+            "Time Model",
+            ["Monthly", "Continuous"],
+            help="Monthly distribution steps, or a continuous stream updated whenever members vote"
+        )
+        
+        unit_arithmetic = st.selectbox(
+            "Unit Arithmetic",
+            ["Float", "Exact"],
+            help="Split funds as floats, or in integer pool units and wei flow rates as the Superfluid pool does"
+        )
+        
+        random_seed = st.number_input(
+            "Random Seed", 0, 2**32 - 1, DEFAULT_CONFIG['random_seed'],
+            help="Seed for reproducible simulations"
+        )
+        
+        profile_run = st.checkbox(
+            "Profile Run", False,
+            help="Time each simulation and plotting stage (bypasses the result cache)"
+        )
+        
         # Multi-simulation options
         st.subheader("Batch Simulation")
         run_multiple = st.checkbox("Run Multiple Simulations", False)
@@ -105,6 +223,13 @@ def run_dashboard():
                 "Parameter to Vary",
                 ["None", "Number of Members", "Distribution Rate", "Participation Rate", "Annual Funding Addition"]
             )
+            if FEATURES['parallel_processing']:
+                workers = st.number_input(
+                    "Worker Processes", 1, os.cpu_count() or 1, 1,
+                    help="Number of processes used to run the batch in parallel"
+                )
+            else:
+                workers = 1
     
     # Create config dictionary
     config = {
@@ -117,26 +242,170 @@ def run_dashboard():
         'power_skew': power_skew,
         'quality_distribution': quality_distribution.lower(),
         'popularity_correlation': popularity_correlation,
-        'allocation_strategy': allocation_strategy.lower(),
+        'allocation_strategy': ALLOCATION_STRATEGY_OPTIONS[allocation_strategy],
         'coalition_size': coalition_size / 100,
         'coalition_focus': coalition_focus,
+        'coalition_overlap': coalition_overlap / 100,
+        'coalition_churn': coalition_churn / 100,
+        'learning_rate': learning_rate,
+        'exploration_rate': exploration_rate,
+        'rationality': rationality,
+        'perception_noise': perception_noise,
         'participation_rate': participation_rate,
-        'duration_months': duration_months
+        'participation_model': participation_model.lower(),
+        'participation_heterogeneity': participation_heterogeneity,
+        'participation_persistence': participation_persistence,
+        'max_allocations_per_member': max_allocations_per_member,
+        'duration_months': duration_months,
+        'time_model': time_model.lower(),
+        'unit_arithmetic': unit_arithmetic.lower(),
+        'random_seed': int(random_seed)
     }
     
-    # Run simulation button
+    # Run simulation button; results are cached by config, seed and code version
+    cache = get_result_cache()
     if st.sidebar.button("Run Simulation"):
-        with st.spinner("Running simulation..."):
-            if run_multiple and parameter_to_vary != "None":
+        if run_multiple and parameter_to_vary != "None":
+            with st.spinner("Running simulations..."):
                 # Run batch simulations with parameter variations
-                results = run_batch_simulations(config, parameter_to_vary, num_simulations)
-                display_batch_results(results, parameter_to_vary)
-            else:
-                # Run single simulation
-                council, df = run_simulation(config)
-                display_results(council, df)
+                key = config_key(config, parameter_to_vary=parameter_to_vary, num_simulations=num_simulations)
+                cache.get_or_compute(key, lambda: run_checkpointed_batch(config, parameter_to_vary, num_simulations, int(workers)))
+                st.session_state['last_run'] = ('batch', key, parameter_to_vary)
+        else:
+            # Run single simulation, streaming months as they complete
+            key = config_key(config)
+            profiler = StageProfiler(enabled=profile_run)
+            st.session_state['profiler'] = profiler
+            if profile_run or cache.get(key) is None:
+                stream_simulation(config, key, profiler)
+            st.session_state['last_run'] = ('single', key, None)
+    
+    # Re-display the last run on every rerun (widget changes, tab switches)
+    if 'last_run' in st.session_state:
+        mode, key, parameter_varied = st.session_state['last_run']
+        profiler = st.session_state.get('profiler') if profile_run else None
+        if mode == 'partial':
+            display_partial_results(*st.session_state['partial_run'])
+            return
+        
+        results = cache.get(key)
+        if results is None:
+            st.info("Cached results were evicted; click Run Simulation to recompute.")
+        elif mode == 'batch':
+            display_batch_results(results, parameter_varied)
+        else:
+            council, df = results
+            display_results(council, df, profiler)
+            if profiler is not None and profiler.enabled:
+                display_profile(profiler)
 
-def display_results(council: Council, df: pd.DataFrame):
+def run_checkpointed_batch(config: Dict[str, Any], parameter_to_vary: str, num_simulations: int,
+                           workers: int) -> Dict[str, Any]:
+    """
+    Run a batch, recording each finished run in a checkpoint, so a rerun
+    of the script during the batch only runs what is left.
+    
+    Parameters:
+    -----------
+    config : dict
+        Base simulation configuration
+    parameter_to_vary : str
+        Name of the parameter to vary
+    num_simulations : int
+        Number of simulations
+    workers : int
+        Number of worker processes
+        
+    Returns:
+    --------
+    dict
+        Batch results, as returned by run_batch_simulations
+    """
+    checkpointer = Checkpointer(checkpoint_dir(
+        config, mode='batch', parameter_to_vary=parameter_to_vary, num_simulations=num_simulations
+    ))
+    results = run_batch_simulations(config, parameter_to_vary, num_simulations, workers, checkpointer)
+    checkpointer.clear()
+    return results
+
+def stream_simulation(config: Dict[str, Any], key: str, profiler: Optional[StageProfiler] = None):
+    """
+    Run a single simulation month by month, updating charts after every month.
+    
+    Clicking Stop reruns the script, which ends this run; the months
+    completed so far are then shown by display_partial_results. The run is
+    checkpointed every few months, and running the same configuration
+    again continues from the last checkpoint. A run that completes is
+    stored in the result cache under `key`.
+    
+    Parameters:
+    -----------
+    config : dict
+        Simulation configuration
+    key : str
+        Result cache key for the configuration
+    profiler : StageProfiler, optional
+        Profiler timing the run's stages
+    """
+    st.sidebar.button("Stop Simulation")
+    
+    context = SimulationContext(config['random_seed'], profiler)
+    checkpointer = Checkpointer(checkpoint_dir(config, mode='single'), CHECKPOINT_SETTINGS['every_months'])
+    state = resume_state(config, context, checkpointer)
+    council = state['council']
+    duration_months = config['duration_months']
+    st.session_state['partial_run'] = (council, duration_months)
+    st.session_state['last_run'] = ('partial', None, None)
+    
+    progress = st.progress(0.0, text="Starting simulation...")
+    pool_chart = st.empty()
+    funding_chart = st.empty()
+    
+    # Only the per-month pool balance and running funding totals are kept,
+    # starting from the months of a resumed checkpoint
+    history = council.history
+    grantee_names = [grantee.name for grantee in council.grantees]
+    months = history.month[:history.size].tolist()
+    pool_balances = history.pool_balance[:history.size].tolist()
+    received = history.distribution[:history.size].sum(axis=0)
+    
+    for snapshot in iter_simulation(config, context, council, checkpointer, state['month'], state['engine']):
+        months.append(snapshot['month'])
+        pool_balances.append(snapshot['pool_balance'])
+        received += snapshot['distribution']
+        
+        progress.progress(len(months) / duration_months, text=f"Month {len(months)} of {duration_months}")
+        pool_chart.line_chart(pd.DataFrame({'Pool Balance': pool_balances}, index=months))
+        funding_chart.bar_chart(pd.DataFrame({'Total Funding': received}, index=grantee_names))
+    
+    progress.empty()
+    pool_chart.empty()
+    funding_chart.empty()
+    checkpointer.clear()
+    with context.profiler.stage('history_frame'):
+        df = council.get_history_dataframe()
+    get_result_cache().put(key, (council, df))
+
+def display_partial_results(council: Council, duration_months: int):
+    """
+    Display the months completed by a simulation that was stopped early.
+    
+    Parameters:
+    -----------
+    council : Council
+        Council object after the last completed month
+    duration_months : int
+        Configured simulation duration
+    """
+    df = council.get_history_dataframe()
+    if df.empty:
+        st.info("Simulation stopped before the first month completed.")
+        return
+    
+    st.warning(f"Simulation stopped after {len(df)} of {duration_months} months.")
+    display_results(council, df)
+
+def display_results(council: Council, df: pd.DataFrame, profiler: Optional[StageProfiler] = None):
     """
     Display results for a single simulation run.
     
@@ -146,13 +415,18 @@ def display_results(council: Council, df: pd.DataFrame):
         Council object with simulation results
     df : pandas.DataFrame
         DataFrame containing simulation history
+    profiler : StageProfiler, optional
+        Profiler timing the plotting stages
     """
+    profiler = profiler or StageProfiler(enabled=False)
+    
     # Create tabs for different visualizations
     tab1, tab2, tab3, tab4 = st.tabs(["Funding Pool", "Grantee Allocations", "Distribution Metrics", "Network"])
     
     with tab1:
         st.subheader("Funding Pool Balance Over Time")
-        fig = create_funding_pool_plot(df)
+        with profiler.stage('plot_funding_pool'):
+            fig = create_funding_pool_plot(df)
         st.plotly_chart(fig, use_container_width=True)
         
         # Summary statistics
@@ -176,7 +450,8 @@ def display_results(council: Council, df: pd.DataFrame):
         st.subheader("Funding Distribution to Grantees")
         
         # Allocation plot
-        alloc_fig = create_grantee_allocation_plot(df, council.grantees)
+        with profiler.stage('plot_grantee_allocation'):
+            alloc_fig = create_grantee_allocation_plot(df, council.grantees)
         st.plotly_chart(alloc_fig, use_container_width=True)
         
         # Grantee funding table
@@ -200,7 +475,8 @@ def display_results(council: Council, df: pd.DataFrame):
         st.subheader("Distribution Metrics")
         
         # Get metric plots
-        metric_figs = create_distribution_metrics_plot(df, council.grantees)
+        with profiler.stage('plot_distribution_metrics'):
+            metric_figs = create_distribution_metrics_plot(df, council.grantees)
         
         # Display each metric in its own section
         if 'gini' in metric_figs:
@@ -209,34 +485,70 @@ def display_results(council: Council, df: pd.DataFrame):
         if 'concentration' in metric_figs:
             st.plotly_chart(metric_figs['concentration'], use_container_width=True)
             
+        if 'hhi' in metric_figs:
+            st.plotly_chart(metric_figs['hhi'], use_container_width=True)
+            
+        if 'quality_correlation' in metric_figs:
+            st.plotly_chart(metric_figs['quality_correlation'], use_container_width=True)
+            
         if 'stability' in metric_figs:
             st.plotly_chart(metric_figs['stability'], use_container_width=True)
     
     with tab4:
         st.subheader("Member-Grantee Network")
         
+        col1, col2 = st.columns(2)
+        grouping = col1.selectbox(
+            "Group Members By",
+            list(NETWORK_GROUPING_OPTIONS),
+            help="Large councils are drawn as aggregate groups of members"
+        )
+        max_edges = col2.slider(
+            "Max Edges", 50, 1000, 300, step=50,
+            help="Only the heaviest allocations are drawn"
+        )
+        
         # Create network visualization
-        html_string = create_network_plot(council)
+        with profiler.stage('plot_network'):
+            html_string = create_network_plot(council, group_by=NETWORK_GROUPING_OPTIONS[grouping], max_edges=max_edges)
         st.components.v1.html(html_string, height=600)
         
         # Member statistics
         st.subheader("Member Statistics")
         
-        member_data = []
-        for member in council.members:
-            allocations = council.allocations.get(member.id, {})
-            num_grantees_supported = sum(1 for amount in allocations.values() if amount > 0)
-            
-            member_data.append({
-                "ID": member.id,
-                "Voting Power": member.voting_power,
-                "Strategy": member.strategy.capitalize(),
-                "Grantees Supported": num_grantees_supported
-            })
+        rows, _, _ = council.allocations.nonzero_entries()
+        num_members = len(council.members)
+        grantees_supported = np.bincount(rows[rows < num_members], minlength=num_members)
         
-        member_df = pd.DataFrame(member_data)
+        member_df = pd.DataFrame({
+            "ID": [member.id for member in council.members],
+            "Voting Power": [member.voting_power for member in council.members],
+            "Strategy": [member.strategy.capitalize() for member in council.members],
+            "Grantees Supported": grantees_supported
+        })
         st.dataframe(member_df, use_container_width=True)
 
+def display_profile(profiler: StageProfiler):
+    """
+    Display the per-stage timing report of a profiled run.
+    
+    Parameters:
+    -----------
+    profiler : StageProfiler
+        Profiler of the run
+    """
+    with st.expander("Stage Profile", expanded=True):
+        st.dataframe(profiler.report(), use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        col1.json({'counters': dict(profiler.counters), 'gauges': dict(profiler.gauges)})
+        col2.download_button(
+            "Download Profile JSON",
+            profiler.to_json(),
+            file_name="profile.json",
+            mime="application/json"
+        )
+
 def display_batch_results(results: Dict[str, Any], parameter_varied: str):
     """
     Display comparative results for multiple simulation runs.
@@ -252,7 +564,7 @@ def display_batch_results(results: Dict[str, Any], parameter_varied: str):
     
     # Extract data
     configs = results['configs']
-    simulation_results = results['results']
+    summaries = results['summaries']
     
     # Create parameter values for x-axis
     param_values = []
@@ -270,34 +582,32 @@ def display_batch_results(results: Dict[str, Any], parameter_varied: str):
     
     # Extract metrics for each simulation
     final_pool_values = []
-    gini_values = []
-    concentration_values = []
+    distributions = []
+    qualities = []
     
-    for council, df in simulation_results:
+    for summary in summaries:
+        df = summary['history']
+        
         # Final pool balance
         final_pool = df['pool_balance'].iloc[-1] if not df.empty else 0
         final_pool_values.append(final_pool)
         
-        # Gini coefficient (last month)
-        dist_cols = [col for col in df.columns if col.startswith('dist_to_')]
-        if dist_cols and not df.empty:
-            last_month_df = df.iloc[-1]
-            distributions = [last_month_df[col] for col in dist_cols]
-            from visualization.plots import calculate_gini
-            gini = calculate_gini(distributions)
-            gini_values.append(gini)
+        # Distribution history, in the same grantee order as the qualities
+        grantee_ids = [g['id'] for g in summary['grantees']]
+        dist_cols = [f'dist_to_{grantee_id}' for grantee_id in grantee_ids]
+        if df.empty:
+            distributions.append(np.zeros((1, len(grantee_ids))))
         else:
-            gini_values.append(0)
-        
-        # Concentration ratio (last month)
-        if dist_cols and not df.empty:
-            last_month_df = df.iloc[-1]
-            distributions = {col.replace('dist_to_', ''): last_month_df[col] for col in dist_cols}
-            from visualization.plots import calculate_concentration_ratio
-            concentration = calculate_concentration_ratio(distributions, 3)
-            concentration_values.append(concentration)
-        else:
-            concentration_values.append(0)
+            distributions.append(df[dist_cols].to_numpy(dtype=float))
+        qualities.append(np.array([g['quality'] for g in summary['grantees']], dtype=float))
+    
+    # Runs with matching shapes are stacked into one runs x months x grantees pass;
+    # the table reports each metric for the last month
+    run_metrics = batch_distribution_metrics(distributions, qualities, top_n=3)
+    gini_values = [float(m['gini'][-1]) for m in run_metrics]
+    concentration_values = [float(m['concentration'][-1]) for m in run_metrics]
+    hhi_values = [float(m['hhi'][-1]) for m in run_metrics]
+    correlation_values = [float(m['quality_correlation'][-1]) for m in run_metrics]
     
     # Create comparative plots
     tab1, tab2, tab3 = st.tabs(["Final Pool", "Gini Coefficient", "Concentration Ratio"])
@@ -338,13 +648,15 @@ def display_batch_results(results: Dict[str, Any], parameter_varied: str):
     st.subheader("Raw Data")
     
     data = []
-    for i, (config, (council, _)) in enumerate(zip(configs, simulation_results)):
+    for i, summary in enumerate(summaries):
         row = {
             parameter_varied: param_values[i],
             "Final Pool": final_pool_values[i],
             "Gini Coefficient": gini_values[i],
             "Concentration Ratio": concentration_values[i],
-            "Viable Grantees": sum(1 for g in council.grantees if g.is_viable())
+            "HHI": hhi_values[i],
+            "Quality-Funding Correlation": correlation_values[i],
+            "Viable Grantees": summary['viable_grantees']
         }
         data.append(row)
     
@@ -4,9 +4,10 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 from pyvis.network import Network
-import tempfile
-import os
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.metrics import distribution_metrics, gini, concentration_ratio
 
 def create_funding_pool_plot(df: pd.DataFrame) -> go.Figure:
     """
@@ -161,19 +162,17 @@ def create_distribution_metrics_plot(df: pd.DataFrame, grantees: List[Any]) -> D
         figures['empty'] = empty_fig
         return figures
     
-    # 1. Gini coefficient over time
-    gini_values = []
+    # Compute every metric over the (months x grantees) matrix in one pass
     months = df['month'].tolist()
+    grantee_ids = [col.replace('dist_to_', '') for col in dist_cols]
+    quality_by_id = {g.id: g.quality for g in grantees}
+    quality = np.array([quality_by_id.get(grantee_id, 0.0) for grantee_id in grantee_ids])
+    metrics = distribution_metrics(df[dist_cols].to_numpy(dtype=float), quality, top_n=3)
     
-    for month in months:
-        month_df = df[df['month'] == month]
-        distributions = [month_df[col].iloc[0] for col in dist_cols]
-        gini = calculate_gini(distributions)
-        gini_values.append(gini)
-    
+    # 1. Gini coefficient over time
     gini_fig = px.line(
         x=months,
-        y=gini_values,
+        y=metrics['gini'],
         title="Gini Coefficient Over Time (Higher = More Inequality)",
         labels={"x": "Month", "y": "Gini Coefficient"},
         markers=True
@@ -189,17 +188,9 @@ def create_distribution_metrics_plot(df: pd.DataFrame, grantees: List[Any]) -> D
     figures['gini'] = gini_fig
     
     # 2. Concentration ratio (% to top 3 grantees)
-    concentration_values = []
-    
-    for month in months:
-        month_df = df[df['month'] == month]
-        distributions = {col.replace('dist_to_', ''): month_df[col].iloc[0] for col in dist_cols}
-        concentration = calculate_concentration_ratio(distributions, 3)
-        concentration_values.append(concentration)
-    
     concentration_fig = px.line(
         x=months,
-        y=concentration_values,
+        y=metrics['concentration'],
         title="Concentration Ratio Over Time (% to Top 3 Grantees)",
         labels={"x": "Month", "y": "Concentration Ratio (%)"},
         markers=True
@@ -214,22 +205,49 @@ def create_distribution_metrics_plot(df: pd.DataFrame, grantees: List[Any]) -> D
     
     figures['concentration'] = concentration_fig
     
-    # 3. Funding stability (coefficient of variation)
+    # 3. Herfindahl-Hirschman index over time
+    hhi_fig = px.line(
+        x=months,
+        y=metrics['hhi'],
+        title="Herfindahl-Hirschman Index Over Time (Higher = More Concentrated)",
+        labels={"x": "Month", "y": "HHI"},
+        markers=True
+    )
+    
+    hhi_fig.update_layout(
+        xaxis=dict(tickmode='linear'),
+        yaxis=dict(range=[0, 1]),
+        hovermode="x unified",
+        plot_bgcolor='white'
+    )
+    
+    figures['hhi'] = hhi_fig
+    
+    # 4. Correlation between grantee quality and funding received
+    correlation_fig = px.line(
+        x=months,
+        y=metrics['quality_correlation'],
+        title="Quality-Funding Correlation Over Time",
+        labels={"x": "Month", "y": "Correlation"},
+        markers=True
+    )
+    
+    correlation_fig.update_layout(
+        xaxis=dict(tickmode='linear'),
+        yaxis=dict(range=[-1, 1]),
+        hovermode="x unified",
+        plot_bgcolor='white'
+    )
+    
+    figures['quality_correlation'] = correlation_fig
+    
+    # 5. Funding stability (coefficient of variation)
     if len(months) > 1:
-        stability_data = []
-        
-        for col in dist_cols:
-            grantee_id = col.replace('dist_to_', '')
-            grantee_name = next((g.name for g in grantees if g.id == grantee_id), grantee_id)
-            values = df[col].tolist()
-            cv = np.std(values) / np.mean(values) if np.mean(values) > 0 else 0
-            
-            stability_data.append({
-                'grantee': grantee_name,
-                'stability': cv
-            })
-        
-        stability_df = pd.DataFrame(stability_data)
+        name_by_id = {g.id: g.name for g in grantees}
+        stability_df = pd.DataFrame({
+            'grantee': [name_by_id.get(grantee_id, grantee_id) for grantee_id in grantee_ids],
+            'stability': metrics['stability']
+        })
         
         stability_fig = px.bar(
             stability_df,
@@ -248,58 +266,239 @@ def create_distribution_metrics_plot(df: pd.DataFrame, grantees: List[Any]) -> D
     
     return figures
 
-def create_network_plot(council, month: Optional[int] = None) -> str:
+def create_sweep_heatmap(results: pd.DataFrame, x: str, y: str, metric: str = 'gini', bins: int = 10) -> go.Figure:
+    """
+    Create a heatmap of a sweep metric over two swept parameters.
+    
+    Points are averaged over every other swept parameter. Parameters with
+    more than `bins` distinct values (Latin hypercube and Sobol sweeps) are
+    binned into equal-width intervals.
+    
+    Parameters:
+    -----------
+    results : pandas.DataFrame
+        Sweep results from utils.sweep.run_sweep
+    x : str
+        Parameter on the x axis
+    y : str
+        Parameter on the y axis
+    metric : str
+        Metric name (one of utils.sweep.SWEEP_METRICS); its mean is plotted
+    bins : int
+        Maximum number of cells per axis
+        
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        Plotly figure object
+    """
+    def axis_values(column):
+        values = results[column]
+        if values.nunique() <= bins:
+            return values
+        return pd.cut(values, bins).apply(lambda interval: interval.mid).astype(float)
+    
+    cells = pd.DataFrame({
+        x: axis_values(x),
+        y: axis_values(y),
+        metric: results[f'{metric}_mean']
+    }).pivot_table(index=y, columns=x, values=metric, aggfunc='mean')
+    
+    fig = px.imshow(
+        cells,
+        origin='lower',
+        aspect='auto',
+        color_continuous_scale='Viridis',
+        title=f"Sensitivity of {metric.replace('_', ' ').title()} to {x} and {y}",
+        labels={"x": x, "y": y, "color": metric}
+    )
+    
+    fig.update_layout(plot_bgcolor='white')
+    
+    return fig
+
+# Ways to group members into aggregate network nodes
+NETWORK_GROUPINGS = ('decile', 'strategy', 'coalition')
+
+MEMBER_COLOR = '#4285F4'
+GRANTEE_COLOR = '#EA4335'
+
+def member_groups(council, group_by: str = 'decile') -> Tuple[np.ndarray, List[str]]:
+    """
+    Assign every council member to an aggregate group.
+    
+    Parameters:
+    -----------
+    council : Council
+        Council object containing members
+    group_by : str
+        'decile' (voting power decile), 'strategy' or 'coalition'
+        
+    Returns:
+    --------
+    tuple
+        (group index per member, group labels)
+    """
+    members = council.members
+    
+    if group_by == 'decile':
+        voting_power = np.array([m.voting_power for m in members], dtype=float)
+        ranks = np.empty(len(members), dtype=np.int64)
+        ranks[np.argsort(voting_power, kind='stable')] = np.arange(len(members))
+        deciles = ranks * 10 // max(len(members), 1)
+        present, groups = np.unique(deciles, return_inverse=True)
+        labels = []
+        for decile in present:
+            in_decile = voting_power[deciles == decile]
+            labels.append(f"VP decile {decile + 1} ({in_decile.min():,.0f}-{in_decile.max():,.0f})")
+        return groups, labels
+    
+    if group_by == 'strategy':
+        keys = [m.strategy.capitalize() for m in members]
+    elif group_by == 'coalition':
+        names = {g.id: g.name for g in council.grantees}
+        keys = [
+            "Coalition: " + ", ".join(sorted(names.get(grantee_id, grantee_id) for grantee_id in m.coalition))
+            if m.coalition else "No coalition"
+            for m in members
+        ]
+    else:
+        raise ValueError(f"Unknown member grouping: {group_by}")
+    
+    labels, groups = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    return groups, labels.tolist()
+
+def top_k_edges(weights: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the K heaviest positive edges.
+    
+    Parameters:
+    -----------
+    weights : numpy.ndarray
+        Weight of every candidate edge
+    k : int
+        Maximum number of edges to keep
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Indices of the kept edges, heaviest first
+    """
+    candidates = np.flatnonzero(weights > 0)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-weights[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-weights[candidates], kind='stable')]
+
+@lru_cache(maxsize=32)
+def _network_layout(nodes: Tuple[str, ...], edges: Tuple[Tuple[str, str, float], ...]) -> Dict[str, Tuple[float, float]]:
+    """Compute (and cache) a spring layout for a graph given as hashable node and edge tuples."""
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_weighted_edges_from(edges)
+    positions = nx.spring_layout(G, weight='weight', seed=42)
+    return {node: (float(x) * 500, float(y) * 500) for node, (x, y) in positions.items()}
+
+def create_network_plot(
+    council,
+    month: Optional[int] = None,
+    group_by: Optional[str] = 'auto',
+    max_edges: int = 300,
+    max_member_nodes: int = 200
+) -> str:
     """
     Create a network visualization of member-grantee relationships.
     
+    Large councils are drawn with members aggregated into groups, whose edges
+    carry the summed allocation of the group. Only the `max_edges` heaviest
+    edges are drawn. The layout is computed once server-side and cached, and
+    the HTML is built in memory.
+    
     Parameters:
     -----------
     council : Council
         Council object containing members and grantees
     month : int, optional
         Specific month to visualize (defaults to latest)
+    group_by : str, optional
+        'decile', 'strategy', 'coalition', None (one node per member), or
+        'auto' (per member up to max_member_nodes members, deciles beyond)
+    max_edges : int
+        Maximum number of edges to draw
+    max_member_nodes : int
+        Largest council drawn one node per member when group_by is 'auto'
         
     Returns:
     --------
     str
         HTML string of the network visualization
     """
-    # Create network graph
-    G = nx.Graph()
+    if group_by == 'auto':
+        group_by = None if len(council.members) <= max_member_nodes else 'decile'
+    
+    allocations = council.allocations
+    num_members = len(council.members)
+    
+    if group_by is None:
+        # One source node per member, one candidate edge per vote
+        sources, targets, amounts = allocations.nonzero_entries()
+        in_council = sources < num_members
+        sources, targets, amounts = sources[in_council], targets[in_council], amounts[in_council]
+        source_ids = [f"m_{member.id}" for member in council.members]
+        source_labels = [f"Member {member.id}" for member in council.members]
+        source_sizes = [10 + member.voting_power / 100 for member in council.members]
+        source_titles = [
+            f"Voting power: {member.voting_power:,}<br>Strategy: {member.strategy}"
+            for member in council.members
+        ]
+    else:
+        groups, labels = member_groups(council, group_by)
+        group_weights = allocations.group_totals(groups, len(labels))
+        sources, targets = np.nonzero(group_weights)
+        amounts = group_weights[sources, targets]
+        group_counts = np.bincount(groups, minlength=len(labels))
+        group_power = np.bincount(
+            groups, weights=[member.voting_power for member in council.members], minlength=len(labels)
+        )
+        source_ids = [f"group_{i}" for i in range(len(labels))]
+        source_labels = labels
+        source_sizes = (10 + 40 * np.sqrt(group_power / max(group_power.max(), 1))).tolist()
+        source_titles = [
+            f"{label}<br>Members: {count:,}<br>Voting power: {power:,.0f}"
+            for label, count, power in zip(labels, group_counts, group_power)
+        ]
+    
+    grantee_ids = [f"g_{grantee.id}" for grantee in council.grantees]
+    kept = top_k_edges(amounts, max_edges)
+    edge_sources, edge_grantees, edge_weights = sources[kept], targets[kept], amounts[kept]
+    max_weight = max(int(edge_weights.max()), 1) if len(edge_weights) else 1
+    
+    # Draw every grantee, but only the sources that keep at least one edge
+    kept_sources = np.unique(edge_sources)
+    nodes = tuple([source_ids[i] for i in kept_sources] + grantee_ids)
+    edges = tuple(
+        (source_ids[s], grantee_ids[g], float(w) / max_weight)
+        for s, g, w in zip(edge_sources, edge_grantees, edge_weights)
+    )
+    positions = _network_layout(nodes, edges)
+    
+    # Create PyVis network with physics disabled, using the precomputed layout
+    net = Network(height="600px", width="100%", cdn_resources='remote')
+    net.toggle_physics(False)
+    
+    for i in kept_sources:
+        x, y = positions[source_ids[i]]
+        net.add_node(source_ids[i], label=source_labels[i], title=source_titles[i],
+                     size=source_sizes[i], color=MEMBER_COLOR, x=x, y=y, physics=False)
+    
+    for grantee, node_id in zip(council.grantees, grantee_ids):
+        x, y = positions[node_id]
+        net.add_node(node_id, label=grantee.name, title=f"Quality: {grantee.quality:.2f}",
+                     size=10, color=GRANTEE_COLOR, x=x, y=y, physics=False)
+    
+    for s, g, w in zip(edge_sources, edge_grantees, edge_weights):
+        net.add_edge(source_ids[s], grantee_ids[g], value=int(w), title=f"Allocation: {int(w):,}")
     
-    # Add member nodes
-    for member in council.members:
-        G.add_node(f"m_{member.id}", label=f"Member {member.id}", group=1, size=10 + member.voting_power/100)
-    
-    # Add grantee nodes
-    for grantee in council.grantees:
-        G.add_node(f"g_{grantee.id}", label=grantee.name, group=2, size=10)
-    
-    # Add edges based on allocations
-    for member_id, allocations in council.allocations.items():
-        for grantee_id, amount in allocations.items():
-            if amount > 0:
-                G.add_edge(f"m_{member_id}", f"g_{grantee_id}", weight=amount, title=f"Allocation: {amount}")
-    
-    # Create PyVis network
-    net = Network(notebook=True, height="600px", width="100%")
-    net.from_nx(G)
-    
-    # Set node colors
-    for node in net.nodes:
-        if node['group'] == 1:  # Member
-            node['color'] = '#4285F4'
-        else:  # Grantee
-            node['color'] = '#EA4335'
-    
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp:
-        net.save_graph(tmp.name)
-        with open(tmp.name, 'r') as f:
-            html_string = f.read()
-        os.unlink(tmp.name)
-    
-    return html_string
+    return net.generate_html()
 
 def calculate_gini(values: List[float]) -> float:
     """
@@ -315,16 +514,10 @@ def calculate_gini(values: List[float]) -> float:
     float
         Gini coefficient (0 = perfect equality, 1 = perfect inequality)
     """
-    if not values or sum(values) == 0:
+    if len(values) == 0:
         return 0
     
-    # Sort values
-    sorted_values = sorted(values)
-    n = len(sorted_values)
-    
-    # Calculate Gini coefficient
-    index = np.arange(1, n + 1)
-    return (2 * np.sum(index * sorted_values) / (n * np.sum(sorted_values))) - (n + 1) / n
+    return float(gini(np.asarray(values, dtype=float)))
 
 def calculate_concentration_ratio(distributions: Dict[str, float], n: int) -> float:
     """
@@ -345,14 +538,4 @@ def calculate_concentration_ratio(distributions: Dict[str, float], n: int) -> fl
     if not distributions:
         return 0
     
-    total = sum(distributions.values())
-    if total == 0:
-        return 0
-    
-    # Sort grantees by distribution amount
-    sorted_grantees = sorted(distributions.items(), key=lambda x: x[1], reverse=True)
-    
-    # Calculate sum of top N
-    top_n_sum = sum(amount for _, amount in sorted_grantees[:n])
-    
-    return (top_n_sum / total) * 100 
\ No newline at end of file
+    return float(concentration_ratio(np.fromiter(distributions.values(), dtype=float), n)) 
\ No newline at end of file